@@ -20,7 +20,14 @@ HLP_CMD_1 = "        Ctrl + DEL:\tSupprime la colonne courante."
 HLP_CMD_3 = "Shift + Ctrl + DEL:\tRéinitialise la fenêtre."
 HLP_CMD_4 = "                 .:\tInsère | (changement de mesure)."
 HLP_CMD_2 = "        Ctrl + H:\t\tAffiche cette fenêtre."
-HELP_CONTENT = HLP_USE + "\n\n" + HLP_CMD_1 + '\n' + HLP_CMD_3 + '\n' + HLP_CMD_4 + '\n' + HLP_CMD_2
+HLP_CMD_5 = "Ctrl + Z / Ctrl + Y:\tAnnule / rétablit la dernière modification."
+HLP_CMD_6 = "Ctrl + G / Ctrl + M:\tVa à une mesure / sélectionne la mesure courante."
+HLP_CMD_7 = "Ctrl + D:\t\tDuplique les mesures sélectionnées."
+HLP_CMD_8 = "Alt + Gauche / Droite:\tDéplace les mesures sélectionnées."
+HLP_CMD_9 = "Ctrl + C / X / V:\tCopie / coupe / colle le bloc sélectionné."
+HELP_CONTENT = HLP_USE + "\n\n" + HLP_CMD_1 + '\n' + HLP_CMD_3 + '\n' + HLP_CMD_4 + '\n' + HLP_CMD_2 \
+               + '\n' + HLP_CMD_5 + '\n' + HLP_CMD_6 + '\n' + HLP_CMD_7 + '\n' + HLP_CMD_8 \
+               + '\n' + HLP_CMD_9
 
 
 
@@ -44,7 +51,7 @@ class HelpWindow:
         self.window.title("Guitar Tab Writer: Help")
         self.window.transient(parent)
         self.window.grab_set()
-        self.window.geometry("400x150")
+        self.window.geometry("420x250")
 
         # Create a Label for the help content
         l_help_content = HELP_CONTENT
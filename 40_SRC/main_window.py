@@ -0,0 +1,1445 @@
+"""
+Main Window Module
+
+USE:
+    This module provides the main window of the application: a simple text zone for
+    writing guitar tabs, which automatically aligns the text and inserts hyphens or bars
+    as necessary. It is imported by guitar_tab_writer only when the editor is opened, so
+    the headless command line does not need Tk.
+        run_gui(l_open_args, l_profile_modes)
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+import os                   # For the environment variables
+import sys                  # For the command line arguments
+from tkinter import (Tk, Text, font, Button, Label, Menu, Scrollbar, BooleanVar, StringVar,  # For GUI
+                     TclError, messagebox, filedialog, simpledialog)
+from help_window import HelpWindow  # For the help window
+from tab_document import TabDocument, STRINGS   # For the tab model
+from tab_view import TabView, PREFIX_COLUMNS    # For the display of the tab model
+from tab_layout import TabLayoutView, SYSTEM_COLUMNS  # For the stacked systems display
+from tab_editor import (TabEditor, command_from_key,  # For the edition of the tab model
+                        SHIFT_MASK, CONTROL_MASK)
+from tab_history import TabHistory              # For the undo/redo
+from tab_block import copy_block, delete_block, paste_block, block_from_text  # For the blocks
+from tab_measures import (MeasureIndex, OP_DUPLICATE, OP_DELETE, OP_MOVE, OP_SWAP,  # For the measures
+                          MEASURE_OPERATIONS)
+from tab_journal import TabJournal, autosave_directory, AUTOSAVE_MS  # For the autosave
+from tab_transpose import transpose_lines, TransposeError  # For the transposition
+from tab_archive import TabArchive              # For the large files
+from tab_binary import (load_binary, save_binary,  # For the binary tab files
+                        BinaryFormatError, BINARY_EXTENSION)
+from tab_profiler import profiler_from_env      # For the handler profiling
+from tab_io import IOWorker                     # For the clipboard calls
+from tab_notation import NotationRenderer       # For the standard notation
+from tab_export import (TabExporter, EXPORT_STYLES, STYLE_RAW, STYLE_WRAPPED,  # For the copies
+                        STYLE_CONDENSED, STYLE_NUMBERED)
+from notation_window import NotationWindow      # For the notation window
+from tab_highlight import TabHighlighter, configure_tags  # For the syntax highlighting
+from tab_replay import (TraceRecorder, RECORD_ENV, ACTION_CLEAR, ACTION_TRANSPOSE,  # For the session recording
+                        ACTION_UNDO, ACTION_REDO, ACTION_MEASURES, ACTION_DELETE_BLOCK,
+                        ACTION_PASTE_BLOCK)
+
+##################
+# GLOBAL CONSTANTS
+##################
+# GUI
+APP_TITLE = 'Guitar Tab Writer'  # Constant => pylint: disable=C0103
+FONT_FAMILY = 'Courier'  # Constant => pylint: disable=C0103
+FONT_SIZE = 12  # Constant => pylint: disable=C0103
+
+# Keystroke coalescing: latency budget in ms (0: once per idle cycle, unset: disabled)
+COALESCE_ENV = 'GTW_COALESCE_MS'  # Constant => pylint: disable=C0103
+
+# Virtualized view: number of columns held by the text zone (0: the whole tab)
+WINDOW_ENV = 'GTW_WINDOW_COLUMNS'  # Constant => pylint: disable=C0103
+WINDOW_COLUMNS = 1000  # Constant => pylint: disable=C0103
+
+# Auto-layout: width of the stacked staff systems (unset or 0: one system)
+LAYOUT_ENV = 'GTW_SYSTEM_COLUMNS'  # Constant => pylint: disable=C0103
+LAYOUT_HEIGHT = 20  # Height of the text zone with stacked systems => pylint: disable=C0103
+
+# Profiling (see tab_profiler): timed handlers and refresh period of the status bar
+PROFILED_HANDLERS = ['on_key_press', 'on_key_release', 'flush_pending', 'clear_tab',  # Constant => pylint: disable=C0103
+                     'copy_tab', 'process_tab', 'decrement_octave', 'increment_octave',
+                     'transpose_tab', 'undo', 'redo', 'open_archive', 'load_system',
+                     'goto_measure', 'select_measure', 'edit_measures', 'copy_selection',
+                     'cut_selection', 'paste_selection', 'delete_selection']
+STATUS_PERIOD_MS = 500  # Constant => pylint: disable=C0103
+
+# Guitar Tab
+INITIAL_TAB = '\n'.join([f'{string}|' for string in STRINGS])  # Constant => pylint: disable=C0103
+OCTAVE = 12  # Semitones => pylint: disable=C0103
+
+##################
+# CLASS DEFINITION
+##################
+class GuitarTabWriter:
+    """
+    Guitar Tab Writer class that handles the GUI and functionality.
+    """
+    def __init__(self, root, coalesce_ms=None, profiler=None, record_path=None,
+                 autosave_dir=None, window=WINDOW_COLUMNS, system_columns=None):
+        """
+        Initialize the Guitar Tab Writer Application.
+
+        :param root: The root Tkinter window.
+        :param coalesce_ms: Keystroke coalescing: None to display each edit immediately,
+                            0 to display the pending edits once per idle cycle, or the
+                            latency budget (ms) after which the pending edits are displayed.
+        :param profiler: Optional Profiler timing the handlers (see tab_profiler).
+        :param record_path: Optional trace file recording the session (see tab_replay).
+        :param autosave_dir: Optional autosave directory: the last tab is restored from it
+                             after a crash, and the edits are journaled into it (see tab_journal).
+        :param window: Number of columns held by the text zone around the cursor, or None
+                       to hold the whole tab (see TabView).
+        :param system_columns: Width of the stacked staff systems (auto-layout, see
+                               TabLayoutView), or None to display one system.
+        """
+        self.root = root
+        self.root.title(APP_TITLE)
+
+        # Keystroke coalescing
+        self.coalesce_ms = coalesce_ms
+        self.flush_id = None    # Identifier of the scheduled display of the pending edits
+
+        # Create a monospaced font
+        self.font = font.Font(family=FONT_FAMILY, size=FONT_SIZE)
+
+        # Create a text zone
+        self.text_zone = Text(self.root, font=self.font, width=100, height=6)
+        self.text_zone.pack()
+
+        # Create the tab model: the text zone only mirrors its changes
+        self.document = TabDocument.from_text(INITIAL_TAB, STRINGS)
+
+        # Restore the last autosaved tab (after a crash), then journal the edits
+        self.journal = None
+        if autosave_dir:
+            try:
+                self.journal = TabJournal(autosave_dir, self.document)
+            except OSError as l_error:
+                print(f"Autosave disabled: {l_error}", file=sys.stderr)
+            # end try
+        # else: no autosave
+
+        self.window = window or None
+        self.system_columns = system_columns or SYSTEM_COLUMNS
+        self.view = TabView(self.text_zone, self.document, self.window)
+        self.editor = TabEditor(self.document)
+        self.history = TabHistory(self.document)
+        self.measures = MeasureIndex(self.document)
+
+        # Clipboard calls run on a worker thread
+        self.io_worker = IOWorker(self.root)
+
+        # Standard notation and exported text of the tab (cached per measure)
+        self.notation = NotationRenderer(self.measures)
+        self.exporter = TabExporter(self.measures)
+
+        # Create a horizontal scrollbar sliding the window of the view
+        self.h_scrollbar = Scrollbar(self.root, orient="horizontal",
+                                     command=lambda *args: self.view.scroll(*args))
+        if self.view.window is not None:
+            self.h_scrollbar.pack(fill="x", after=self.text_zone)
+            self.view.xscrollcommand = self.h_scrollbar.set
+        # else: the text zone holds the whole tab
+
+        # Insert the initial tab
+        self.view.render()
+
+        # Highlight the frets, bars and techniques (columns of each edit, at idle time)
+        configure_tags(self.text_zone)
+        self.highlighter = TabHighlighter(self.view, self.text_zone.after_idle)
+
+        # Record the session
+        self.recorder = TraceRecorder(record_path, self.document) if record_path else None
+
+        # Time the handlers (before they are bound)
+        self.profiler = profiler
+        if self.profiler is not None:
+            self.profiler.wrap_methods(self, PROFILED_HANDLERS)
+        # else: no profiling
+
+        # Set the cursor to the end of the first line
+        self.text_zone.mark_set("insert", "1.end")
+        self.text_zone.see("insert")
+
+        # Opened tab file: only the displayed staff system is loaded
+        self.archive = None
+        self.system_index = 0
+        self.system_version = 0     # Document version when the system was loaded
+        self.archive_edits = {}     # Edited systems of the file: {index: lines}
+
+        # Create the File menu
+        self.menu = Menu(self.root)
+        self.file_menu = Menu(self.menu, tearoff=0)
+        self.file_menu.add_command(label="Open...", accelerator="Ctrl+O", command=self.open_file)
+        self.file_menu.add_command(label="Save", command=self.save_archive)
+        self.file_menu.add_command(label="Save binary...", accelerator="Ctrl+S",
+                                   command=self.save_file)
+        self.file_menu.add_command(label="Export text...", command=self.export_file)
+        self.file_menu.add_separator()
+        self.file_menu.add_command(label="Previous system", accelerator="Ctrl+PgUp",
+                                   command=self.previous_system)
+        self.file_menu.add_command(label="Next system", accelerator="Ctrl+PgDn",
+                                   command=self.next_system)
+        self.menu.add_cascade(label="File", menu=self.file_menu)
+
+        # Create the View menu
+        self.layout_var = BooleanVar(self.root, value=False)
+        self.view_menu = Menu(self.menu, tearoff=0)
+        self.view_menu.add_checkbutton(label="Auto layout", variable=self.layout_var,
+                                       command=lambda: self.set_layout(self.layout_var.get()))
+        self.menu.add_cascade(label="View", menu=self.view_menu)
+
+        # Create the Export menu: style of the copied and exported text
+        self.export_var = StringVar(self.root, value=STYLE_RAW)
+        self.export_menu = Menu(self.menu, tearoff=0)
+        for style, label in [(STYLE_RAW, "Raw"), (STYLE_WRAPPED, "Wrapped systems"),
+                             (STYLE_CONDENSED, "Condensed"), (STYLE_NUMBERED, "Measure numbers")]:
+            self.export_menu.add_radiobutton(label=label, variable=self.export_var, value=style)
+        # end for
+        self.export_menu.add_separator()
+        self.export_menu.add_command(label="Copy tab", command=self.copy_tab)
+        self.menu.add_cascade(label="Export", menu=self.export_menu)
+
+        # Create the Measure menu
+        self.measure_menu = Menu(self.menu, tearoff=0)
+        self.measure_menu.add_command(label="Go to measure...", accelerator="Ctrl+G",
+                                      command=self.goto_measure)
+        self.measure_menu.add_command(label="Select measure", accelerator="Ctrl+M",
+                                      command=self.select_measure)
+        self.measure_menu.add_separator()
+        self.measure_menu.add_command(label="Duplicate measures...", accelerator="Ctrl+D",
+                                      command=self.duplicate_measures)
+        self.measure_menu.add_command(label="Delete measures", command=self.delete_measures)
+        self.measure_menu.add_command(label="Move measures left", accelerator="Alt+Left",
+                                      command=lambda: self.move_measures(-1))
+        self.measure_menu.add_command(label="Move measures right", accelerator="Alt+Right",
+                                      command=lambda: self.move_measures(1))
+        self.measure_menu.add_command(label="Swap with measure...", command=self.swap_measures)
+        self.menu.add_cascade(label="Measure", menu=self.measure_menu)
+        self.root.config(menu=self.menu)
+
+        # Bind the key events
+        self.text_zone.bind('<KeyPress>', self.on_key_press)
+        self.text_zone.bind('<KeyRelease>', self.on_key_release)
+        self.text_zone.bind('<ButtonPress>', self.flush_pending)
+        self.text_zone.bind('<ButtonRelease>', self.update_measure)
+
+        # Rectangular block selection: copied block and displayed selection
+        self.block = None
+        self.block_text = None
+        self.block_shown = None
+        self.text_zone.bind('<<Selection>>', self.on_selection)
+        self.text_zone.bind('<<Copy>>', self.copy_selection)
+        self.text_zone.bind('<<Cut>>', self.cut_selection)
+        self.text_zone.bind('<<Paste>>', self.paste_selection)
+
+        # Create a Clear button
+        self.clear_button = Button(self.root, 
+                                   text="Clear", 
+                                   command=self.clear_tab)
+        self.clear_button.pack(side="left", padx=(0, 10), pady=(10, 0))
+
+        # Create a Copy button
+        self.copy_button = Button(  self.root, 
+                                    text="Copy",
+                                    command=self.copy_tab)
+        self.copy_button.pack(side="left", padx=(0, 10), pady=(10, 0))
+
+        # Create a Process button
+        self.process_button = Button(self.root, 
+                                     text="Process", 
+                                     command=self.process_tab)
+        self.process_button.pack(side="left", padx=(0, 10), pady=(10, 0))
+
+        # Create a "-1 oct." button
+        self.decrement_octave_button = Button(self.root, 
+                                              text="-1 oct.", 
+                                              command=self.decrement_octave)
+        self.decrement_octave_button.pack(side="left", padx=(0, 10), pady=(10, 0))
+
+        # Create a "+1 oct." button
+        self.increment_octave_button = Button(self.root, 
+                                              text="+1 oct.", 
+                                              command=self.increment_octave)
+        self.increment_octave_button.pack(side="left", padx=(0, 10), pady=(10, 0))
+
+        # Create a "-1/2" button (one semitone down)
+        self.decrement_semitone_button = Button(self.root,
+                                                text="-1/2",
+                                                command=lambda: self.transpose_tab(-1))
+        self.decrement_semitone_button.pack(side="left", padx=(0, 10), pady=(10, 0))
+
+        # Create a "+1/2" button (one semitone up)
+        self.increment_semitone_button = Button(self.root,
+                                                text="+1/2",
+                                                command=lambda: self.transpose_tab(1))
+        self.increment_semitone_button.pack(side="left", padx=(0, 10), pady=(10, 0))
+
+        # Create a Help button
+        self.help_button = Button(self.root, text="Help", command=self.open_help_window)
+        self.help_button.pack(side="left", pady=(10, 0))
+
+        # Create a label with the measure of the cursor
+        self.measure_text = None
+        self.measure_label = Label(self.root, anchor="e", font=("Arial", 9))
+        self.measure_label.pack(side="bottom", fill="x", pady=(10, 0))
+
+        # Write the journal of the edits periodically (in batches)
+        if self.journal is not None:
+            self.root.after(AUTOSAVE_MS, self.autosave)
+        # else: no autosave
+
+        # Create a status bar with the handler latencies (profiling only)
+        self.status_label = None
+        if self.profiler is not None:
+            self.status_label = Label(self.root, anchor="w", font=("Arial", 9))
+            self.status_label.pack(side="bottom", fill="x", before=self.measure_label)
+            self.update_status()
+        # else: no profiling
+
+        # Stack the staff systems
+        if system_columns:
+            self.layout_var.set(True)
+            self.set_layout(True)
+        # else: one system
+
+        # Set the focus to the text zone
+        self.text_zone.focus_set()
+
+        # Bind the TAB key to move focus to the Process button
+        self.root.bind("<Tab>", lambda event: self.process_button.focus_set())
+
+        # Bind the "Ctrl" + "H" key combination to open the help window
+        self.root.bind("<Control-h>", self.open_help_window)
+        self.root.bind("<Control-Shift-Delete>", self.clear_tab)
+
+        # Bind the "Ctrl" + "Z" / "Ctrl" + "Y" key combinations to undo / redo
+        self.text_zone.bind("<Control-z>", self.undo)
+        self.text_zone.bind("<Control-y>", self.redo)
+
+        # Bind the measure key combinations
+        self.text_zone.bind("<Control-g>", self.goto_measure)
+        self.text_zone.bind("<Control-m>", self.select_measure)
+        self.text_zone.bind("<Control-d>", self.duplicate_measures)
+        self.text_zone.bind("<Alt-Left>", lambda event: self.move_measures(-1))
+        self.text_zone.bind("<Alt-Right>", lambda event: self.move_measures(1))
+
+        # Bind the file key combinations
+        self.root.bind("<Control-o>", self.open_file)
+        self.root.bind("<Control-s>", self.save_file)
+        self.text_zone.bind("<Control-Prior>", self.previous_system)
+        self.text_zone.bind("<Control-Next>", self.next_system)
+
+        # Ask before losing the edits of an opened tab file
+        self.root.protocol("WM_DELETE_WINDOW", self.quit)
+
+        return
+    # end of function
+
+
+    ##############################
+    # PRIVATE FUNCTIONS
+    ##############################
+    def on_key_press(self, event):
+        """
+        Handle key press events: the key is converted into one edit command applied to
+        the tab model, and Tk does not insert the character.
+
+        :param event: The key press event.
+        :return: "break" if the key has been handled.
+        """
+        # Get the cursor position
+        cell = self.cursor_cell()
+        if cell is None:
+            # Not on a string: let Tk handle the key
+            return None
+        # else: on a string
+        cursor_row, cursor_col = cell
+
+        # Del / Backspace on a block selection: delete the block at once
+        if event.keysym in ('Delete', 'BackSpace') and not event.state & CONTROL_MASK \
+                and self.selected_block() is not None:
+            return self.delete_selection(whole_columns=bool(event.state & SHIFT_MASK))
+        # else: not a block deletion
+
+        # Display the current keycode, current char, current state
+        # print(f"Keycode: {event.keycode}, Char: {event.char}, State: {event.state}")
+
+        command = command_from_key(event.char, event.keycode, event.state,
+                                   cursor_row, cursor_col, event.keysym)
+        if command is None:
+            # Not a character to handle: display the pending edits, then let Tk handle the key
+            self.flush_pending()
+            return None
+        # else: edit of the tab
+
+        if self.recorder is not None:
+            self.recorder.key(event, cursor_row, cursor_col)
+        # else: no recording
+
+        if self.coalesce_ms is None:
+            self.apply_command(command)
+        else:
+            self.queue_command(command)
+        # endif
+
+        return "break"
+    # end of function
+
+
+    def on_key_release(self, event): # pylint: disable=unused-argument
+        """
+        Handle key release events: resynchronize the tab model if Tk modified the text
+        (keys not handled by on_key_press, e.g. backspace or paste).
+
+        :param event: The key release event.
+        """
+        version = self.document.version
+        self.view.resync()
+
+        if self.recorder is not None and self.document.version != version:
+            self.recorder.text(self.document.lines())
+        # else: no recording, or text not modified by Tk
+
+        self.update_measure()
+
+        return
+    # end of function
+
+
+    def cursor_cell(self):
+        """
+        Get the cell of the tab at the cursor.
+
+        :return: (row, col), or None if the cursor is not on a string.
+        """
+        if self.flush_id is not None:
+            # Edits are pending: the Text widget is not up to date
+            return (self.editor.row, self.editor.col)
+        # else: the Text widget displays the tab
+
+        return self.view.cell_at(self.text_zone.index("insert"))
+    # end of function
+
+
+    def apply_command(self, command):
+        """
+        Apply an edit command to the tab model and move the cursor.
+
+        :param command: The EditCommand.
+        """
+        cursor_row, cursor_col = self.editor.apply(command)
+
+        # Restore the cursor position
+        self.set_cursor(cursor_row, cursor_col)
+
+        return
+    # end of function
+
+
+    def set_cursor(self, row, col):
+        """
+        Move the cursor to a cell of the tab (the window of the view follows it).
+
+        :param row: The string index.
+        :param col: The column index in the tab.
+        """
+        self.view.show(col)
+        self.text_zone.mark_set("insert", self.view.index(row, col))
+        self.text_zone.see("insert")
+
+        return
+    # end of function
+
+
+    def set_layout(self, enabled):
+        """
+        Display the tab as stacked staff systems broken at the bars (auto-layout), or as
+        one system.
+
+        :param enabled: True for the auto-layout.
+        """
+        self.flush_pending()
+        cell = self.view.cell_at(self.text_zone.index("insert"))
+
+        self.highlighter.detach()
+        self.view.detach()
+        if enabled:
+            self.view = TabLayoutView(self.text_zone, self.document, self.system_columns)
+            self.h_scrollbar.pack_forget()
+            self.text_zone.config(height=LAYOUT_HEIGHT)
+        else:
+            self.view = TabView(self.text_zone, self.document, self.window)
+            if self.window is not None:
+                self.h_scrollbar.pack(fill="x", after=self.text_zone)
+                self.view.xscrollcommand = self.h_scrollbar.set
+            # else: the text zone holds the whole tab
+            self.text_zone.config(height=self.document.nb_strings)
+        # endif
+        self.view.render()
+        self.highlighter = TabHighlighter(self.view, self.text_zone.after_idle)
+
+        if cell is not None:
+            self.set_cursor(*cell)
+        else:
+            self.set_cursor(0, self.document.width)
+        # endif
+
+        return
+    # end of function
+
+
+    def queue_command(self, command):
+        """
+        Apply an edit command to the tab model, and schedule the display of all the
+        pending edits at once (keystroke coalescing).
+
+        :param command: The EditCommand.
+        """
+        self.view.begin_batch()
+        self.editor.apply(command)
+
+        if self.flush_id is None:
+            if self.coalesce_ms:
+                self.flush_id = self.root.after(self.coalesce_ms, self.flush_pending)
+            else:
+                self.flush_id = self.root.after_idle(self.flush_pending)
+            # endif
+        # else: already scheduled
+
+        return
+    # end of function
+
+
+    def flush_pending(self, event=None): # pylint: disable=unused-argument
+        """
+        Display the pending edits (keystroke coalescing) and move the cursor.
+        """
+        if self.flush_id is None:
+            return
+        # else: edits are pending
+
+        self.root.after_cancel(self.flush_id)
+        self.flush_id = None
+        self.view.end_batch()
+
+        # Restore the cursor position
+        self.set_cursor(self.editor.row, self.editor.col)
+
+        return
+    # end of function
+
+
+    def clear_tab(self, event=None): # pylint: disable=unused-argument
+        """
+        Clear the tab by restoring its content to the initial state.
+        """
+        self.flush_pending()
+        self.document.set_lines(INITIAL_TAB.split('\n'))
+        if self.recorder is not None:
+            self.recorder.action(ACTION_CLEAR)
+        # else: no recording
+
+        # Set the cursor to the end of the first line
+        self.text_zone.mark_set("insert", "1.end")
+        self.text_zone.see("insert")
+
+        return
+    # end of function
+
+
+    def decrement_octave(self):
+        """
+        Decrement all numbers in the tab by 12.
+        """
+        self.transpose_tab(-OCTAVE)
+
+        return
+    # end of function
+
+
+    def increment_octave(self):
+        """
+        Increment all numbers in the tab by 12.
+        """
+        self.transpose_tab(OCTAVE)
+
+        return
+    # end of function
+
+
+
+    ##############################
+    # PUBLIC FUNCTIONS
+    ##############################
+    def transpose_tab(self, semitones):
+        """
+        Transpose the tab by a number of semitones.
+
+        :param semitones: The number of semitones (negative to go down).
+        """
+        self.flush_pending()
+
+        try:
+            l_lines = transpose_lines(self.document.lines(), semitones)
+        except TransposeError as l_error:
+            # Notes would be lost: keep the tab unchanged
+            messagebox.showwarning(APP_TITLE, str(l_error))
+            return
+        # end try
+
+        # Update the tab model (mirrored in the text zone)
+        self.document.set_lines(l_lines)
+        if self.recorder is not None:
+            self.recorder.action(ACTION_TRANSPOSE, semitones)
+        # else: no recording
+
+        return
+    # end of function
+
+
+    def undo(self, event=None): # pylint: disable=unused-argument
+        """
+        Undo the last edit (note, column deletion, transposition, clear...).
+
+        :return: "break" to prevent the default binding of the Text widget.
+        """
+        self.flush_pending()
+
+        col = self.history.undo()
+        if col is not None:
+            if self.recorder is not None:
+                self.recorder.action(ACTION_UNDO)
+            # else: no recording
+
+            # Set the cursor to the undone change
+            self.set_cursor(self.editor.row, col)
+        # else: nothing to undo
+
+        return "break"
+    # end of function
+
+
+    def redo(self, event=None): # pylint: disable=unused-argument
+        """
+        Redo the last undone edit.
+
+        :return: "break" to prevent the default binding of the Text widget.
+        """
+        self.flush_pending()
+
+        col = self.history.redo()
+        if col is not None:
+            if self.recorder is not None:
+                self.recorder.action(ACTION_REDO)
+            # else: no recording
+
+            # Set the cursor after the redone change
+            self.set_cursor(self.editor.row, col)
+        # else: nothing to redo
+
+        return "break"
+    # end of function
+
+
+    def open_file(self, event=None): # pylint: disable=unused-argument
+        """
+        Ask for a tab file and display its first staff system.
+        """
+        path = filedialog.askopenfilename(filetypes=[("Text Files", "*.txt"),
+                                                     ("Binary Tabs", f"*{BINARY_EXTENSION}"),
+                                                     ("All Files", "*.*")])
+        if path.lower().endswith(BINARY_EXTENSION):
+            self.open_binary(path)
+        elif path:
+            self.open_archive(path)
+        # else: cancelled
+
+        return "break"
+    # end of function
+
+
+    def open_archive(self, path, system_index=0):
+        """
+        Open a tab file (memory-mapped, see tab_archive) and display one of its staff systems.
+
+        :param path: The file path.
+        :param system_index: The staff system to display (from 0).
+        """
+        self.flush_pending()
+        if not self.confirm_close_archive():
+            return
+        # else: no edits to lose
+
+        try:
+            archive = TabArchive(path)
+        except OSError as l_error:
+            messagebox.showerror(APP_TITLE, str(l_error))
+            return
+        # end try
+        if not archive.has_system(system_index):
+            archive.close()
+            messagebox.showwarning(APP_TITLE, f"{path}: no staff system {system_index + 1}")
+            return
+        # else: system to display
+
+        self.close_archive()
+        self.archive = archive
+        self.archive_edits = {}
+        self.load_system(system_index)
+
+        return
+    # end of function
+
+
+    def open_binary(self, path):
+        """
+        Open a binary tab file (memory-mapped, see tab_binary) and display the whole tab.
+
+        :param path: The file path.
+        """
+        self.flush_pending()
+        if not self.confirm_close_archive():
+            return
+        # else: no edits to lose
+
+        try:
+            document = load_binary(path)
+        except (OSError, BinaryFormatError) as l_error:
+            messagebox.showerror(APP_TITLE, str(l_error))
+            return
+        # end try
+
+        self.close_archive()
+        lines = document.lines()
+        nb_strings = self.document.nb_strings
+        lines = lines[:nb_strings] + [f'{STRINGS[row % len(STRINGS)]}|'
+                                      for row in range(len(lines), nb_strings)]
+        self.document.set_lines(lines)
+        self.history.clear()
+        self.root.title(f"{APP_TITLE} - {os.path.basename(path)}")
+
+        # Set the cursor to the end of the first line
+        self.text_zone.mark_set("insert", "1.end")
+        self.text_zone.see("insert")
+
+        return
+    # end of function
+
+
+    def save_file(self, event=None): # pylint: disable=unused-argument
+        """
+        Ask for a file name and save the tab in the binary format (see tab_binary).
+        """
+        path = filedialog.asksaveasfilename(defaultextension=BINARY_EXTENSION,
+                                            filetypes=[("Binary Tabs", f"*{BINARY_EXTENSION}")])
+        if not path:
+            return "break"
+        # else: file chosen
+
+        self.flush_pending()
+        try:
+            save_binary(self.document, path)
+        except OSError as l_error:
+            messagebox.showerror(APP_TITLE, str(l_error))
+        # end try
+
+        return "break"
+    # end of function
+
+
+    def archive_modified(self):
+        """
+        Check if the opened tab file has edits not saved yet.
+        """
+        return self.archive is not None and \
+            (bool(self.archive_edits) or self.document.version != self.system_version)
+    # end of function
+
+
+    def save_archive(self, event=None): # pylint: disable=unused-argument
+        """
+        Save the edited staff systems in the opened tab file (see tab_archive).
+
+        :return: True if the edits have been saved.
+        """
+        if self.archive is None:
+            self.root.bell()
+            return False
+        # else: opened file
+
+        self.flush_pending()
+        edits = dict(self.archive_edits)
+        if self.document.version != self.system_version:
+            edits[self.system_index] = self.document.lines()
+        # else: displayed system not edited
+
+        # The strings added to display a system are not saved, and the strings of the
+        # file beyond the displayed ones are kept
+        for index, lines in edits.items():
+            original = self.archive.system_lines(index)
+            edits[index] = lines[:len(original)] + original[len(lines):]
+        # end for
+        try:
+            self.archive.save(edits)
+        except OSError as l_error:
+            messagebox.showerror(APP_TITLE, str(l_error))
+            return False
+        # end try
+        self.archive_edits = {}
+        self.system_version = self.document.version
+
+        return True
+    # end of function
+
+
+    def confirm_close_archive(self):
+        """
+        Ask whether to save the edits of the opened tab file before closing it.
+
+        :return: False if the user cancelled (the file stays open).
+        """
+        if not self.archive_modified():
+            return True
+        # else: edits to save or to discard
+
+        answer = messagebox.askyesnocancel(
+            APP_TITLE, f"Save the edits of {os.path.basename(self.archive.path)}?")
+        if answer is None:
+            return False
+        # else: save or discard
+
+        return self.save_archive() if answer else True
+    # end of function
+
+
+    def quit(self):
+        """
+        Close the application (after saving the edits of the opened tab file, if asked).
+        """
+        if self.confirm_close_archive():
+            self.root.destroy()
+        # else: cancelled
+
+        return
+    # end of function
+
+
+    def close_archive(self):
+        """
+        Close the opened tab file (the displayed tab is kept).
+        """
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+            self.root.title(APP_TITLE)
+        # else: no opened file
+
+        return
+    # end of function
+
+
+    def load_system(self, system_index):
+        """
+        Display a staff system of the opened file. The edits of the displayed system are
+        kept (in memory) when moving to another one.
+
+        :param system_index: The staff system (from 0).
+        """
+        if self.archive is None or not self.archive.has_system(system_index):
+            self.root.bell()
+            return
+        # else: existing system
+
+        self.flush_pending()
+        if self.document.version != self.system_version:
+            self.archive_edits[self.system_index] = self.document.lines()
+        # else: system not edited
+
+        lines = self.archive_edits.get(system_index) or self.archive.system_lines(system_index)
+        nb_strings = self.document.nb_strings
+        lines = lines[:nb_strings] + [f'{STRINGS[row % len(STRINGS)]}|'
+                                      for row in range(len(lines), nb_strings)]
+        self.document.set_lines(lines)
+        self.history.clear()
+        self.system_index = system_index
+        self.system_version = self.document.version
+
+        total = f"{self.archive.indexed_systems()}{'' if self.archive.complete else '+'}"
+        self.root.title(f"{APP_TITLE} - {os.path.basename(self.archive.path)} "
+                        f"({system_index + 1}/{total})")
+
+        # Set the cursor to the end of the first line
+        self.text_zone.mark_set("insert", "1.end")
+        self.text_zone.see("insert")
+
+        return
+    # end of function
+
+
+    def previous_system(self, event=None): # pylint: disable=unused-argument
+        """
+        Display the previous staff system of the opened file.
+        """
+        self.load_system(self.system_index - 1)
+
+        return "break"
+    # end of function
+
+
+    def next_system(self, event=None): # pylint: disable=unused-argument
+        """
+        Display the next staff system of the opened file.
+        """
+        self.load_system(self.system_index + 1)
+
+        return "break"
+    # end of function
+
+
+    def copy_tab(self):
+        """
+        Copy its content to the clipboard.
+        """
+        self.flush_pending()
+
+        # Get the content of the tab (cached until the next edit)
+        tab_content = self.exporter.export(self.export_style())
+
+        # # Save the content to a file
+        # file_path = asksaveasfilename(
+            # defaultextension=".txt",
+            # filetypes=[("Text Files", "*.txt")])
+        # if file_path:
+        #     with open(file_path, "w", encoding="utf-8") as file:
+        #         file.write(tab_content)
+
+        # Save the content to the clipboard
+        # Copy the tab content to the clipboard (worker thread, skipped while being copied)
+        self.io_worker.copy(tab_content, self.report_io)
+
+        return
+
+
+    def export_style(self):
+        """
+        Get the ExportStyle selected in the Export menu (the wrapped systems have the width
+        of the auto-layout).
+        """
+        style = EXPORT_STYLES[self.export_var.get()]
+        if self.export_var.get() == STYLE_WRAPPED:
+            style = style._replace(wrap=self.system_columns)
+        # else: style without systems
+
+        return style
+    # end of function
+
+
+    def export_file(self):
+        """
+        Ask for a file name and save the tab as text, in the style of the Export menu.
+        """
+        path = filedialog.asksaveasfilename(defaultextension=".txt",
+                                            filetypes=[("Text Files", "*.txt")])
+        if not path:
+            return
+        # else: file chosen
+
+        self.flush_pending()
+        try:
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(self.exporter.export(self.export_style()) + '\n')
+            # end with
+        except OSError as l_error:
+            messagebox.showerror(APP_TITLE, str(l_error))
+        # end try
+
+        return
+    # end of function
+
+
+    def process_tab(self):
+        """
+        Process the tab by converting it into standard notation (LilyPond source, see
+        tab_notation), displayed in the notation window.
+        """
+        self.flush_pending()
+
+        # Only the measures modified since the last conversion are converted again
+        source = self.notation.render()
+        NotationWindow(self.root, source, lambda text: self.io_worker.copy(text, self.report_io))
+
+        return
+
+
+    def report_io(self, result, error): # pylint: disable=unused-argument
+        """
+        Report the failure of a clipboard copy (see tab_io).
+
+        :param result: The result of the call.
+        :param error: The exception raised by the call, or None.
+        """
+        if error is not None:
+            messagebox.showwarning(APP_TITLE, str(error))
+        # else: success
+
+        return
+    # end of function
+
+
+    def update_measure(self, event=None): # pylint: disable=unused-argument
+        """
+        Display the measure of the cursor (the label is only updated when it changes).
+        """
+        cell = self.cursor_cell()
+        nb_measures = len(self.measures)
+        if cell is None:
+            text = f"{nb_measures} measures"
+        else:
+            measure = max(self.measures.measure_at(cell[1]), 1)
+            text = f"Measure {measure}/{max(nb_measures, measure)}"
+        # endif
+
+        if text != self.measure_text:
+            self.measure_text = text
+            self.measure_label.config(text=text)
+        # else: same measure
+
+        return
+    # end of function
+
+
+    def goto_measure(self, event=None): # pylint: disable=unused-argument
+        """
+        Move the cursor to the first column of a measure, asked to the user.
+
+        :return: "break" to prevent the default binding of the Text widget.
+        """
+        self.flush_pending()
+        nb_measures = len(self.measures)
+        if nb_measures == 0:
+            return "break"
+        # else: at least one measure
+
+        measure = simpledialog.askinteger(APP_TITLE, f"Measure (1 - {nb_measures}):",
+                                          parent=self.root, minvalue=1, maxvalue=nb_measures)
+        if measure is not None:
+            cell = self.cursor_cell()
+            self.set_cursor(cell[0] if cell is not None else 0,
+                            self.measures.measure_start(measure))
+            self.update_measure()
+        # else: cancelled
+        self.text_zone.focus_set()
+
+        return "break"
+    # end of function
+
+
+    def select_measure(self, event=None): # pylint: disable=unused-argument
+        """
+        Select the measure of the cursor (with its closing bar) on every string.
+
+        :return: "break" to prevent the default binding of the Text widget.
+        """
+        self.flush_pending()
+        cell = self.cursor_cell()
+        if cell is not None:
+            try:
+                start, end = self.measures.measure_range(max(self.measures.measure_at(cell[1]), 1))
+            except IndexError:
+                # Only the string names: no measure
+                return "break"
+            # end try
+            self.view.select_columns(start, end)
+        # else: not on a string
+
+        return "break"
+    # end of function
+
+
+    def selected_measures(self):
+        """
+        Get the measures of the selection, or the measure of the cursor.
+
+        :return: (first measure, last measure), or None if there is no measure.
+        """
+        cells = []
+        if self.text_zone.tag_ranges("sel"):
+            cells = [self.view.cell_at(self.text_zone.index("sel.first")),
+                     self.view.cell_at(self.text_zone.index("sel.last-1c"))]
+        # else: no selection
+        if not cells or None in cells:
+            cells = [self.cursor_cell()] * 2
+        # else: selection on the strings
+        if cells[0] is None:
+            return None
+        # else: on a string
+
+        first = max(self.measures.measure_at(cells[0][1]), 1)
+        last = min(self.measures.measure_at(cells[1][1]), len(self.measures))
+        if first > last:
+            return None
+        # else: at least one measure
+
+        return (first, last)
+    # end of function
+
+
+    def edit_measures(self, operation, *args):
+        """
+        Apply a bulk measure operation: the measures are rewritten as one slice of
+        columns, so the tab is displayed (and undone) once.
+
+        :param operation: One of the OP_* constants of tab_measures.
+        :param args: The measures and the argument of the operation.
+        :return: The column of the cursor after the operation (None if not applied).
+        """
+        self.flush_pending()
+        cell = self.cursor_cell()
+        try:
+            col = MEASURE_OPERATIONS[operation](self.measures, *args)
+        except IndexError:
+            # No such measures
+            return None
+        # end try
+
+        if self.recorder is not None:
+            self.recorder.action(ACTION_MEASURES, operation, *args)
+        # else: no recording
+
+        self.text_zone.tag_remove("sel", "1.0", "end")
+        self.set_cursor(cell[0] if cell is not None else 0, col)
+        self.update_measure()
+
+        return col
+    # end of function
+
+
+    def duplicate_measures(self, event=None): # pylint: disable=unused-argument
+        """
+        Repeat the selected measures a number of times, asked to the user.
+
+        :return: "break" to prevent the default binding of the Text widget.
+        """
+        selection = self.selected_measures()
+        if selection is not None:
+            times = simpledialog.askinteger(APP_TITLE, "Number of copies:", parent=self.root,
+                                            initialvalue=1, minvalue=1)
+            if times is not None:
+                self.edit_measures(OP_DUPLICATE, *selection, times)
+            # else: cancelled
+            self.text_zone.focus_set()
+        # else: no measure
+
+        return "break"
+    # end of function
+
+
+    def delete_measures(self):
+        """
+        Delete the selected measures.
+        """
+        selection = self.selected_measures()
+        if selection is not None:
+            self.edit_measures(OP_DELETE, *selection)
+        # else: no measure
+
+        return
+    # end of function
+
+
+    def move_measures(self, offset):
+        """
+        Move the selected measures by one measure (they stay selected, so that they can be
+        moved again).
+
+        :param offset: -1 to move them left, 1 to move them right.
+        :return: "break" to prevent the default binding of the Text widget.
+        """
+        selection = self.selected_measures()
+        if selection is None:
+            return "break"
+        # else: measures to move
+
+        first, last = selection
+        dest = first - 1 if offset < 0 else last + 2
+        if 1 <= dest <= len(self.measures) + 1 \
+                and self.edit_measures(OP_MOVE, first, last, dest) is not None:
+            start = self.measures.measure_start(first + offset)
+            self.view.select_columns(start, self.measures.measure_range(last + offset)[1])
+        # else: already at the start or at the end
+
+        return "break"
+    # end of function
+
+
+    def swap_measures(self):
+        """
+        Swap the measure of the cursor with another one, asked to the user.
+        """
+        selection = self.selected_measures()
+        if selection is not None:
+            other = simpledialog.askinteger(APP_TITLE, "Swap with measure:", parent=self.root,
+                                            minvalue=1, maxvalue=len(self.measures))
+            if other is not None:
+                self.edit_measures(OP_SWAP, selection[0], other)
+            # else: cancelled
+            self.text_zone.focus_set()
+        # else: no measure
+
+        return
+    # end of function
+
+
+    def selected_block(self):
+        """
+        Get the rectangular block between the corners of the selection.
+
+        :return: (first string, last string, first column, column after the last one), or
+                 None if nothing is selected on the strings.
+        """
+        if not self.text_zone.tag_ranges("sel"):
+            return None
+        # else: selection
+        first = self.view.cell_at(self.text_zone.index("sel.first"))
+        last = self.view.cell_at(self.text_zone.index("sel.last-1c"))
+        if first is None or last is None:
+            return None
+        # else: selection on the strings
+
+        # The string names and the first bar cannot be edited
+        start = max(min(first[1], last[1]), PREFIX_COLUMNS)
+        end = min(max(first[1], last[1]) + 1, self.document.width)
+        if start >= end:
+            return None
+        # else: at least one column
+
+        return (min(first[0], last[0]), max(first[0], last[0]), start, end)
+    # end of function
+
+
+    def on_selection(self, event=None): # pylint: disable=unused-argument
+        """
+        Display the selection as a rectangular block (one range per string).
+        """
+        block = self.selected_block()
+        if block is not None and block != self.block_shown and block[0] != block[1]:
+            self.block_shown = block
+            first_row, last_row, start, end = block
+            self.view.select_columns(start, end, first_row, last_row)
+        # else: no selection, already displayed, or one string
+
+        return
+    # end of function
+
+
+    def copy_selection(self, event=None): # pylint: disable=unused-argument
+        """
+        Copy the selected block (it is also copied to the clipboard as text).
+
+        :return: "break" if a block has been copied (otherwise Tk copies the selection).
+        """
+        block = self.selected_block()
+        if block is None:
+            return None
+        # else: block of the tab
+
+        first_row, last_row, start, end = block
+        self.block = copy_block(self.document, first_row, last_row, start, end)
+        self.block_text = '\n'.join(self.block.lines())
+        self.root.clipboard_clear()
+        self.root.clipboard_append(self.block_text)
+        self.io_worker.forget_copy()
+
+        return "break"
+    # end of function
+
+
+    def cut_selection(self, event=None): # pylint: disable=unused-argument
+        """
+        Copy the selected block, then delete it.
+
+        :return: "break" if a block has been cut (otherwise Tk cuts the selection).
+        """
+        if self.copy_selection() is None:
+            return None
+        # else: block copied
+
+        return self.delete_selection()
+    # end of function
+
+
+    def delete_selection(self, whole_columns=False):
+        """
+        Delete the selected block as one edit: its columns if it holds all the strings
+        (or whole_columns is set), otherwise its cells are replaced by '-'.
+
+        :param whole_columns: True to delete the columns on all the strings (Shift + Del).
+        :return: "break" to prevent the default binding of the Text widget.
+        """
+        self.flush_pending()
+        block = self.selected_block()
+        if block is None:
+            return "break"
+        # else: block to delete
+
+        first_row, last_row, start, end = block
+        if whole_columns:
+            first_row, last_row = 0, self.document.nb_strings - 1
+        # else: strings of the block
+        col = delete_block(self.document, first_row, last_row, start, end)
+
+        if self.recorder is not None:
+            self.recorder.action(ACTION_DELETE_BLOCK, first_row, last_row, start, end)
+        # else: no recording
+
+        self.text_zone.tag_remove("sel", "1.0", "end")
+        self.block_shown = None
+        self.set_cursor(first_row, col)
+        self.update_measure()
+
+        return "break"
+    # end of function
+
+
+    def paste_selection(self, event=None): # pylint: disable=unused-argument
+        """
+        Paste the copied block, or a tab of the clipboard, at the cursor, in new columns.
+        A pasted tab is aligned and padded in one pass, and inserted as one edit.
+
+        :return: "break" if a block has been pasted (otherwise Tk pastes the clipboard).
+        """
+        cell = self.cursor_cell()
+        if cell is None:
+            # Not on a string
+            return None
+        # else: on a string
+        try:
+            text = self.root.clipboard_get()
+        except TclError:
+            # Empty clipboard
+            return None
+        # end try
+
+        if self.block is not None and text == self.block_text:
+            block = self.block
+        else:
+            block = block_from_text(text, self.document.nb_strings)
+            if block is None:
+                # Not a tab
+                return None
+            # else: tab pasted from another application
+        # endif
+
+        self.flush_pending()
+        row = cell[0] if block.height < self.document.nb_strings else 0
+        col = max(cell[1], PREFIX_COLUMNS)
+        end = paste_block(self.document, block, row, col)
+
+        if self.recorder is not None:
+            self.recorder.action(ACTION_PASTE_BLOCK, row, col, block.lines())
+        # else: no recording
+
+        self.text_zone.tag_remove("sel", "1.0", "end")
+        self.set_cursor(cell[0], end)
+        self.update_measure()
+
+        return "break"
+    # end of function
+
+
+    def autosave(self):
+        """
+        Write the journal of the last edits, periodically.
+        """
+        try:
+            self.journal.flush()
+        except OSError as l_error:
+            print(f"Autosave failed: {l_error}", file=sys.stderr)
+        # end try
+        self.root.after(AUTOSAVE_MS, self.autosave)
+
+        return
+    # end of function
+
+
+    def update_status(self):
+        """
+        Display the latency of the last handler in the status bar, periodically (so
+        that the status bar does not slow the handlers down).
+        """
+        self.status_label.config(text=self.profiler.status_text())
+        self.root.after(STATUS_PERIOD_MS, self.update_status)
+
+        return
+    # end of function
+
+
+    def open_help_window(self, event=None): # pylint: disable=unused-argument
+        """
+        Open the help window.
+        """
+        HelpWindow(self.root)
+        
+        return
+    # end of function
+
+#end class
+
+
+
+##################
+# MAIN FUNCTION
+##################
+def run_gui(open_args=None, profile_modes=None):
+    """
+    Open the editor, until its window is closed.
+
+    :param open_args: Optional arguments of the "open FILE [--system N]" command (see tab_cli).
+    :param profile_modes: Optional profiling modes of --profile[=MODES] (see tab_profiler).
+    """
+    profiler = profiler_from_env(os.environ, profile_modes)
+    root = Tk()
+    coalesce_ms = os.environ.get(COALESCE_ENV)
+    window = os.environ.get(WINDOW_ENV)
+    system_columns = os.environ.get(LAYOUT_ENV)
+    app = GuitarTabWriter(root, int(coalesce_ms) if coalesce_ms else None, profiler,
+                          os.environ.get(RECORD_ENV), autosave_directory(os.environ),
+                          int(window) if window else WINDOW_COLUMNS,
+                          int(system_columns) if system_columns else None)
+    if open_args is not None:
+        app.open_archive(open_args.path, open_args.system - 1)
+    # else: no file to open
+    try:
+        root.mainloop()
+    finally:
+        app.io_worker.close()
+        if app.archive is not None:
+            app.archive.close()
+        # else: no opened file
+        if app.journal is not None:
+            # Write the last edits and compact the journal
+            app.journal.close()
+        # else: no autosave
+        if app.recorder is not None:
+            # Write the final tab of the session (the model holds the pending edits)
+            app.recorder.close()
+        # else: no recording
+        if profiler is not None:
+            # Write the statistics on exit
+            profiler.dump()
+            print(f"Profile written to {os.path.abspath(profiler.output)}", file=sys.stderr)
+        # else: no profiling
+    # end try
+
+    return
+# end function
+
+# End of file
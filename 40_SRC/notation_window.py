@@ -0,0 +1,101 @@
+"""
+Notation Window Module
+
+USE:
+    This module provides the notation window of the Guitar Tab Writer application: it
+    displays the LilyPond source of the tab (see tab_notation), which can be copied to the
+    clipboard or saved in a .ly file.
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+from tkinter import Toplevel, Text, Button, Frame, filedialog, messagebox  # For GUI
+# APPLICATION libraries
+from tab_notation import NOTATION_EXTENSION  # For the LilyPond files
+
+
+###########
+# CONSTANTS
+###########
+WINDOW_TITLE = "Guitar Tab Writer: Notation"
+WINDOW_GEOMETRY = "700x450"
+
+
+##################
+# CLASS DEFINITION
+##################
+class NotationWindow:
+    """
+    Notation Window class that handles the GUI and functionality.
+    """
+    def __init__(self, parent, source, copy_function):
+        """
+        Initialize the Notation Window.
+
+        :param parent: The parent Tkinter window.
+        :param source: The LilyPond source of the tab.
+        :param copy_function: Function copying a text to the clipboard.
+        """
+        self.parent = parent
+        self.source = source
+        self.copy_function = copy_function
+
+        # Create the notation window
+        self.window = Toplevel(parent)
+        self.window.title(WINDOW_TITLE)
+        self.window.transient(parent)
+        self.window.geometry(WINDOW_GEOMETRY)
+
+        # Create the Buttons
+        l_buttons = Frame(self.window)
+        l_buttons.pack(side="bottom", pady=(5, 10))
+        Button(l_buttons, text="Copy", command=lambda: self.copy_function(self.source)) \
+            .pack(side="left", padx=5)
+        Button(l_buttons, text="Save...", command=self.save).pack(side="left", padx=5)
+        l_close_button = Button(l_buttons, text="Close", command=self.window.destroy,
+                                default="active")
+        l_close_button.pack(side="left", padx=5)
+
+        # Create a read-only Text for the LilyPond source
+        l_source_text = Text(self.window, font=("Courier", 10), wrap="none")
+        l_source_text.insert("1.0", source)
+        l_source_text.config(state="disabled")
+        l_source_text.pack(fill="both", expand=True, padx=10, pady=(10, 0))
+
+        # Set the focus to the Close Button
+        l_close_button.focus_set()
+
+        # Bind the "Escape" key to close the NotationWindow
+        self.window.bind("<Escape>", lambda event: self.window.destroy())
+
+        return
+    # end of function
+
+
+    def save(self):
+        """
+        Ask for a file name and save the LilyPond source.
+        """
+        l_path = filedialog.asksaveasfilename(
+            parent=self.window, defaultextension=NOTATION_EXTENSION,
+            filetypes=[("LilyPond Files", f"*{NOTATION_EXTENSION}")])
+        if not l_path:
+            return
+        # else: file chosen
+
+        try:
+            with open(l_path, "w", encoding="utf-8") as l_file:
+                l_file.write(self.source)
+            # end with
+        except OSError as l_error:
+            messagebox.showerror(WINDOW_TITLE, str(l_error), parent=self.window)
+        # end try
+
+        return
+    # end of function
+
+# end of class
+
+# End of file
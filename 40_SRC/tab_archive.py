@@ -0,0 +1,277 @@
+"""
+Tab Archive Module
+
+USE:
+    This module opens large tab files (e.g. a song book) without reading them at once.
+    The file is memory-mapped, and its staff systems (blocks of lines starting with a
+    string name followed by '|') are indexed lazily: the file is only scanned up to the
+    system being displayed, and only this system is decoded. Opening a multi-megabyte
+    archive therefore costs constant time and memory.
+    The edited systems are saved by copying the file, with their new lines in place of
+    the old ones (the other bytes are kept unchanged), then mapping the new file.
+        l_archive = TabArchive('songs.txt')
+        l_lines = l_archive.system_lines(0)
+        l_archive.save({0: l_new_lines})
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+import mmap                     # For the memory-mapped files
+import os                       # For the file replacement
+import re                       # For the staff systems detection
+import shutil                   # For the file permissions
+import tempfile                 # For the saved file
+from typing import NamedTuple   # For the system index
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+# Staff system: consecutive staff lines (as tab_document.STAFF_LINE_RE, on bytes)
+SYSTEM_RE = re.compile(rb'(?:^[A-Ga-g][#b]?\|[^\n]*\n?)+', re.MULTILINE)  # Constant => pylint: disable=C0103
+ENCODING = 'utf-8'  # Constant => pylint: disable=C0103
+COPY_CHUNK = 1 << 20  # Bytes copied at once when saving => pylint: disable=C0103
+
+
+##################
+# CLASS DEFINITION
+##################
+class SystemEntry(NamedTuple):
+    """
+    Position of a staff system in the file.
+
+    :param start: Offset of the first character.
+    :param end: Offset after the last character (end of line included).
+    :param line_nb: Line number of the first staff line (from 1).
+    """
+    start: int
+    end: int
+    line_nb: int
+# end of class
+
+
+class TabArchive:
+    """
+    Memory-mapped tab file with a lazy index of its staff systems.
+    """
+    def __init__(self, path):
+        """
+        Open and map a tab file (nothing is read yet).
+
+        :param path: The file path.
+        """
+        self.path = path
+        self._open()
+
+        return
+    # end of function
+
+
+    def _open(self):
+        """
+        Map the file, with an empty index.
+        """
+        self._file = open(self.path, 'rb')  # pylint: disable=consider-using-with
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file: nothing to map
+            self._map = b''
+        # end try
+        self._systems = []
+        self._scanner = SYSTEM_RE.finditer(self._map)
+        self._scan_pos = 0       # Offset up to which the line numbers are counted
+        self._scan_line = 1
+        self.complete = False    # True when the whole file has been indexed
+
+        return
+    # end of function
+
+
+    def __enter__(self):
+        return self
+    # end of function
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+    # end of function
+
+
+    @property
+    def size(self):
+        """
+        Size of the file in bytes.
+        """
+        return len(self._map)
+    # end of function
+
+
+    def _index_next(self):
+        """
+        Index the next staff system of the file.
+
+        :return: False if the end of the file has been reached.
+        """
+        if self.complete:
+            return False
+        # else: file not fully indexed
+
+        l_match = next(self._scanner, None)
+        if l_match is None:
+            self.complete = True
+            return False
+        # else: one more system
+
+        self._scan_line += self._map[self._scan_pos:l_match.start()].count(b'\n')
+        self._scan_pos = l_match.start()
+        self._systems.append(SystemEntry(l_match.start(), l_match.end(), self._scan_line))
+
+        return True
+    # end of function
+
+
+    def has_system(self, index):
+        """
+        Check if a staff system exists, indexing the file up to it.
+
+        :param index: The system index.
+        """
+        while len(self._systems) <= index and self._index_next():
+            pass
+        # end while
+
+        return 0 <= index < len(self._systems)
+    # end of function
+
+
+    def entry(self, index):
+        """
+        Get the position of a staff system.
+
+        :param index: The system index.
+        :return: The SystemEntry.
+        :raise IndexError: If the file has less systems.
+        """
+        if not self.has_system(index):
+            raise IndexError(f"{self.path}: no staff system {index + 1}")
+        # else: indexed system
+
+        return self._systems[index]
+    # end of function
+
+
+    def system_lines(self, index):
+        """
+        Decode the lines of a staff system.
+
+        :param index: The system index.
+        :return: The staff lines (without the end of line characters).
+        """
+        l_entry = self.entry(index)
+
+        return self._map[l_entry.start:l_entry.end].decode(ENCODING, errors='replace') \
+            .rstrip('\r\n').replace('\r', '').split('\n')
+    # end of function
+
+
+    def nb_systems(self):
+        """
+        Number of staff systems (indexes the whole file).
+        """
+        while self._index_next():
+            pass
+        # end while
+
+        return len(self._systems)
+    # end of function
+
+
+    def indexed_systems(self):
+        """
+        Number of staff systems indexed so far (the file may hold more).
+        """
+        return len(self._systems)
+    # end of function
+
+
+    def save(self, edits):
+        """
+        Write the edited staff systems in the file (with its end of lines), then map the new
+        file. The file is written to a temporary file first, which replaces it.
+
+        :param edits: Dictionary system index => new lines.
+        :raise OSError: If the file cannot be written (it is then unchanged).
+        """
+        l_newline = b'\r\n' if self._map[:self._map.find(b'\n') + 1].endswith(b'\r\n') \
+            else b'\n'
+        l_entries = [(self.entry(l_index), l_lines) for l_index, l_lines in sorted(edits.items())]
+        l_fd, l_tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)),
+                                       suffix='.tmp')
+        try:
+            with open(l_fd, 'wb') as l_file:
+                l_pos = 0
+                for l_entry, l_lines in l_entries:
+                    self._copy(l_file, l_pos, l_entry.start)
+                    l_file.write(l_newline.join(l_line.encode(ENCODING) for l_line in l_lines))
+                    if self._map[l_entry.end - 1:l_entry.end] == b'\n':
+                        l_file.write(l_newline)
+                    # else: system at the end of the file
+                    l_pos = l_entry.end
+                # end for
+                self._copy(l_file, l_pos, len(self._map))
+            # end with
+            # mkstemp creates the file for the owner only: keep the permissions of the file
+            shutil.copymode(self.path, l_tmp)
+            # The map must be closed before the file is replaced (Windows)
+            self.close()
+            os.replace(l_tmp, self.path)
+        except BaseException:
+            if os.path.exists(l_tmp):
+                os.remove(l_tmp)
+            # else: already renamed
+            raise
+        finally:
+            if self._file.closed:
+                self._open()
+            # else: file still mapped
+        # end try
+
+        return
+    # end of function
+
+
+    def _copy(self, file, start, end):
+        """
+        Copy bytes of the mapped file, chunk by chunk.
+
+        :param file: The destination file.
+        :param start: The first offset.
+        :param end: The offset after the last byte.
+        """
+        for l_pos in range(start, end, COPY_CHUNK):
+            file.write(self._map[l_pos:min(l_pos + COPY_CHUNK, end)])
+        # end for
+
+        return
+    # end of function
+
+
+    def close(self):
+        """
+        Unmap and close the file.
+        """
+        if isinstance(self._map, mmap.mmap):
+            self._scanner = iter(())
+            self._map.close()
+        # else: empty file
+        self._file.close()
+
+        return
+    # end of function
+
+# end of class
+
+# End of file
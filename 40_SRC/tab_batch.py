@@ -0,0 +1,305 @@
+"""
+Tab Batch Module
+
+USE:
+    This module provides the headless tab operations used by the command line:
+    transpose, normalize (dash-pad and align every string, like the editor does) and
+    validate. The staff systems of a text file are processed one by one with the same
+    functions as the GUI, and the other lines are kept unchanged.
+    Files are streamed: a system is read, processed and written before the next one is
+    read, so the memory used does not depend on the size of the file.
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+import os                       # For the file paths
+import shutil                   # For the file permissions
+import sys                      # For the standard streams
+import tempfile                 # For the in-place processing
+# APPLICATION libraries
+from tab_document import TabDocument, iter_blocks, STRINGS, BAR  # For the tab model
+from tab_tokenizer import TECHNIQUES                            # For the valid characters
+from tab_transpose import transpose_lines, TransposeError       # For the transposition
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+VALID_CHARS = frozenset('0123456789-' + BAR + TECHNIQUES)  # Constant => pylint: disable=C0103
+PREFIX_LEN = 2  # String name and first bar => pylint: disable=C0103
+
+# Commands
+CMD_TRANSPOSE = 'transpose'  # Constant => pylint: disable=C0103
+CMD_NORMALIZE = 'normalize'  # Constant => pylint: disable=C0103
+CMD_VALIDATE = 'validate'    # Constant => pylint: disable=C0103
+
+
+##################
+# FUNCTIONS
+##################
+def normalize_system(lines):
+    """
+    Align a staff system: short strings are padded with '-' (as in the editor).
+
+    :param lines: The staff lines.
+    :return: The aligned lines.
+    """
+    return TabDocument.from_lines(lines).lines()
+# end of function
+
+
+def transpose_system(lines, semitones):
+    """
+    Align and transpose a staff system (as the transpose buttons of the editor).
+
+    :param lines: The staff lines.
+    :param semitones: The number of semitones.
+    :return: The transposed lines.
+    :raise TransposeError: If a note would go out of the fretboard.
+    """
+    return transpose_lines(normalize_system(lines), semitones)
+# end of function
+
+
+def validate_system(lines, first_line_nb=1):
+    """
+    Check a staff system.
+
+    :param lines: The staff lines.
+    :param first_line_nb: Line number of the first staff line in the file.
+    :return: List of error messages (empty if the system is valid).
+    """
+    l_errors = []
+    if len(lines) != len(STRINGS):
+        l_errors.append(f"line {first_line_nb}: system of {len(lines)} strings "
+                        f"(expected {len(STRINGS)})")
+    # else: right number of strings
+
+    l_lengths = {len(l_line) for l_line in lines}
+    if len(l_lengths) > 1:
+        l_errors.append(f"line {first_line_nb}: strings not aligned "
+                        f"({min(l_lengths)} to {max(l_lengths)} columns)")
+    # else: aligned strings
+
+    l_bars = None
+    for l_nb, l_line in enumerate(lines, first_line_nb):
+        l_invalid = set(l_line[PREFIX_LEN:]) - VALID_CHARS
+        if l_invalid:
+            l_errors.append(f"line {l_nb}: invalid character(s) {''.join(sorted(l_invalid))!r}")
+        # else: valid characters
+
+        l_line_bars = {l_col for l_col, l_char in enumerate(l_line) if l_char == BAR}
+        l_bars = l_line_bars if l_bars is None else l_bars
+        if l_line_bars != l_bars:
+            l_errors.append(f"line {l_nb}: bars not aligned with line {first_line_nb}")
+        # else: same bars as the first string
+    # end for
+
+    return l_errors
+# end of function
+
+
+def process_lines(lines, system_function):
+    """
+    Apply a function to each staff system of a text, keeping the other lines.
+
+    :param lines: Iterable of lines (without the end of line characters).
+    :param system_function: Function called with the lines of a system, returning new lines.
+    :return: Iterator of the output lines.
+    """
+    for l_is_system, l_block in iter_blocks(lines):
+        if l_is_system:
+            yield from system_function(l_block)
+        else:
+            yield from l_block
+        # endif
+    # end for
+# end of function
+
+
+def validate_lines(lines):
+    """
+    Check all the staff systems of a text.
+
+    :param lines: Iterable of lines (without the end of line characters).
+    :return: List of error messages.
+    """
+    l_errors = []
+    l_line_nb = 1
+    for l_is_system, l_block in iter_blocks(lines):
+        if l_is_system:
+            l_errors.extend(validate_system(l_block, l_line_nb))
+        # else: not a staff system
+        l_line_nb += len(l_block)
+    # end for
+
+    return l_errors
+# end of function
+
+
+def iter_file_lines(file):
+    """
+    Read the lines of a text file one by one, without their end of line characters.
+    As str.split('\\n'), a file ending with an end of line gives a last empty line.
+
+    :param file: The file object (opened with newline='').
+    :return: Iterator of lines.
+    """
+    l_line = ''
+    for l_line in file:
+        yield l_line.rstrip('\r\n')
+    # end for
+    if l_line == '' or l_line[-1] in '\r\n':
+        yield ''
+    # else: no end of line at the end of the file
+# end of function
+
+
+def detect_newline(file):
+    """
+    Get the end of line characters of a text file, from its first line.
+
+    :param file: The file object (opened with newline='', seekable).
+    :return: '\\r\\n' or '\\n'.
+    """
+    l_first = file.readline()
+    file.seek(0)
+
+    return '\r\n' if l_first.endswith('\r\n') else '\n'
+# end of function
+
+
+def write_lines(lines, file, newline='\n'):
+    """
+    Write lines to a text file, one by one.
+
+    :param lines: Iterable of lines (without end of line characters).
+    :param file: The file object (opened with newline='').
+    :param newline: The end of line characters.
+    """
+    l_separator = ''
+    for l_line in lines:
+        file.write(l_separator + l_line)
+        l_separator = newline
+    # end for
+
+    return
+# end of function
+
+
+def stream_process(src_file, dst_file, system_function=None, newline='\n'):
+    """
+    Stream a tab text from a file to another one, one staff system at a time.
+
+    :param src_file: The source file object (opened with newline='').
+    :param dst_file: The destination file object (opened with newline='').
+    :param system_function: Function applied to each system (defaults to normalize_system).
+    :param newline: The end of line characters of the output.
+    """
+    write_lines(process_lines(iter_file_lines(src_file), system_function or normalize_system),
+                dst_file, newline)
+
+    return
+# end of function
+
+
+def normalize_file(src, dst, system_function=None):
+    """
+    Normalize a tab file (or apply another system function) with constant memory.
+    The destination may be the source: the result is then written to a temporary file
+    which replaces the source.
+
+    :param src: The source path ('-' for stdin).
+    :param dst: The destination path ('-' or None for stdout).
+    :param system_function: Function applied to each system (defaults to normalize_system).
+    """
+    if src == '-':
+        stream_process(sys.stdin, sys.stdout, system_function)
+        return
+    # else: source file
+
+    with open(src, 'r', encoding='utf-8', errors='replace', newline='') as l_src_file:
+        l_newline = detect_newline(l_src_file)
+        if dst in (None, '-'):
+            stream_process(l_src_file, sys.stdout, system_function, l_newline)
+            return
+        # else: destination file
+
+        l_dir = os.path.dirname(os.path.abspath(dst))
+        os.makedirs(l_dir, exist_ok=True)
+        l_fd, l_tmp = tempfile.mkstemp(dir=l_dir, suffix='.tmp')
+        try:
+            with open(l_fd, 'w', encoding='utf-8', newline='') as l_dst_file:
+                stream_process(l_src_file, l_dst_file, system_function, l_newline)
+            # end with
+            # mkstemp creates the file for the owner only: keep the permissions of the
+            # replaced file (or of the source for a new file)
+            shutil.copymode(dst if os.path.exists(dst) else src, l_tmp)
+        except BaseException:
+            os.remove(l_tmp)
+            raise
+        # end try
+    # end with
+    os.replace(l_tmp, dst)
+
+    return
+# end of function
+
+
+def run_task(task):
+    """
+    Process one file (worker of the process pool). A file that cannot be read or written
+    is reported as failed, so the next files of the batch are still processed.
+
+    :param task: (command, source path, destination path or None for stdout, semitones).
+    :return: (source path, number of bytes, error messages).
+    """
+    l_command, l_src, l_dst, l_semitones = task
+    try:
+        return process_file(l_command, l_src, l_dst, l_semitones)
+    except (OSError, UnicodeError) as l_error:
+        return (l_src, 0, [str(l_error)])
+    # end try
+# end of function
+
+
+def process_file(command, src, dst, semitones):
+    """
+    Process one file.
+
+    :param command: CMD_TRANSPOSE, CMD_NORMALIZE or CMD_VALIDATE.
+    :param src: The source path ('-' for stdin).
+    :param dst: The destination path (None for stdout).
+    :param semitones: The number of semitones (transposition).
+    :return: (source path, number of bytes, error messages).
+    :raise OSError: If the file cannot be read or written.
+    """
+    l_size = os.path.getsize(src) if src != '-' else 0
+
+    if command == CMD_VALIDATE:
+        if src == '-':
+            return (src, l_size, validate_lines(iter_file_lines(sys.stdin)))
+        # else: source file
+        with open(src, 'r', encoding='utf-8', errors='replace', newline='') as l_file:
+            return (src, l_size, validate_lines(iter_file_lines(l_file)))
+        # end with
+    # else: command writing a new text
+
+    if command == CMD_TRANSPOSE:
+        l_function = lambda l_system: transpose_system(l_system, semitones)  # pylint: disable=unnecessary-lambda-assignment
+    else:
+        l_function = normalize_system
+    # endif
+
+    try:
+        normalize_file(src, dst, l_function)
+    except TransposeError as l_error:
+        return (src, l_size, [str(l_error)])
+    # end try
+
+    return (src, l_size, [])
+# end of function
+
+# End of file
@@ -0,0 +1,909 @@
+"""
+Tab Benchmark Module
+
+USE:
+    This module measures the latency of the editing hot paths, without GUI: the Text
+    widget is replaced by a stub, and the key presses, Shift + Del, the keys handled by Tk
+    (backspace, then resync on key release) and octave changes go through the same model,
+    editor and view as in the application.
+    Each operation is timed on tabs of 100 to 100k columns, the results are written to a
+    JSON file and compared with a stored baseline.
+        python tab_benchmark.py [--sizes 100 1000] [--output results.json]
+                                [--baseline baseline.json] [--threshold 0.25]
+                                [--save-baseline]
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+import argparse                     # For the command line arguments
+import json                         # For the results files
+import os                           # For the file paths
+import platform                     # For the results metadata
+import sys                          # For the exit code
+import tempfile                     # For the binary files
+import time                         # For the measures
+import timeit                       # For the measures
+# APPLICATION libraries
+from tab_document import TabDocument, STRINGS   # For the tab model
+from tab_editor import TabEditor, command_from_key  # For the key presses
+from tab_tokenizer import tokenize              # For the comparison of the octave changes
+from tab_transpose import transpose_lines       # For the octave changes
+from tab_view import TabView                    # For the display of the tab model
+from tab_layout import TabLayoutView, SYSTEM_COLUMNS  # For the stacked systems display
+from tab_measures import MeasureIndex, duplicate_measures  # For the measure navigation
+from tab_block import copy_block, delete_block, paste_block, block_from_text  # For the blocks
+from tab_binary import save_binary, load_binary, BINARY_EXTENSION  # For the binary files
+from tab_notation import NotationRenderer       # For the standard notation
+from tab_export import TabExporter, EXPORT_STYLES, STYLE_WRAPPED  # For the copies
+from tab_highlight import TabHighlighter        # For the highlighting
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+BENCH_PATTERN = '-3--12-|-5h7-|'  # Constant => pylint: disable=C0103
+OCTAVE_PATTERN = '-15--12-|-17h19-|'  # Frets an octave up (12 to 21) => pylint: disable=C0103
+OCTAVE = 12  # Semitones => pylint: disable=C0103
+SIZES = [100, 1000, 10000, 100000]  # Constant => pylint: disable=C0103
+KEYSTROKES = 100  # Key presses timed per size => pylint: disable=C0103
+BURST = 1000  # Queued key presses of the coalescing burst => pylint: disable=C0103
+RIFF_MEASURES = 4  # Measures of the duplicated riff => pylint: disable=C0103
+RIFF_COPIES = 32   # Constant => pylint: disable=C0103
+BLOCK_COLUMNS = 50  # Columns of the cut and pasted block => pylint: disable=C0103
+REPEAT = 5  # Constant => pylint: disable=C0103
+THRESHOLD = 0.25  # Accepted slow down before a regression => pylint: disable=C0103
+MIN_DELTA_MS = 0.05  # Differences below this are noise => pylint: disable=C0103
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),  # Constant => pylint: disable=C0103
+                             'bench_baseline.json')
+WINDOW = 1000  # Columns of the virtualized view => pylint: disable=C0103
+KEY_DEL = 46    # Constant => pylint: disable=C0103
+SHIFT = 0x0001  # Constant => pylint: disable=C0103
+
+
+##################
+# CLASS DEFINITION
+##################
+class TextStub:
+    """
+    Minimal stand-in of the Tk Text widget ("line.char" indexes, with an optional "+Nc"
+    offset on the line), counting the calls. The tags are stored as in Tk: they move
+    with the text around them.
+    """
+    def __init__(self):
+        """
+        Initialize an empty text.
+        """
+        self.lines = ['']
+        self.tags = {}          # Tag => one bytearray per line (1: tagged character)
+        self.insert_mark = (1, 0)
+        self.modified = False
+        self.calls = 0
+
+        return
+    # end of function
+
+
+    def _position(self, index):
+        """
+        Convert an index into (line, char).
+
+        :param index: '1.0', 'end', 'end-1c', '3.end', 'insert' or 'line.char', then
+                      optionally '+Nc' (N characters further on the line).
+        """
+        if index in ('end', 'end-1c'):
+            return (len(self.lines), len(self.lines[-1]))
+        # else: not the end of the text
+        l_base, l_plus, l_offset = index.partition('+')
+        if l_base == 'insert':
+            l_line, l_char = self.insert_mark
+        else:
+            l_line, l_char = l_base.split('.')
+            l_line = min(int(l_line), len(self.lines))
+            l_char = len(self.lines[l_line - 1]) if l_char == 'end' else int(l_char)
+        # endif
+        if l_plus:
+            l_char += int(l_offset.rstrip('c'))
+        # else: no offset
+
+        return (l_line, min(l_char, len(self.lines[l_line - 1])))
+    # end of function
+
+
+    def index(self, index):
+        """
+        Get a "line.char" index.
+        """
+        return '{}.{}'.format(*self._position(index))
+    # end of function
+
+
+    def get(self, start, end=None):
+        """
+        Get the text between two indexes.
+        """
+        l_line, l_char = self._position(start)
+        if end is None:
+            return self.lines[l_line - 1][l_char:l_char + 1]
+        # else: range
+        l_end_line, l_end_char = self._position(end)
+        if l_line == l_end_line:
+            return self.lines[l_line - 1][l_char:l_end_char]
+        # else: several lines
+        return '\n'.join([self.lines[l_line - 1][l_char:]] + self.lines[l_line:l_end_line - 1]
+                         + [self.lines[l_end_line - 1][:l_end_char]])
+    # end of function
+
+
+    def insert(self, index, text):
+        """
+        Insert a text (not tagged).
+        """
+        self.calls += 1
+        l_line, l_char = self._position(index)
+        l_text = self.lines[l_line - 1]
+        l_new = (l_text[:l_char] + text + l_text[l_char:]).split('\n')
+        self.lines[l_line - 1:l_line] = l_new
+        l_parts = text.split('\n')
+        for l_arrays in self.tags.values():
+            l_array = l_arrays[l_line - 1]
+            l_new_arrays = [bytearray(len(l_part)) for l_part in l_parts]
+            l_new_arrays[0][:0] = l_array[:l_char]
+            l_new_arrays[-1] += l_array[l_char:]
+            l_arrays[l_line - 1:l_line] = l_new_arrays
+        # end for
+        self.modified = True
+
+        return
+    # end of function
+
+
+    def delete(self, start, end=None):
+        """
+        Delete a text.
+        """
+        self.calls += 1
+        self.modified = True
+        if start == '1.0' and end == 'end':
+            self.lines = ['']
+            self.tags = {}
+            return
+        # else: delete a range
+        l_line, l_char = self._position(start)
+        if end is None:
+            l_end_line, l_end_char = l_line, l_char + 1
+        else:
+            l_end_line, l_end_char = self._position(end)
+        # endif
+        self.lines[l_line - 1:l_end_line] = [self.lines[l_line - 1][:l_char]
+                                            + self.lines[l_end_line - 1][l_end_char:]]
+        for l_arrays in self.tags.values():
+            l_arrays[l_line - 1:l_end_line] = [l_arrays[l_line - 1][:l_char]
+                                               + l_arrays[l_end_line - 1][l_end_char:]]
+        # end for
+
+        return
+    # end of function
+
+
+    def mark_set(self, name, index): # pylint: disable=unused-argument
+        """
+        Move the insert mark.
+        """
+        self.insert_mark = self._position(index)
+
+        return
+    # end of function
+
+
+    def see(self, index): # pylint: disable=unused-argument
+        """
+        Nothing to scroll.
+        """
+        return
+    # end of function
+
+
+    def _set_tag(self, tag, indexes, value):
+        """
+        Set or clear a tag on ranges of characters.
+
+        :param tag: The tag.
+        :param indexes: Start and end indexes of the ranges (a last start alone: one char).
+        :param value: 1 to add the tag, 0 to remove it.
+        """
+        if tag not in self.tags:
+            if not value:
+                return
+            # else: new tag
+            self.tags[tag] = [bytearray(len(l_line)) for l_line in self.lines]
+        # else: known tag
+        l_arrays = self.tags[tag]
+        for l_pos in range(0, len(indexes), 2):
+            l_line, l_char = self._position(indexes[l_pos])
+            if l_pos + 1 < len(indexes):
+                l_end_line, l_end_char = self._position(indexes[l_pos + 1])
+            else:
+                l_end_line, l_end_char = l_line, l_char + 1
+            # endif
+            while (l_line, l_char) < (l_end_line, l_end_char):
+                l_end = l_end_char if l_line == l_end_line else len(self.lines[l_line - 1])
+                l_array = l_arrays[l_line - 1]
+                l_end = min(l_end, len(l_array))
+                l_array[l_char:l_end] = bytes([value]) * max(l_end - l_char, 0)
+                l_line, l_char = l_line + 1, 0
+            # end while
+        # end for
+
+        return
+    # end of function
+
+
+    def tag_add(self, tag, *indexes):
+        """
+        Add a tag to ranges of characters (start, end, start, end...).
+        """
+        self.calls += 1
+        self._set_tag(tag, indexes, 1)
+
+        return
+    # end of function
+
+
+    def tag_remove(self, tag, *indexes):
+        """
+        Remove a tag from ranges of characters (start, end, start, end...).
+        """
+        self.calls += 1
+        self._set_tag(tag, indexes, 0)
+
+        return
+    # end of function
+
+
+    def tag_ranges(self, tag):
+        """
+        Get the ranges of a tag, as Tk does: (start, end, start, end...).
+        """
+        l_ranges = []
+        for l_line, l_array in enumerate(self.tags.get(tag, ()), 1):
+            l_char = l_array.find(1)
+            while l_char >= 0:
+                l_end = l_array.find(0, l_char)
+                l_end = len(l_array) if l_end < 0 else l_end
+                l_ranges += [f'{l_line}.{l_char}', f'{l_line}.{l_end}']
+                l_char = l_array.find(1, l_end)
+            # end while
+        # end for
+
+        return tuple(l_ranges)
+    # end of function
+
+
+    def edit_modified(self, flag=None):
+        """
+        Get or set the modified flag.
+        """
+        if flag is None:
+            return self.modified
+        # else: set the flag
+        self.modified = flag
+
+        return None
+    # end of function
+
+# end of class
+
+
+class HeadlessEditor:
+    """
+    Model, editor and view of the application, on a Text stub.
+    """
+    def __init__(self, nb_columns, window=None, system_columns=None, highlight=False):
+        """
+        Build a tab of (about) a given number of columns.
+
+        :param nb_columns: The number of columns.
+        :param window: Number of columns held by the Text stub (None: the whole tab).
+        :param system_columns: Width of the stacked systems (None: no auto-layout).
+        :param highlight: True to highlight the tab after each key press.
+        """
+        l_nb_patterns = max(nb_columns // len(BENCH_PATTERN), 1)
+        self.text_zone = TextStub()
+        self.document = TabDocument.from_lines(
+            [f'{l_string}|' + BENCH_PATTERN * l_nb_patterns for l_string in STRINGS], STRINGS)
+        if system_columns:
+            self.view = TabLayoutView(self.text_zone, self.document, system_columns)
+        else:
+            self.view = TabView(self.text_zone, self.document, window)
+        # endif
+        self.view.render()
+        self.editor = TabEditor(self.document)
+        self.highlighter = None
+        if highlight:
+            self.highlighter = TabHighlighter(self.view)
+            self.highlighter.refresh()
+        # else: no highlighting
+
+        return
+    # end of function
+
+
+    def key(self, char, row, col, keycode=0, state=0):
+        """
+        Handle a key press as GuitarTabWriter.on_key_press does.
+        """
+        l_command = command_from_key(char, keycode, state, row, col)
+        l_row, l_col = self.editor.apply(l_command)
+        self.view.show(l_col)
+        self.text_zone.mark_set('insert', self.view.index(l_row, l_col))
+        if self.highlighter is not None:
+            # As at idle time in the application
+            self.highlighter.refresh()
+        # else: no highlighting
+
+        return
+    # end of function
+
+
+    def backspace(self, row, col):
+        """
+        Delete the character before a cell as Tk does, then update the tab model as
+        GuitarTabWriter.on_key_release does (resync).
+        """
+        self.view.show(col)
+        l_line, l_char = self.view.index(row, col).split('.')
+        l_index = f"{l_line}.{int(l_char) - 1}"
+        self.text_zone.delete(l_index, self.view.index(row, col))
+        self.text_zone.mark_set('insert', l_index)
+        self.text_zone.modified = True
+        self.view.resync()
+
+        return
+    # end of function
+
+
+    def transpose(self, semitones):
+        """
+        Transpose the tab as GuitarTabWriter.transpose_tab does.
+        """
+        self.document.set_lines(transpose_lines(self.document.lines(), semitones))
+
+        return
+    # end of function
+
+# end of class
+
+
+##################
+# FUNCTIONS
+##################
+def legacy_decrement_line(line):
+    """
+    Character loop used by decrement_octave before the tokenizer (reference only).
+
+    :param line: The staff line.
+    :return: The new line.
+    """
+    l_new_line = ''
+    l_prev_char = 0
+    l_dig_pos = 1
+    for l_char in line:
+        if l_char.isdigit():
+            if (int(l_char) <= 2) and (l_dig_pos <= 1):
+                # First of a 2-digit number
+                l_dig_pos += 1
+            else:
+                # End of the number
+                l_dig_pos = 1
+                l_num = int(str(l_prev_char) + l_char)
+                if l_num <= 21:
+                    l_new_line += '-'
+                # else: still a 2-digit number
+                l_new_line += str(l_num - 12 if l_num >= 12 else '0')
+            # endif
+        else:
+            if l_dig_pos > 1:
+                l_new_line += '0'
+                l_dig_pos = 1
+            # else: no previous digit
+            l_new_line += '-' if l_char == ' ' else l_char
+        # endif
+        if l_char.isdigit():
+            l_prev_char = int(l_char)
+        else:
+            l_prev_char = 0
+            l_dig_pos = 1
+        # endif
+    # end for
+
+    return l_new_line
+# end of function
+
+
+def octave_lines(nb_columns):
+    """
+    Build staff lines of (about) a given number of columns, with frets of 12 to 21 only,
+    which the legacy loop and the tokenizer both move an octave down.
+
+    :param nb_columns: The number of columns.
+    """
+    return [f'{l_string}|' + OCTAVE_PATTERN * max(nb_columns // len(OCTAVE_PATTERN), 1)
+            for l_string in STRINGS]
+# end of function
+
+
+def legacy_decrement_lines(lines):
+    """
+    Decrement the octave of staff lines with the legacy character loop.
+
+    :param lines: The staff lines.
+    :return: The new lines.
+    """
+    return [legacy_decrement_line(l_line) for l_line in lines]
+# end of function
+
+
+def check_decrement(lines):
+    """
+    Check that transpose_lines and the legacy loop give the same tab an octave down.
+    The legacy loop aligns the one-digit frets on the right of the former two-digit ones
+    (e.g. "12" => "-0" instead of "0-"), so the notes are compared in order.
+
+    :param lines: The staff lines.
+    :raise AssertionError: If the frets, techniques or bars differ (columns excepted).
+    """
+    l_new = transpose_lines(lines, -OCTAVE)
+    l_legacy = legacy_decrement_lines(lines)
+    if [len(l_line) for l_line in l_new] != [len(l_line) for l_line in l_legacy] \
+            or [l_token[1:] for l_line in l_new for l_token in tokenize(l_line)] \
+            != [l_token[1:] for l_line in l_legacy for l_token in tokenize(l_line)]:
+        raise AssertionError('tokenizer and legacy loop give different tabs an octave down')
+    # else: same tab
+
+    return
+# end of function
+
+
+def tab_width(nb_columns):
+    """
+    Width of the tab built by HeadlessEditor for a given number of columns.
+
+    :param nb_columns: The number of columns.
+    """
+    return 2 + len(BENCH_PATTERN) * max(nb_columns // len(BENCH_PATTERN), 1)
+# end of function
+
+
+def fresh_tab(nb_columns, **options):
+    """
+    Build a new HeadlessEditor, checking its size before it is timed.
+
+    :param nb_columns: The number of columns.
+    :param options: The options of HeadlessEditor (window, system_columns, highlight).
+    """
+    l_tab = HeadlessEditor(nb_columns, **options)
+    if l_tab.document.width != tab_width(nb_columns):
+        raise AssertionError(f'tab of {l_tab.document.width} columns instead of '
+                             f'{tab_width(nb_columns)}')
+    # else: tab of the expected size
+
+    return l_tab
+# end of function
+
+
+def best_time(function, *args):
+    """
+    Best execution time of a function, in ms.
+
+    :param function: The function to measure.
+    :param args: Its arguments.
+    """
+    return min(timeit.repeat(lambda: function(*args), number=1, repeat=REPEAT)) * 1000
+# end of function
+
+
+def fresh_time(function, nb_columns, setup=None):
+    """
+    Best execution time of a function modifying the tab, in ms: each run gets a new tab.
+
+    :param function: The function to measure.
+    :param nb_columns: The number of columns of the tab.
+    :param setup: Function converting the HeadlessEditor into the arguments (not timed);
+                  None: the HeadlessEditor is the only argument.
+    """
+    l_times = []
+    for _ in range(REPEAT):
+        l_tab = fresh_tab(nb_columns)
+        l_args = (l_tab,) if setup is None else setup(l_tab)
+        l_start = time.perf_counter()
+        function(*l_args)
+        l_times.append(time.perf_counter() - l_start)
+    # end for
+
+    return min(l_times) * 1000
+# end of function
+
+
+def per_call_time(function, nb_calls):
+    """
+    Median time of the calls of a function, in ms.
+
+    :param function: The function to measure (called with the call number).
+    :param nb_calls: The number of calls.
+    """
+    l_times = []
+    for l_call in range(nb_calls):
+        l_start = time.perf_counter()
+        function(l_call)
+        l_times.append(time.perf_counter() - l_start)
+    # end for
+    l_times.sort()
+
+    return l_times[len(l_times) // 2] * 1000
+# end of function
+
+
+def bench_size(nb_columns):
+    """
+    Time the editing hot paths on a tab of a given number of columns. Each operation
+    runs on a new tab (and each run of an operation growing the tab, e.g. duplicate), so
+    that every time is measured on a tab of the given size.
+
+    :param nb_columns: The number of columns.
+    :return: Dictionary operation => time (ms).
+    """
+    l_results = {}
+    l_middle = tab_width(nb_columns) // 2
+
+    # Note typed in the middle of the tab (overwrite a '-' or insert a column)
+    l_tab = fresh_tab(nb_columns)
+    l_results['key_note'] = per_call_time(
+        lambda l_call: l_tab.key(str(l_call % 10), l_call % 6, l_middle + l_call), KEYSTROKES)
+    # "-" and "|" (new column on all the strings)
+    l_tab = fresh_tab(nb_columns)
+    l_results['key_dash'] = per_call_time(
+        lambda l_call: l_tab.key('-', 0, l_middle), KEYSTROKES)
+    l_tab = fresh_tab(nb_columns)
+    l_results['key_bar'] = per_call_time(
+        lambda l_call: l_tab.key('|', 0, l_middle), KEYSTROKES)
+    # Shift + Del
+    l_tab = fresh_tab(nb_columns)
+    l_results['shift_del'] = per_call_time(
+        lambda l_call: l_tab.key('', 0, l_middle, KEY_DEL, SHIFT), KEYSTROKES)
+    # Backspace handled by Tk, then resync of the model on key release (one change of the
+    # modified columns), in the three views
+    l_width = tab_width(nb_columns)
+    for l_name, l_options in (('key_backspace', {}), ('key_backspace_window', {'window': WINDOW}),
+                              ('key_backspace_layout', {'system_columns': SYSTEM_COLUMNS})):
+        l_tab = fresh_tab(nb_columns, **l_options)
+        l_results[l_name] = per_call_time(
+            lambda l_call, l_tab=l_tab: l_tab.backspace(
+                l_call % 6, l_middle + (7 * l_call) % (l_width - l_middle)), KEYSTROKES)
+        if l_tab.document.width != l_width or l_tab.text_zone.modified:
+            raise AssertionError(f'{l_name}: tab not resynchronized')
+        # else: cells blanked in place
+    # end for
+    # Note typed with the virtualized view (window of columns around the cursor)
+    l_tab = fresh_tab(nb_columns, window=WINDOW)
+    l_results['key_note_window'] = per_call_time(
+        lambda l_call: l_tab.key(str(l_call % 10), l_call % 6, l_middle + l_call), KEYSTROKES)
+    # Note and bar typed with the highlighting (tags of the modified columns)
+    l_tab = fresh_tab(nb_columns, highlight=True)
+    l_results['key_note_highlight'] = per_call_time(
+        lambda l_call: l_tab.key(str(l_call % 10), l_call % 6, l_middle + l_call), KEYSTROKES)
+    l_tab = fresh_tab(nb_columns, highlight=True)
+    l_results['key_bar_highlight'] = per_call_time(
+        lambda l_call: l_tab.key('|', 0, l_middle), KEYSTROKES)
+    # Note and bar typed with the auto-layout (re-break of the systems around the cursor)
+    l_tab = fresh_tab(nb_columns, system_columns=SYSTEM_COLUMNS)
+    l_results['key_note_layout'] = per_call_time(
+        lambda l_call: l_tab.key(str(l_call % 10), l_call % 6, l_middle + l_call), KEYSTROKES)
+    l_tab = fresh_tab(nb_columns, system_columns=SYSTEM_COLUMNS)
+    l_results['key_bar_layout'] = per_call_time(
+        lambda l_call: l_tab.key('|', 0, l_middle), KEYSTROKES)
+    # Measure index: bar typed in the middle of the tab, then measure of a column
+    l_tab = fresh_tab(nb_columns)
+    l_measures = MeasureIndex(l_tab.document)
+    l_results['key_bar_measures'] = per_call_time(
+        lambda l_call: l_tab.key('|', 0, l_middle), KEYSTROKES)
+    l_measures = MeasureIndex(fresh_tab(nb_columns).document)
+    l_results['measure_at'] = per_call_time(
+        lambda l_call: l_measures.measure_range(l_measures.measure_at(l_middle + l_call)),
+        KEYSTROKES)
+    # Riff of a few measures duplicated many times (one slice of columns)
+    l_results['duplicate_measures'] = fresh_time(
+        bench_duplicate, nb_columns, lambda l_tab: (l_tab, MeasureIndex(l_tab.document)))
+    # Block of columns cut, then pasted back (two edits whatever the block width)
+    l_tab = fresh_tab(nb_columns)
+    l_results['block_cut_paste'] = per_call_time(
+        lambda l_call: bench_block(l_tab, l_call % 3, l_middle), KEYSTROKES)
+    # Tab of the size pasted in an empty tab (parsed, padded and inserted at once)
+    l_results['paste_tab'] = best_time(bench_paste, fresh_tab(nb_columns).document.to_text())
+    # Binary file of the tab saved (atomic write) and loaded (memory-mapped)
+    with tempfile.TemporaryDirectory() as l_dir:
+        l_path = os.path.join(l_dir, 'bench' + BINARY_EXTENSION)
+        l_document = fresh_tab(nb_columns).document
+        l_results['binary_save'] = best_time(save_binary, l_document, l_path)
+        l_results['binary_load'] = best_time(load_binary, l_path)
+    # end with
+    # Octave buttons
+    l_results['increment_octave'], l_results['decrement_octave'] = \
+        bench_octaves(fresh_tab(nb_columns))
+    # Coalescing: burst of key presses displayed at once
+    l_results['coalesced_burst'] = fresh_time(bench_burst, nb_columns)
+    # Standard notation: whole tab, then again after a note (one measure converted)
+    l_measures = MeasureIndex(fresh_tab(nb_columns).document)
+    l_results['notation_full'] = best_time(lambda: NotationRenderer(l_measures).render())
+    l_tab = fresh_tab(nb_columns)
+    l_notation = NotationRenderer(MeasureIndex(l_tab.document))
+    l_notation.render()
+    l_results['notation_edit'] = per_call_time(
+        lambda l_call: bench_notation(l_tab, l_notation, l_call % 6, l_middle + l_call),
+        KEYSTROKES // 10)
+    # Copy of the tab as wrapped systems: unchanged (cached), then after a note
+    l_tab = fresh_tab(nb_columns)
+    l_exporter = TabExporter(MeasureIndex(l_tab.document))
+    l_exporter.export(EXPORT_STYLES[STYLE_WRAPPED])
+    l_results['export_copy'] = best_time(l_exporter.export, EXPORT_STYLES[STYLE_WRAPPED])
+    l_results['export_edit'] = per_call_time(
+        lambda l_call: bench_export(l_tab, l_exporter, l_call % 6, l_middle + l_call),
+        KEYSTROKES // 10)
+    # Octave down of the whole tab: tokenizer (transpose_lines) against the legacy
+    # character loop, on the same lines and with the same result
+    l_lines = octave_lines(nb_columns)
+    check_decrement(l_lines)
+    l_results['decrement_tokenizer'] = best_time(transpose_lines, l_lines, -OCTAVE)
+    l_results['decrement_legacy'] = best_time(legacy_decrement_lines, l_lines)
+
+    return l_results
+# end of function
+
+
+def bench_octaves(tab):
+    """
+    Time the octave buttons: each increment is followed by a decrement, so that the
+    frets stay on the fretboard.
+
+    :param tab: The HeadlessEditor.
+    :return: (increment time, decrement time), in ms.
+    """
+    l_increment = []
+    l_decrement = []
+    for _ in range(REPEAT):
+        l_start = time.perf_counter()
+        tab.transpose(OCTAVE)
+        l_middle = time.perf_counter()
+        tab.transpose(-OCTAVE)
+        l_increment.append(l_middle - l_start)
+        l_decrement.append(time.perf_counter() - l_middle)
+    # end for
+
+    return (min(l_increment) * 1000, min(l_decrement) * 1000)
+# end of function
+
+
+def bench_burst(tab):
+    """
+    Queue a burst of key presses and display them at once (keystroke coalescing).
+    The result is checked against the model.
+
+    :param tab: The HeadlessEditor.
+    """
+    l_col = tab.document.width // 2
+    tab.view.begin_batch()
+    for l_call in range(BURST):
+        l_char = '0123456789-|'[l_call % 12]
+        tab.key(l_char, l_call % 6, tab.editor.col if l_call else l_col)
+    # end for
+    tab.view.end_batch()
+    if tab.text_zone.lines != tab.document.lines():
+        raise AssertionError('coalesced display differs from the tab model')
+    # else: same result as one display per key
+
+    return
+# end of function
+
+
+def bench_duplicate(tab, measures):
+    """
+    Duplicate a riff of the middle of the tab (bulk measure operation).
+    The result is checked against the model.
+
+    :param tab: The HeadlessEditor.
+    :param measures: The MeasureIndex of its document.
+    """
+    l_first = max(measures.measure_at(tab.document.width // 2), 1)
+    l_last = min(l_first + RIFF_MEASURES - 1, len(measures))
+    duplicate_measures(measures, l_first, l_last, RIFF_COPIES)
+    if tab.text_zone.lines != tab.document.lines():
+        raise AssertionError('duplicated measures differ from the tab model')
+    # else: the view has been refreshed
+
+    return
+# end of function
+
+
+def bench_block(tab, first_row, col):
+    """
+    Cut a block of columns (some strings, or all of them), then paste it back.
+
+    :param tab: The HeadlessEditor.
+    :param first_row: The first string of the block (0: all the strings).
+    :param col: The first column of the block.
+    """
+    l_last_row = tab.document.nb_strings - 1
+    l_block = copy_block(tab.document, first_row, l_last_row, col, col + BLOCK_COLUMNS)
+    delete_block(tab.document, first_row, l_last_row, col, col + BLOCK_COLUMNS)
+    paste_block(tab.document, l_block, first_row, col)
+    if first_row:
+        # Remove the cleared columns
+        delete_block(tab.document, 0, l_last_row, col + BLOCK_COLUMNS, col + 2 * BLOCK_COLUMNS)
+    # else: whole columns
+
+    return
+# end of function
+
+
+def bench_paste(text):
+    """
+    Paste a tab text in an empty tab. The result is checked against the model.
+
+    :param text: The pasted text.
+    """
+    l_tab = HeadlessEditor(0)
+    l_block = block_from_text(text, l_tab.document.nb_strings)
+    paste_block(l_tab.document, l_block, 0, l_tab.document.width)
+    if l_tab.text_zone.lines != l_tab.document.lines():
+        raise AssertionError('pasted tab differs from the tab model')
+    # else: the view has been refreshed
+
+    return
+# end of function
+
+
+def bench_notation(tab, renderer, row, col):
+    """
+    Type a note, then convert the tab into notation again (only its measure is converted).
+
+    :param tab: The HeadlessEditor.
+    :param renderer: The NotationRenderer of the tab.
+    :param row: The string.
+    :param col: The column.
+    """
+    tab.key(str(col % 10), row, col)
+    renderer.render()
+    if renderer.converted > 1:
+        raise AssertionError(f'{renderer.converted} measures converted after one note')
+    # else: one measure converted
+
+    return
+# end of function
+
+
+def bench_export(tab, exporter, row, col):
+    """
+    Type a note, then export the tab again (only its measure is rendered).
+
+    :param tab: The HeadlessEditor.
+    :param exporter: The TabExporter of the tab.
+    :param row: The string.
+    :param col: The column.
+    """
+    tab.key(str(col % 10), row, col)
+    exporter.export(EXPORT_STYLES[STYLE_WRAPPED])
+    if exporter.rendered > 1:
+        raise AssertionError(f'{exporter.rendered} measures rendered after one note')
+    # else: one measure rendered
+
+    return
+# end of function
+
+
+def run(sizes):
+    """
+    Run the benchmarks.
+
+    :param sizes: The numbers of columns.
+    :return: The results (dictionary, ready for JSON).
+    """
+    l_results = {}
+    for l_size in sizes:
+        for l_name, l_time in bench_size(l_size).items():
+            l_results.setdefault(l_name, {})[str(l_size)] = round(l_time, 4)
+        # end for
+    # end for
+
+    return {'meta': {'python': platform.python_version(),
+                     'platform': platform.platform(),
+                     'date': time.strftime('%Y-%m-%d %H:%M:%S')},
+            'results': l_results}
+# end of function
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """
+    Compare results with a baseline.
+
+    :param results: The results (as returned by run).
+    :param baseline: The baseline results (same format).
+    :param threshold: Accepted relative slow down (0.25 = 25 %).
+    :return: List of regression messages.
+    """
+    l_regressions = []
+    for l_name, l_times in results['results'].items():
+        for l_size, l_time in l_times.items():
+            l_ref = baseline['results'].get(l_name, {}).get(l_size)
+            if (l_ref is not None and l_time > l_ref * (1 + threshold)
+                    and l_time - l_ref > MIN_DELTA_MS):
+                l_regressions.append(f"{l_name} @ {l_size} columns: "
+                                     f"{l_time:.3f} ms (baseline {l_ref:.3f} ms)")
+            # else: no regression
+        # end for
+    # end for
+
+    return l_regressions
+# end of function
+
+
+##################
+# MAIN FUNCTION
+##################
+def main(argv=None):
+    """
+    Main function to run the benchmarks.
+
+    :param argv: The arguments (defaults to sys.argv[1:]).
+    :return: The exit code (1 if a regression is detected).
+    """
+    l_parser = argparse.ArgumentParser(description='Guitar Tab Writer benchmarks.')
+    l_parser.add_argument('--sizes', type=int, nargs='+', default=SIZES,
+                          help='numbers of columns')
+    l_parser.add_argument('--output', help='JSON results file')
+    l_parser.add_argument('--baseline', default=BASELINE_FILE, help='JSON baseline file')
+    l_parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                          help='accepted relative slow down (0.25 = 25 %%)')
+    l_parser.add_argument('--save-baseline', action='store_true',
+                          help='store the results as the new baseline')
+    l_args = l_parser.parse_args(argv)
+
+    l_results = run(l_args.sizes)
+    for l_name, l_times in l_results['results'].items():
+        print(f"{l_name:<18}" + ''.join(f"{l_size:>8}: {l_time:9.3f} ms"
+                                        for l_size, l_time in l_times.items()))
+    # end for
+
+    if l_args.output:
+        with open(l_args.output, 'w', encoding='utf-8') as l_file:
+            json.dump(l_results, l_file, indent=2)
+        # end with
+    # else: no results file
+
+    if l_args.save_baseline:
+        with open(l_args.baseline, 'w', encoding='utf-8') as l_file:
+            json.dump(l_results, l_file, indent=2)
+        # end with
+        print(f"Baseline saved: {l_args.baseline}")
+        return 0
+    # else: compare with the baseline
+
+    if not os.path.exists(l_args.baseline):
+        print(f"No baseline ({l_args.baseline}): use --save-baseline")
+        return 0
+    # else: baseline available
+
+    with open(l_args.baseline, 'r', encoding='utf-8') as l_file:
+        l_regressions = compare(l_results, json.load(l_file), l_args.threshold)
+    # end with
+    for l_regression in l_regressions:
+        print(f"REGRESSION: {l_regression}")
+    # end for
+
+    return 1 if l_regressions else 0
+# end function
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# End of file
@@ -0,0 +1,210 @@
+"""
+Tab Binary Module
+
+USE:
+    This module stores a TabDocument in a compact binary file (.gtwb), loaded and saved
+    in milliseconds, and converted losslessly to and from the text layout of the editor.
+    Layout of the file (little-endian):
+        header      magic "GTWB", version, number of strings, number of columns,
+                    number of note columns, CRC32 of the data
+        tuning      the string names (length byte + ASCII name)
+        kinds       one byte per column: 0 = '-' column, 1 = bar column, 2 = note column
+        cells       the cells of the note columns (one byte per string)
+    The '-' and bar columns, most of a tab, cost one byte instead of one per string.
+    The sections are plain byte arrays, read in place from a memory-mapped file and
+    converted with C-level operations (no loop per column in Python).
+        save_binary(l_document, 'song.gtwb')
+        l_document = load_binary('song.gtwb')
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+import mmap                     # For the memory-mapped files
+import struct                   # For the header
+import zlib                     # For the checksum
+from itertools import compress, repeat  # For the column kinds
+from operator import itemgetter # For the note columns
+# APPLICATION libraries
+from tab_document import TabDocument, DASH, BAR, ENCODING  # For the tab model
+from tab_journal import write_atomic                      # For the atomic save
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+BINARY_EXTENSION = '.gtwb'  # Constant => pylint: disable=C0103
+BINARY_MAGIC = b'GTWB'      # Constant => pylint: disable=C0103
+BINARY_VERSION = 1          # Constant => pylint: disable=C0103
+# Magic, version, strings, columns, note columns, CRC32 of the data => pylint: disable=C0103
+BINARY_HEADER = struct.Struct('<4sHHIII')  # Constant => pylint: disable=C0103
+
+# Column kinds
+KIND_BLANK = 0  # Constant => pylint: disable=C0103
+KIND_BAR = 1    # Constant => pylint: disable=C0103
+KIND_NOTE = 2   # Constant => pylint: disable=C0103
+# Translation of the kinds into note column selectors (1 for the note columns)
+NOTE_SELECTOR = bytes(1 if l_kind == KIND_NOTE else 0 for l_kind in range(256))  # Constant => pylint: disable=C0103
+VALID_KINDS = bytes((KIND_BLANK, KIND_BAR, KIND_NOTE))  # Constant => pylint: disable=C0103
+
+
+##################
+# CLASS DEFINITION
+##################
+class BinaryFormatError(ValueError):
+    """
+    Raised when a file is not a valid binary tab.
+    """
+# end of class
+
+
+##################
+# FUNCTIONS
+##################
+def to_bytes(document):
+    """
+    Encode a document into the binary format.
+
+    :param document: The TabDocument.
+    :return: The bytes of the file.
+    """
+    l_columns = document.columns()
+    l_kinds_of = {document.blank_column(): KIND_BLANK, document.blank_column(BAR): KIND_BAR}
+    l_kinds = bytes(map(l_kinds_of.get, l_columns, repeat(KIND_NOTE)))
+    l_cells = b''.join(compress(l_columns, l_kinds.translate(NOTE_SELECTOR)))
+
+    l_tuning = b''.join(bytes([len(l_name)]) + l_name for l_name in
+                        (l_string.encode(ENCODING, errors='replace')[:255]
+                         for l_string in document.strings))
+    l_data = l_tuning + l_kinds + l_cells
+    l_header = BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, document.nb_strings,
+                                  len(l_columns), len(l_cells) // document.nb_strings,
+                                  zlib.crc32(l_data))
+
+    return l_header + l_data
+# end of function
+
+
+def read_header(buffer):
+    """
+    Read the header and the tuning of a binary tab (e.g. to list files without loading them).
+
+    :param buffer: The bytes of the file (bytes, mmap...).
+    :return: (string names, number of columns, number of note columns, offset of the kinds).
+    :raise BinaryFormatError: If the buffer is not a binary tab.
+    """
+    if len(buffer) < BINARY_HEADER.size:
+        raise BinaryFormatError("File too short for a binary tab")
+    # else: header present
+    l_magic, l_version, l_nb_strings, l_nb_columns, l_nb_notes, _ = \
+        BINARY_HEADER.unpack_from(buffer)
+    if l_magic != BINARY_MAGIC or l_version != BINARY_VERSION:
+        raise BinaryFormatError("Not a binary tab (or unsupported version)")
+    # else: binary tab
+    if not l_nb_strings:
+        raise BinaryFormatError("Binary tab without string")
+    # else: valid tuning
+
+    l_strings = []
+    l_pos = BINARY_HEADER.size
+    for _ in range(l_nb_strings):
+        l_len = buffer[l_pos]
+        l_strings.append(bytes(buffer[l_pos + 1:l_pos + 1 + l_len]).decode(ENCODING, errors='replace'))
+        l_pos += 1 + l_len
+    # end for
+
+    return (l_strings, l_nb_columns, l_nb_notes, l_pos)
+# end of function
+
+
+def from_bytes(buffer):
+    """
+    Decode a binary tab.
+
+    :param buffer: The bytes of the file (bytes, mmap...).
+    :return: The TabDocument.
+    :raise BinaryFormatError: If the buffer is not a valid binary tab.
+    """
+    l_strings, l_nb_columns, l_nb_notes, l_pos = read_header(buffer)
+    l_nb = len(l_strings)
+    l_end = l_pos + l_nb_columns + l_nb_notes * l_nb
+    if len(buffer) != l_end \
+            or zlib.crc32(buffer[BINARY_HEADER.size:l_end]) != BINARY_HEADER.unpack_from(buffer)[5]:
+        raise BinaryFormatError("Truncated or corrupted binary tab")
+    # else: valid data
+
+    l_kinds = bytes(buffer[l_pos:l_pos + l_nb_columns])
+    # The kinds must match the stored note columns (else the columns would be truncated)
+    if l_kinds.translate(None, VALID_KINDS) or l_kinds.count(KIND_NOTE) != l_nb_notes:
+        raise BinaryFormatError("Column kinds not matching the stored notes")
+    # else: valid kinds
+    l_cells = buffer[l_pos + l_nb_columns:l_end]
+    l_notes = map(itemgetter(0), struct.iter_unpack(f'{l_nb}s', l_cells))
+    # Column of each kind: the shared '-' and bar columns, or the next note column
+    l_sources = (repeat((DASH * l_nb).encode(ENCODING)), repeat((BAR * l_nb).encode(ENCODING)),
+                 l_notes)
+    l_columns = list(map(next, map(l_sources.__getitem__, l_kinds)))
+
+    return TabDocument(l_strings, l_columns)
+# end of function
+
+
+def save_binary(document, path):
+    """
+    Save a document in a binary file (atomic replace).
+
+    :param document: The TabDocument.
+    :param path: The file path.
+    """
+    write_atomic(path, to_bytes(document))
+
+    return
+# end of function
+
+
+def load_binary(path):
+    """
+    Load a binary file (memory-mapped: the sections are decoded in place).
+
+    :param path: The file path.
+    :return: The TabDocument.
+    :raise BinaryFormatError: If the file is not a valid binary tab.
+    """
+    with open(path, 'rb') as l_file:
+        try:
+            l_map = mmap.mmap(l_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as l_error:
+            # Empty file
+            raise BinaryFormatError(f"{path}: empty file") from l_error
+        # end try
+        with l_map:
+            return from_bytes(l_map)
+        # end with
+    # end with
+# end of function
+
+
+def text_to_binary(text, strings=None):
+    """
+    Convert the text layout of a tab into the binary format.
+
+    :param text: The tab text (one line per string).
+    :param strings: The string names (defaults to the first character of each line).
+    :return: The bytes of the file.
+    """
+    return to_bytes(TabDocument.from_text(text, strings))
+# end of function
+
+
+def binary_to_text(buffer):
+    """
+    Convert a binary tab into the text layout of the editor.
+
+    :param buffer: The bytes of the file.
+    :return: The tab text.
+    """
+    return from_bytes(buffer).to_text()
+# end of function
+
+# End of file
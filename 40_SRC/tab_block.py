@@ -0,0 +1,214 @@
+"""
+Tab Block Module
+
+USE:
+    This module provides the rectangular block operations of a TabDocument: copy, delete
+    and paste of the cells of consecutive strings on a range of columns.
+    Each operation is one slice of columns of the document (one change, displayed and
+    undone at once), and costs the size of the block:
+    - a block of all the strings holds whole columns: they are deleted or inserted;
+    - a block of some strings is cleared with '-' when deleted (the bars are kept), and
+      pasted in new columns holding '-' on the other strings ('|' for a bar), so the
+      alignment of the strings and the measures are kept.
+        l_block = copy_block(l_document, 0, 2, 10, 60)
+        paste_block(l_document, l_block, 0, 80)
+    A pasted text is converted into a block in one pass (see block_from_text): its staff
+    systems are stripped of their string names, padded with '-' and put end to end.
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+import re                       # For the pasted text detection
+from typing import NamedTuple   # For the blocks
+# APPLICATION libraries
+from tab_document import (DASH, BAR, ENCODING, STAFF_LINE_RE,  # For the tab model
+                          columns_from_lines, lines_from_columns, iter_blocks)
+from tab_tokenizer import TECHNIQUES                # For the pasted text detection
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+# Translation of the deleted cells: '-', except the bars (the measures are kept)
+CLEAR_TABLE = bytes(l_byte if l_byte == ord(BAR) else ord(DASH)  # Constant => pylint: disable=C0103
+                    for l_byte in range(256))
+
+# Line of a tab without string name (e.g. a block copied from the editor)
+BODY_LINE_RE = re.compile(r'[-|0-9' + re.escape(TECHNIQUES) + r']+')  # Constant => pylint: disable=C0103
+
+
+##################
+# CLASS DEFINITION
+##################
+class TabBlock(NamedTuple):
+    """
+    Rectangular block of a tab.
+
+    :param row: The first string of the block.
+    :param columns: Tuple of the columns of the block (bytes of one cell per string).
+    """
+    row: int
+    columns: tuple
+
+    @classmethod
+    def from_lines(cls, row, lines):
+        """
+        Build a block from text lines (short lines are padded with '-').
+
+        :param row: The first string of the block.
+        :param lines: The lines (one per string of the block).
+        """
+        return cls(row, tuple(columns_from_lines(lines)))
+    # end of function
+
+
+    @property
+    def height(self):
+        """
+        Number of strings of the block.
+        """
+        return len(self.columns[0]) if self.columns else 0
+    # end of function
+
+
+    @property
+    def width(self):
+        """
+        Number of columns of the block.
+        """
+        return len(self.columns)
+    # end of function
+
+
+    def lines(self):
+        """
+        Get the text of the strings of the block.
+        """
+        return lines_from_columns(self.columns, self.height)
+    # end of function
+
+# end of class
+
+
+##################
+# FUNCTIONS
+##################
+def copy_block(document, first_row, last_row, start, end):
+    """
+    Copy a rectangular block of a tab.
+
+    :param document: The TabDocument.
+    :param first_row: The first string.
+    :param last_row: The last string.
+    :param start: The first column.
+    :param end: The column after the last one.
+    :return: The TabBlock.
+    """
+    return TabBlock(first_row, tuple(l_column[first_row:last_row + 1]
+                                     for l_column in document.columns(start, end)))
+# end of function
+
+
+def delete_block(document, first_row, last_row, start, end):
+    """
+    Delete a rectangular block of a tab: the columns if the block holds all the strings,
+    otherwise its cells (except the bars) are replaced by '-'.
+
+    :param document: The TabDocument.
+    :param first_row: The first string.
+    :param last_row: The last string.
+    :param start: The first column.
+    :param end: The column after the last one.
+    :return: The column of the cursor after the deletion.
+    """
+    if first_row <= 0 and last_row >= document.nb_strings - 1:
+        document.delete_columns(start, end - start)
+        return start
+    # else: some strings only
+
+    l_end_row = last_row + 1
+    document.replace_columns(start, [l_column[:first_row]
+                                     + l_column[first_row:l_end_row].translate(CLEAR_TABLE)
+                                     + l_column[l_end_row:]
+                                     for l_column in document.columns(start, end)])
+
+    return start
+# end of function
+
+
+def paste_block(document, block, row, col):
+    """
+    Insert a block in a tab, in new columns (the strings out of the block get '-', or '|'
+    on the columns of bars).
+
+    :param document: The TabDocument.
+    :param block: The TabBlock.
+    :param row: The string of the first line of the block.
+    :param col: The column of the insertion.
+    :return: The column after the pasted block.
+    """
+    l_nb = document.nb_strings
+    if block.height == l_nb:
+        l_columns = block.columns
+    else:
+        # Strings out of the tab are dropped
+        l_row = max(min(row, l_nb - 1), 0)
+        l_height = min(block.height, l_nb - l_row)
+        l_above = (DASH * l_row).encode(ENCODING)
+        l_below = (DASH * (l_nb - l_row - l_height)).encode(ENCODING)
+        l_bar = (BAR * block.height).encode(ENCODING)
+        l_bar_column = document.blank_column(BAR)
+        l_columns = [l_bar_column if l_column == l_bar
+                     else l_above + l_column[:l_height] + l_below
+                     for l_column in block.columns]
+    # endif
+    document.insert_columns(col, l_columns)
+
+    return col + block.width
+# end of function
+
+
+def block_from_text(text, nb_strings):
+    """
+    Convert a pasted text into a block, in one pass:
+    - staff systems (e.g. a tab copied from a web page) are stripped of their string
+      names, padded with '-' to the longest line and to nb_strings lines, and put end to
+      end (separated by a bar if needed): the block holds all the strings;
+    - otherwise, lines of tab cells only (2 to nb_strings lines) are a block of strings.
+
+    :param text: The pasted text.
+    :param nb_strings: The number of strings of the tab.
+    :return: The TabBlock, or None if the text is not a tab.
+    """
+    l_lines = [l_line.rstrip() for l_line in text.replace('\r', '').split('\n')]
+    l_bar = (BAR * nb_strings).encode(ENCODING)
+
+    l_columns = []
+    for l_is_system, l_system in iter_blocks(l_lines):
+        if not l_is_system:
+            continue
+        # else: staff lines
+        l_body = [STAFF_LINE_RE.sub('', l_line, count=1) for l_line in l_system[:nb_strings]]
+        l_body += [''] * (nb_strings - len(l_body))
+        if l_columns and l_columns[-1] != l_bar:
+            # Next system: close the previous one
+            l_columns.append(l_bar)
+        # else: first system, or already closed
+        l_columns.extend(columns_from_lines(l_body))
+    # end for
+    if l_columns:
+        return TabBlock(0, tuple(l_columns))
+    # else: no staff system
+
+    l_rows = [l_line for l_line in l_lines if l_line]
+    if 2 <= len(l_rows) <= nb_strings \
+            and all(BODY_LINE_RE.fullmatch(l_line) for l_line in l_rows):
+        return TabBlock.from_lines(0, l_rows)
+    # else: not a tab
+
+    return None
+# end of function
+
+# End of file
@@ -0,0 +1,286 @@
+"""
+Tab Command Line Module
+
+USE:
+    This module provides the headless command line of the Guitar Tab Writer (no Tk import).
+    Files and directory trees are processed by a pool of processes, with the same
+    operations as the GUI, and the throughput is reported on stderr.
+    Each file is streamed one staff system at a time ('-' reads stdin), so multi-megabyte
+    tabs are processed with constant memory.
+        guitar_tab_writer transpose SEMITONES PATH... [-o OUTPUT | --in-place]
+        guitar_tab_writer normalize PATH... [-o OUTPUT | --in-place]
+        guitar_tab_writer validate PATH...
+        guitar_tab_writer open FILE [--system N] [--list]
+        guitar_tab_writer convert SOURCE DESTINATION [--style STYLE]
+    The open command memory-maps the file (see tab_archive): the application displays
+    system N, and with --list the index of the systems is printed instead.
+    The convert command converts a tab between the text layout of the editor and the
+    compact binary format (see tab_binary), depending on the file extensions, or into
+    standard notation (LilyPond source, see tab_notation) with a .ly destination; a text
+    destination is written in one of the export styles (see tab_export).
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+import argparse                 # For the command line arguments
+import fnmatch                  # For the file name pattern
+import os                       # For the file paths
+import sys                      # For the standard streams
+import time                     # For the throughput
+from concurrent.futures import ProcessPoolExecutor  # For the process pool
+# APPLICATION libraries
+from tab_archive import TabArchive  # For the large files
+from tab_batch import run_task, CMD_TRANSPOSE, CMD_NORMALIZE, CMD_VALIDATE  # For the tab operations
+from tab_binary import (BINARY_EXTENSION, BinaryFormatError,  # For the binary format
+                        load_binary, save_binary)
+from tab_document import TabDocument    # For the text format
+from tab_measures import MeasureIndex   # For the measures of the notation
+from tab_notation import NotationRenderer, NOTATION_EXTENSION  # For the standard notation
+from tab_export import TabExporter, EXPORT_STYLES, STYLE_RAW  # For the text styles
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+PROG_NAME = 'guitar_tab_writer'  # Constant => pylint: disable=C0103
+DEFAULT_PATTERN = '*.txt'  # Constant => pylint: disable=C0103
+CHUNK_SIZE = 16  # Files sent at once to a worker => pylint: disable=C0103
+CMD_OPEN = 'open'  # Constant => pylint: disable=C0103
+CMD_CONVERT = 'convert'  # Constant => pylint: disable=C0103
+
+
+##################
+# FUNCTIONS
+##################
+def build_parser():
+    """
+    Build the command line parser.
+    """
+    l_parser = argparse.ArgumentParser(prog=PROG_NAME,
+                                       description='Guitar Tab Writer batch processing.')
+    l_commands = l_parser.add_subparsers(dest='command', required=True)
+
+    l_transpose = l_commands.add_parser(CMD_TRANSPOSE, help='transpose the tabs')
+    l_transpose.add_argument('semitones', type=int, help='number of semitones (e.g. -12)')
+    l_normalize = l_commands.add_parser(CMD_NORMALIZE, help='dash-pad and align the strings')
+    l_validate = l_commands.add_parser(CMD_VALIDATE, help='check the staff systems')
+    l_open = l_commands.add_parser(CMD_OPEN, help='open a (large) tab file')
+    l_open.add_argument('path', help='tab file')
+    l_open.add_argument('-s', '--system', type=int, default=1,
+                        help='staff system to display (from 1)')
+    l_open.add_argument('--list', action='store_true', help='list the staff systems')
+    l_convert = l_commands.add_parser(CMD_CONVERT,
+                                      help=f'convert a tab between text and binary ({BINARY_EXTENSION}), '
+                                           f'or into notation ({NOTATION_EXTENSION})')
+    l_convert.add_argument('source', help='tab file to read')
+    l_convert.add_argument('destination', help='tab file to write')
+    l_convert.add_argument('--style', choices=sorted(EXPORT_STYLES), default=STYLE_RAW,
+                           help=f'style of a text destination ({STYLE_RAW})')
+
+    for l_command in (l_transpose, l_normalize, l_validate):
+        l_command.add_argument('paths', nargs='+', help="tab files or directories ('-': stdin)")
+        l_command.add_argument('-p', '--pattern', default=DEFAULT_PATTERN,
+                               help=f'file name pattern in directories ({DEFAULT_PATTERN})')
+        l_command.add_argument('-j', '--jobs', type=int, default=None,
+                               help='number of processes (number of CPUs)')
+    # end for
+    for l_command in (l_transpose, l_normalize):
+        l_output = l_command.add_mutually_exclusive_group()
+        l_output.add_argument('-o', '--output', help='output directory')
+        l_output.add_argument('--in-place', action='store_true', help='overwrite the files')
+    # end for
+
+    return l_parser
+# end of function
+
+
+def iter_files(paths, pattern):
+    """
+    List the files to process.
+
+    :param paths: Files or directories (walked recursively).
+    :param pattern: File name pattern in the directories.
+    :return: Iterator of (file path, path relative to its root).
+    """
+    for l_path in paths:
+        if l_path == '-':
+            yield (l_path, l_path)
+        elif os.path.isdir(l_path):
+            for l_dir, l_subdirs, l_files in os.walk(l_path):
+                l_subdirs.sort()
+                for l_name in sorted(fnmatch.filter(l_files, pattern)):
+                    l_file = os.path.join(l_dir, l_name)
+                    yield (l_file, os.path.relpath(l_file, l_path))
+                # end for
+            # end for
+        else:
+            yield (l_path, os.path.basename(l_path))
+        # endif
+    # end for
+# end of function
+
+
+def build_tasks(args):
+    """
+    Build the tasks of the process pool.
+
+    :param args: The parsed command line arguments.
+    :return: List of (command, source path, destination path or None, semitones).
+    """
+    l_tasks = []
+    for l_src, l_relative in iter_files(args.paths, args.pattern):
+        l_dst = None
+        if getattr(args, 'in_place', False):
+            l_dst = l_src
+        elif getattr(args, 'output', None):
+            l_dst = os.path.join(args.output, l_relative)
+        # else: validation, or output on stdout (single file only)
+        l_tasks.append((args.command, l_src, l_dst, getattr(args, 'semitones', 0)))
+    # end for
+
+    return l_tasks
+# end of function
+
+
+def open_archive(args):
+    """
+    Print a staff system of a tab file, or the index of its systems.
+
+    :param args: The parsed command line arguments.
+    :return: The exit code (0: success, 1: no such system).
+    """
+    with TabArchive(args.path) as l_archive:
+        if args.list:
+            for l_index in range(l_archive.nb_systems()):
+                l_entry = l_archive.entry(l_index)
+                l_lines = l_archive.system_lines(l_index)
+                print(f"system {l_index + 1}: line {l_entry.line_nb}, {len(l_lines)} strings, "
+                      f"{max(len(l_line) for l_line in l_lines)} columns")
+            # end for
+            return 0
+        # else: display one system
+
+        if not l_archive.has_system(args.system - 1):
+            print(f"{args.path}: no staff system {args.system}", file=sys.stderr)
+            return 1
+        # else: existing system
+        print('\n'.join(l_archive.system_lines(args.system - 1)))
+    # end with
+
+    return 0
+# end of function
+
+
+def convert_file(args):
+    """
+    Convert a tab file between the text layout and the binary format, or into LilyPond
+    source (by file extension).
+
+    :param args: The parsed command line arguments.
+    :return: The exit code (0: success, 1: invalid source or I/O error).
+    """
+    l_start = time.perf_counter()
+    try:
+        if args.source.lower().endswith(BINARY_EXTENSION):
+            l_document = load_binary(args.source)
+        else:
+            with open(args.source, 'r', encoding='utf-8') as l_file:
+                l_document = TabDocument.from_text(l_file.read().rstrip('\r\n').replace('\r', ''))
+            # end with
+        # endif
+        if args.destination.lower().endswith(BINARY_EXTENSION):
+            save_binary(l_document, args.destination)
+        elif args.destination.lower().endswith(NOTATION_EXTENSION):
+            with open(args.destination, 'w', encoding='utf-8') as l_file:
+                l_file.write(NotationRenderer(MeasureIndex(l_document)).render())
+            # end with
+        else:
+            with open(args.destination, 'w', encoding='utf-8') as l_file:
+                l_file.write(TabExporter(MeasureIndex(l_document))
+                             .export(EXPORT_STYLES[args.style]) + '\n')
+            # end with
+        # endif
+    except (OSError, UnicodeError, BinaryFormatError) as l_error:
+        print(f"{args.source}: {l_error}", file=sys.stderr)
+        return 1
+    # end try
+
+    l_duration = time.perf_counter() - l_start
+    print(f"{l_document.width} columns in {l_duration * 1e3:.1f} ms "
+          f"({os.path.getsize(args.source)} -> {os.path.getsize(args.destination)} bytes)",
+          file=sys.stderr)
+
+    return 0
+# end of function
+
+
+def report_results(results):
+    """
+    Print the errors of the processed files on stderr.
+
+    :param results: Iterable of (source path, number of bytes, error messages).
+    :return: (number of bytes, number of files with errors).
+    """
+    l_nb_bytes = 0
+    l_nb_failed = 0
+    for l_src, l_size, l_errors in results:
+        l_nb_bytes += l_size
+        if l_errors:
+            l_nb_failed += 1
+            for l_error in l_errors:
+                print(f"{l_src}: {l_error}", file=sys.stderr)
+            # end for
+        # else: no error
+    # end for
+
+    return (l_nb_bytes, l_nb_failed)
+# end of function
+
+
+def main(argv=None):
+    """
+    Main function of the command line.
+
+    :param argv: The arguments (defaults to sys.argv[1:]).
+    :return: The exit code (0: success, 1: invalid tabs or errors, 2: usage error).
+    """
+    l_parser = build_parser()
+    l_args = l_parser.parse_args(argv)
+    if l_args.command == CMD_OPEN:
+        return open_archive(l_args)
+    # else: other commands
+    if l_args.command == CMD_CONVERT:
+        return convert_file(l_args)
+    # else: batch processing
+    l_tasks = build_tasks(l_args)
+
+    l_to_stdout = l_args.command != CMD_VALIDATE and l_tasks and l_tasks[0][2] is None
+    if l_to_stdout and len(l_tasks) > 1:
+        l_parser.error('several files: use --output or --in-place')
+    # else: valid output
+
+    l_start = time.perf_counter()
+    if len(l_tasks) == 1:
+        # A single file: no process pool
+        l_nb_bytes, l_nb_failed = report_results(map(run_task, l_tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=l_args.jobs) as l_executor:
+            l_nb_bytes, l_nb_failed = report_results(
+                l_executor.map(run_task, l_tasks, chunksize=CHUNK_SIZE))
+        # end with
+    # endif
+
+    l_duration = max(time.perf_counter() - l_start, 1e-9)
+    print(f"{len(l_tasks)} file(s), {l_nb_bytes / 1e6:.2f} MB in {l_duration:.2f} s "
+          f"({len(l_tasks) / l_duration:.1f} files/s, {l_nb_bytes / 1e6 / l_duration:.2f} MB/s), "
+          f"{l_nb_failed} with errors", file=sys.stderr)
+
+    return 1 if l_nb_failed else 0
+# end function
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# End of file
@@ -0,0 +1,563 @@
+"""
+Tab Document Module
+
+USE:
+    This module provides the Tk-independent model of a guitar tab.
+    The tab is stored column by column: each column is a compact `bytes` object holding
+    one cell (one character) per string, so inserting a note, a dash or a bar only costs
+    O(number of strings). Views (e.g. the Tk Text widget) register as listeners and only
+    mirror the columns that changed.
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+import re                       # For the staff lines detection
+from typing import NamedTuple   # For the change description
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+# Guitar Tab
+STRINGS = ['e', 'b', 'g', 'd', 'a', 'e']  # Constant => pylint: disable=C0103
+DASH = '-'  # Constant => pylint: disable=C0103
+BAR = '|'   # Constant => pylint: disable=C0103
+ENCODING = 'ascii'  # Constant => pylint: disable=C0103
+
+# Staff line: string name (e.g. 'e', 'D', 'F#') followed by a bar
+STAFF_LINE_RE = re.compile(r'[A-Ga-g][#b]?\|')  # Constant => pylint: disable=C0103
+
+
+##################
+# CLASS DEFINITION
+##################
+class TabChange(NamedTuple):
+    """
+    Description of a change of the document, sent to the listeners.
+
+    :param kind: 'insert', 'delete' or 'replace'.
+    :param col: First column of the change.
+    :param old: Tuple of the removed/replaced columns (empty for an insertion).
+    :param new: Tuple of the inserted/new columns (empty for a deletion).
+    """
+    kind: str
+    col: int
+    old: tuple
+    new: tuple
+# end of class
+
+
+class TabDocument:
+    """
+    Column-array model of a guitar tab.
+
+    Column 0 holds the string names and column 1 the initial bar, exactly like the
+    text layout of the editor ('e|', 'b|', ...).
+    """
+    __slots__ = ('strings', '_columns', '_listeners', 'version')
+
+    def __init__(self, strings=None, columns=None):
+        """
+        Initialize the document.
+
+        :param strings: The string names (from the highest to the lowest string).
+        :param columns: Optional list of columns (bytes of len(strings) cells).
+        """
+        self.strings = list(strings if strings is not None else STRINGS)
+        if columns is None:
+            # Initial tab: string names followed by a bar
+            columns = [''.join(self.strings).encode(ENCODING),
+                       (BAR * len(self.strings)).encode(ENCODING)]
+        # else: columns provided by the caller
+        self._columns = list(columns)
+        self._listeners = []
+        self.version = 0
+
+        return
+    # end of function
+
+
+    @classmethod
+    def from_text(cls, text, strings=None):
+        """
+        Build a document from the text layout of the editor.
+        Lines shorter than the longest one are padded with '-' at their end.
+
+        :param text: The tab text (one line per string).
+        :param strings: The string names (defaults to the first character of each line).
+        """
+        return cls.from_lines(text.split('\n'), strings)
+    # end of function
+
+
+    @classmethod
+    def from_lines(cls, lines, strings=None):
+        """
+        Build a document from a list of lines (one line per string).
+
+        :param lines: The tab lines.
+        :param strings: The string names (defaults to the first character of each line).
+        """
+        if strings is None:
+            strings = [line[:1] or DASH for line in lines]
+        # else: string names provided by the caller
+        return cls(strings, columns_from_lines(lines))
+    # end of function
+
+
+    ##############################
+    # ACCESSORS
+    ##############################
+    @property
+    def nb_strings(self):
+        """
+        Number of strings (rows) of the tab.
+        """
+        return len(self.strings)
+    # end of function
+
+
+    @property
+    def width(self):
+        """
+        Number of columns of the tab.
+        """
+        return len(self._columns)
+    # end of function
+
+
+    def __len__(self):
+        return len(self._columns)
+    # end of function
+
+
+    def column(self, col):
+        """
+        Get a column.
+
+        :param col: The column index.
+        :return: The column cells (bytes).
+        """
+        return self._columns[col]
+    # end of function
+
+
+    def columns(self, start=0, end=None):
+        """
+        Get a slice of the columns.
+
+        :param start: First column.
+        :param end: Column after the last one (defaults to the end of the tab).
+        :return: List of columns.
+        """
+        return self._columns[start:end]
+    # end of function
+
+
+    def cell(self, row, col):
+        """
+        Get the character of a cell.
+
+        :param row: The string index.
+        :param col: The column index.
+        :return: The cell character ('' outside of the tab).
+        """
+        if 0 <= row < self.nb_strings and 0 <= col < len(self._columns):
+            return chr(self._columns[col][row])
+        # else: outside of the tab
+        return ''
+    # end of function
+
+
+    def line(self, row, start=0, end=None):
+        """
+        Get the text of one string.
+
+        :param row: The string index.
+        :param start: First column.
+        :param end: Column after the last one (defaults to the end of the tab).
+        """
+        return b''.join(self._columns[start:end])[row::self.nb_strings].decode(ENCODING)
+    # end of function
+
+
+    def lines(self, start=0, end=None):
+        """
+        Get the text of all the strings.
+
+        :param start: First column.
+        :param end: Column after the last one (defaults to the end of the tab).
+        """
+        return lines_from_columns(self._columns[start:end], self.nb_strings)
+    # end of function
+
+
+    def to_text(self):
+        """
+        Get the text layout of the tab (one line per string).
+        """
+        return '\n'.join(self.lines())
+    # end of function
+
+
+    ##############################
+    # LISTENERS
+    ##############################
+    def add_listener(self, callback):
+        """
+        Register a function called with a TabChange after each modification.
+
+        :param callback: The function to call.
+        """
+        self._listeners.append(callback)
+
+        return
+    # end of function
+
+
+    def remove_listener(self, callback):
+        """
+        Unregister a listener.
+
+        :param callback: The function to remove.
+        """
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+        # else: not registered
+
+        return
+    # end of function
+
+
+    def _notify(self, change):
+        """
+        Send a change to all the listeners.
+
+        :param change: The TabChange.
+        """
+        self.version += 1
+        for l_listener in self._listeners:
+            l_listener(change)
+        # end for
+
+        return
+    # end of function
+
+
+    ##############################
+    # PRIMITIVE EDITS
+    ##############################
+    def insert_columns(self, col, columns):
+        """
+        Insert columns.
+
+        :param col: Index of the first inserted column.
+        :param columns: The columns to insert.
+        """
+        l_new = tuple(columns)
+        if l_new:
+            self._columns[col:col] = l_new
+            self._notify(TabChange('insert', col, (), l_new))
+        # else: nothing to insert
+
+        return
+    # end of function
+
+
+    def delete_columns(self, col, count=1):
+        """
+        Delete columns.
+
+        :param col: Index of the first deleted column.
+        :param count: Number of columns to delete.
+        :return: The deleted columns.
+        """
+        l_old = tuple(self._columns[col:col + count])
+        if l_old:
+            del self._columns[col:col + len(l_old)]
+            self._notify(TabChange('delete', col, l_old, ()))
+        # else: nothing to delete
+
+        return l_old
+    # end of function
+
+
+    def replace_columns(self, col, columns, count=None):
+        """
+        Replace columns by other ones.
+
+        :param col: Index of the first replaced column.
+        :param columns: The new columns.
+        :param count: Number of replaced columns (defaults to the number of new columns).
+        :return: The replaced columns.
+        """
+        l_new = tuple(columns)
+        if count is None:
+            count = len(l_new)
+        # else: count provided by the caller
+        l_old = tuple(self._columns[col:col + count])
+        if l_old != l_new:
+            self._columns[col:col + len(l_old)] = l_new
+            self._notify(TabChange('replace', col, l_old, l_new))
+        # else: nothing changes
+
+        return l_old
+    # end of function
+
+
+    ##############################
+    # TAB EDITS
+    ##############################
+    def blank_column(self, char=DASH):
+        """
+        Build a column with the same character on every string.
+
+        :param char: The character.
+        """
+        return (char * self.nb_strings).encode(ENCODING)
+    # end of function
+
+
+    def set_cell(self, row, col, char):
+        """
+        Change the character of a cell.
+
+        :param row: The string index.
+        :param col: The column index.
+        :param char: The new character.
+        """
+        l_column = bytearray(self._columns[col])
+        l_column[row] = ord(char)
+        self.replace_columns(col, [bytes(l_column)])
+
+        return
+    # end of function
+
+
+    def write_note(self, row, col, char):
+        """
+        Write a fret digit (or a technique character) on a string.
+        A '-' under the cursor is overwritten, otherwise a new column is inserted with
+        '-' on all the other strings.
+
+        :param row: The string index.
+        :param col: The cursor column.
+        :param char: The character to write.
+        """
+        if col < len(self._columns) and self._columns[col][row] == ord(DASH):
+            # Overwrite the '-'
+            self.set_cell(row, col, char)
+        else:
+            # Insert a new column
+            l_column = bytearray(self.blank_column())
+            l_column[row] = ord(char)
+            self.insert_columns(col, [bytes(l_column)])
+        # endif
+
+        return
+    # end of function
+
+
+    def insert_dash(self, col):
+        """
+        Insert a column of '-'.
+
+        :param col: The column index.
+        """
+        self.insert_columns(col, [self.blank_column()])
+
+        return
+    # end of function
+
+
+    def insert_bar(self, col):
+        """
+        Insert a column of '|' (measure change).
+
+        :param col: The column index.
+        """
+        self.insert_columns(col, [self.blank_column(BAR)])
+
+        return
+    # end of function
+
+
+    def delete_column(self, col):
+        """
+        Delete a column (Shift + Del).
+
+        :param col: The column index.
+        """
+        self.delete_columns(col, 1)
+
+        return
+    # end of function
+
+
+    def set_lines(self, lines):
+        """
+        Replace the whole content of the tab.
+
+        :param lines: The new lines (one per string).
+        """
+        self.replace_columns(0, columns_from_lines(lines), len(self._columns))
+
+        return
+    # end of function
+
+
+    def update_lines(self, lines):
+        """
+        Replace the content of the tab by lines modified outside of the model (e.g. by the
+        Text widget), with one change of the modified columns only. The part of a string
+        that became shorter than the other ones is padded with '-' where it was modified,
+        so the next columns stay aligned (e.g. a backspace blanks a cell).
+
+        :param lines: The new lines (one per string).
+        """
+        l_width = len(self._columns)
+        l_prefix = l_width
+        l_suffix = l_width
+        l_old_lines = self.lines()
+        for l_old, l_new in zip(l_old_lines, lines):
+            l_edit = line_edit(l_old, l_new)
+            if l_edit is not None:
+                l_prefix = min(l_prefix, l_edit[0])
+                l_suffix = min(l_suffix, len(l_old) - l_edit[1])
+            # else: string not modified
+        # end for
+        if l_prefix == l_width:
+            return
+        # else: modified columns
+
+        l_middles = [l_new[l_prefix:len(l_new) - l_suffix] for l_new in lines]
+        self.replace_columns(l_prefix, columns_from_lines(l_middles),
+                             l_width - l_prefix - l_suffix)
+
+        return
+    # end of function
+
+# end of class
+
+
+##################
+# FUNCTIONS
+##################
+def common_prefix_length(first, second):
+    """
+    Length of the common prefix of two strings (binary search on slices compared in C).
+
+    :param first: The first string.
+    :param second: The second string.
+    """
+    l_low, l_high = 0, min(len(first), len(second))
+    while l_low < l_high:
+        l_mid = (l_low + l_high + 1) // 2
+        if first[l_low:l_mid] == second[l_low:l_mid]:
+            l_low = l_mid
+        else:
+            l_high = l_mid - 1
+        # endif
+    # end while
+
+    return l_low
+# end of function
+
+
+def line_edit(old, new):
+    """
+    Compute the smallest single-range edit turning a line into another one.
+
+    :param old: The current line.
+    :param new: The new line.
+    :return: (start, old_end, text): replace old[start:old_end] by text, or None.
+    """
+    if old == new:
+        return None
+    # else: there is a difference
+
+    l_prefix = common_prefix_length(old, new)
+    l_max_suffix = min(len(old), len(new)) - l_prefix
+    l_suffix = common_prefix_length(old[len(old) - l_max_suffix:][::-1],
+                                    new[len(new) - l_max_suffix:][::-1])
+
+    return (l_prefix, len(old) - l_suffix, new[l_prefix:len(new) - l_suffix])
+# end of function
+
+
+def columns_from_lines(lines):
+    """
+    Convert text lines into columns, padding short lines with '-'.
+
+    :param lines: The lines (one per string).
+    :return: List of columns.
+    """
+    l_nb = len(lines)
+    if l_nb == 0:
+        return []
+    # else: at least one string
+    l_len = max(len(line) for line in lines)
+    l_cells = bytearray(l_len * l_nb)
+    for l_row, l_line in enumerate(lines):
+        # Interleave the strings: cell (row, col) is at col * nb + row
+        l_cells[l_row::l_nb] = l_line.ljust(l_len, DASH).encode(ENCODING, errors='replace')
+    # end for
+    l_cells = bytes(l_cells)
+
+    return [l_cells[l_pos:l_pos + l_nb] for l_pos in range(0, len(l_cells), l_nb)]
+# end of function
+
+
+def is_staff_line(line):
+    """
+    Check if a line of a text file is a staff line (string name followed by a bar).
+
+    :param line: The line.
+    """
+    return STAFF_LINE_RE.match(line) is not None
+# end of function
+
+
+def iter_blocks(lines):
+    """
+    Split the lines of a text file into staff systems and other lines.
+    A staff system is a block of consecutive staff lines. The lines are consumed one by
+    one, so a file object can be processed without reading it at once.
+
+    :param lines: Iterable of lines (without the end of line characters).
+    :return: Iterator of (is_system, block lines).
+    """
+    l_system = []
+    for l_line in lines:
+        if is_staff_line(l_line):
+            l_system.append(l_line)
+        else:
+            if l_system:
+                yield (True, l_system)
+                l_system = []
+            # else: no system in progress
+            yield (False, [l_line])
+        # endif
+    # end for
+    if l_system:
+        yield (True, l_system)
+    # else: no system in progress
+# end of function
+
+
+def lines_from_columns(columns, nb_strings):
+    """
+    Convert columns into text lines.
+
+    :param columns: The columns.
+    :param nb_strings: The number of strings.
+    :return: List of lines.
+    """
+    l_cells = b''.join(columns)
+
+    return [l_cells[l_row::nb_strings].decode(ENCODING) for l_row in range(nb_strings)]
+# end of function
+
+# End of file
@@ -0,0 +1,154 @@
+"""
+Tab Editor Module
+
+USE:
+    This module turns key presses into edit commands ("put fret 12 at row 3, col 40",
+    "insert bar", "delete column") and applies them once to a TabDocument.
+    It does not depend on Tk, so it can be driven by the GUI or headless.
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+from typing import NamedTuple  # For the edit commands
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+# Key state masks and keycodes
+SHIFT_MASK = 0x0001         # Constant => pylint: disable=C0103
+CONTROL_MASK = 0x0004       # Constant => pylint: disable=C0103
+ALTGR_MASK = 131116         # Constant => pylint: disable=C0103
+KEYCODE_DEL = 46            # Constant => pylint: disable=C0103
+KEYCODE_PIPE = 54           # Constant => pylint: disable=C0103
+
+# Characters
+DIGITS = '0123456789'       # Constant => pylint: disable=C0103
+
+# Edit actions
+ACTION_NOTE = 'note'                    # Constant => pylint: disable=C0103
+ACTION_DASH = 'dash'                    # Constant => pylint: disable=C0103
+ACTION_BAR = 'bar'                      # Constant => pylint: disable=C0103
+ACTION_DELETE_COLUMN = 'delete_column'  # Constant => pylint: disable=C0103
+
+
+##################
+# CLASS DEFINITION
+##################
+class EditCommand(NamedTuple):
+    """
+    One edit of the tab.
+
+    :param action: One of the ACTION_* constants.
+    :param row: The string index.
+    :param col: The column index (cursor position before the edit).
+    :param value: The written character (ACTION_NOTE only).
+    """
+    action: str
+    row: int
+    col: int
+    value: str = ''
+# end of class
+
+
+class TabEditor:
+    """
+    Apply edit commands to a TabDocument and track the resulting cursor position.
+    """
+    def __init__(self, document):
+        """
+        Initialize the editor.
+
+        :param document: The TabDocument to edit.
+        """
+        self.document = document
+        self.row = 0
+        self.col = document.width
+
+        return
+    # end of function
+
+
+    def apply(self, command):
+        """
+        Apply one edit command.
+
+        :param command: The EditCommand.
+        :return: The new cursor position (row, col).
+        """
+        l_action = command.action
+        if l_action == ACTION_NOTE:
+            # Overwrite the '-' under the cursor, or insert a new column
+            self.document.write_note(command.row, command.col, command.value)
+            l_col = command.col + 1
+        elif l_action == ACTION_DASH:
+            self.document.insert_dash(command.col)
+            l_col = command.col + 1
+        elif l_action == ACTION_BAR:
+            self.document.insert_bar(command.col)
+            l_col = command.col + 1
+        elif l_action == ACTION_DELETE_COLUMN:
+            self.document.delete_column(command.col)
+            l_col = command.col
+        else:
+            raise ValueError(f"Unknown edit action: {l_action}")
+        # endif
+
+        self.row, self.col = command.row, l_col
+
+        return (self.row, self.col)
+    # end of function
+
+# end of class
+
+
+##################
+# FUNCTIONS
+##################
+def command_from_key(char, keycode, state, row, col, keysym=''):
+    """
+    Convert a key press into an edit command.
+
+    :param char: The character of the key (event.char).
+    :param keycode: The keycode of the key (event.keycode).
+    :param state: The modifiers mask (event.state).
+    :param row: The cursor row (string index).
+    :param col: The cursor column.
+    :param keysym: The key symbol (event.keysym).
+    :return: The EditCommand, or None if the key is not an edit of the tab.
+    """
+    if (keycode == KEYCODE_PIPE and state & ALTGR_MASK) or char == '|':
+        # "|" character: checked before the shortcuts, as AltGr is reported as
+        # Control + Alt on Windows
+        return EditCommand(ACTION_BAR, row, col)
+    # else: not a "|"
+
+    if state & CONTROL_MASK:
+        # Shortcut (e.g. Ctrl + Shift + Del): not an edit of the tab
+        return None
+    # else: no Control modifier
+
+    if (state & SHIFT_MASK) and (keycode == KEYCODE_DEL or keysym == 'Delete'):
+        # Shift + Del => delete the characters for the current column
+        return EditCommand(ACTION_DELETE_COLUMN, row, col)
+    # else: not a column deletion
+
+    if char == '.':
+        # "." behaves as "|"
+        return EditCommand(ACTION_BAR, row, col)
+    # else: not a bar
+
+    if char == '-':
+        return EditCommand(ACTION_DASH, row, col)
+    # else: not a dash
+
+    if len(char) == 1 and char in DIGITS:
+        return EditCommand(ACTION_NOTE, row, col, char)
+    # else: not a character to handle
+
+    return None
+# end of function
+
+# End of file
@@ -0,0 +1,218 @@
+"""
+Tab Export Module
+
+USE:
+    This module renders a TabDocument as text for the clipboard and the exported files,
+    in several styles:
+    - raw: the text layout of the editor (one line per string);
+    - wrapped: staff systems of at most N columns, broken at the bars;
+    - condensed: the runs of '-' columns (on every string) reduced to one column;
+    - numbered: a line of measure numbers above each staff system.
+    The lines of each measure are cached by its content (and the condensed option), so an
+    edit only renders the measures it modified again, and the whole text is cached until
+    the next change of the document: copying an unchanged tab is free.
+        l_exporter = TabExporter(l_measures)
+        l_text = l_exporter.export(EXPORT_STYLES[STYLE_WRAPPED])
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+from typing import NamedTuple   # For the export styles
+# APPLICATION libraries
+from tab_document import DASH, ENCODING             # For the tab model
+from tab_layout import SYSTEM_COLUMNS               # For the width of the systems
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+STYLE_RAW = 'raw'              # Constant => pylint: disable=C0103
+STYLE_WRAPPED = 'wrapped'      # Constant => pylint: disable=C0103
+STYLE_CONDENSED = 'condensed'  # Constant => pylint: disable=C0103
+STYLE_NUMBERED = 'numbered'    # Constant => pylint: disable=C0103
+
+
+##################
+# CLASS DEFINITION
+##################
+class ExportStyle(NamedTuple):
+    """
+    Options of an export.
+
+    :param wrap: Maximum number of columns of a staff system (0: one system).
+    :param condensed: True to reduce the runs of '-' columns to one column.
+    :param numbers: True to write the measure numbers above the staff systems.
+    """
+    wrap: int = 0
+    condensed: bool = False
+    numbers: bool = False
+# end of class
+
+
+EXPORT_STYLES = {STYLE_RAW: ExportStyle(),  # Constant => pylint: disable=C0103
+                 STYLE_WRAPPED: ExportStyle(wrap=SYSTEM_COLUMNS),
+                 STYLE_CONDENSED: ExportStyle(condensed=True),
+                 STYLE_NUMBERED: ExportStyle(numbers=True)}
+
+
+class TabExporter:
+    """
+    Text renderer of a TabDocument, with a cache of the lines of its measures.
+    """
+    def __init__(self, measures):
+        """
+        Initialize the exporter.
+
+        :param measures: The MeasureIndex of the document.
+        """
+        self.measures = measures
+        self.document = measures.document
+        self._pieces = {}       # (columns of a measure, condensed) => lines of the measure
+        self._last = None       # (document version, style, text) of the last export
+        self.rendered = 0       # Measures rendered by the last export (not cached)
+
+        return
+    # end of function
+
+
+    def export(self, style=ExportStyle()):
+        """
+        Render the document as text.
+
+        :param style: The ExportStyle.
+        :return: The text (one line per string, staff systems separated by an empty line).
+        """
+        if self._last is not None and self._last[:2] == (self.document.version, style):
+            self.rendered = 0
+            return self._last[2]
+        # else: document modified, or other style
+
+        l_nb = self.document.nb_strings
+        l_columns = self.document.columns()
+        l_ranges = self.measures.measure_ranges()
+        l_prefix = self.document.lines(0, l_ranges[0][0] if l_ranges else len(l_columns))
+
+        l_pieces = {}
+        l_measures = []
+        self.rendered = 0
+        for l_start, l_end in l_ranges:
+            l_key = (b''.join(l_columns[l_start:l_end]), style.condensed)
+            # Measure already met in this export, or not modified since the last one
+            l_lines = l_pieces.get(l_key) or self._pieces.get(l_key)
+            if l_lines is None:
+                l_lines = measure_lines(l_key[0], l_nb, style.condensed)
+                self.rendered += 1
+            # else: cached lines
+            l_pieces[l_key] = l_lines
+            l_measures.append(l_lines)
+        # end for
+        # Only the measures of the document are kept
+        self._pieces = l_pieces
+
+        l_systems = break_systems(l_measures, style.wrap)
+        l_text = '\n\n'.join(system_text(l_prefix, l_system, style.numbers)
+                             for l_system in l_systems)
+        self._last = (self.document.version, style, l_text)
+
+        return l_text
+    # end of function
+
+# end of class
+
+
+##################
+# FUNCTIONS
+##################
+def measure_lines(cells, nb_strings, condensed=False):
+    """
+    Render the lines of a measure.
+
+    :param cells: The columns of the measure (bytes of one cell per string, joined).
+    :param nb_strings: The number of strings.
+    :param condensed: True to reduce the runs of '-' columns to one column.
+    :return: Tuple of the lines (one per string).
+    """
+    if condensed:
+        l_blank = (DASH * nb_strings).encode(ENCODING)
+        l_previous = None
+        l_kept = []
+        for l_off in range(0, len(cells), nb_strings):
+            l_column = cells[l_off:l_off + nb_strings]
+            if l_column != l_blank or l_previous != l_blank:
+                l_kept.append(l_column)
+            # else: run of '-' columns
+            l_previous = l_column
+        # end for
+        cells = b''.join(l_kept)
+    # else: columns kept
+
+    return tuple(cells[l_row::nb_strings].decode(ENCODING) for l_row in range(nb_strings))
+# end of function
+
+
+def break_systems(measures, wrap):
+    """
+    Break measures into staff systems of at most wrap columns (a longer measure is split).
+
+    :param measures: The lines of the measures.
+    :param wrap: The maximum number of columns of a system (0: one system).
+    :return: List of systems, each one a list of (measure number or None, lines).
+    """
+    if not wrap:
+        return [list(enumerate(measures, 1))]
+    # else: wrapped systems
+
+    l_systems = [[]]
+    l_width = 0
+    for l_number, l_lines in enumerate(measures, 1):
+        l_measure_width = len(l_lines[0])
+        if l_measure_width <= wrap:
+            # Usual case: the whole measure
+            if l_systems[-1] and l_width + l_measure_width > wrap:
+                l_systems.append([])
+                l_width = 0
+            # else: the measure fits in the system
+            l_systems[-1].append((l_number, l_lines))
+            l_width += l_measure_width
+            continue
+        # else: measure longer than a system: split
+
+        for l_off in range(0, l_measure_width, wrap):
+            l_chunk = tuple(l_line[l_off:l_off + wrap] for l_line in l_lines)
+            if l_systems[-1] and l_width + len(l_chunk[0]) > wrap:
+                l_systems.append([])
+                l_width = 0
+            # else: the chunk fits in the system
+            l_systems[-1].append((l_number if l_off == 0 else None, l_chunk))
+            l_width += len(l_chunk[0])
+        # end for
+    # end for
+
+    return l_systems
+# end of function
+
+
+def system_text(prefix, system, numbers=False):
+    """
+    Render a staff system.
+
+    :param prefix: The lines of the string names and of the initial bar.
+    :param system: List of (measure number or None, lines) of the system.
+    :param numbers: True to write the measure numbers above the system.
+    :return: The text of the system.
+    """
+    l_lines = [l_start + ''.join(l_piece[l_row] for _, l_piece in system)
+               for l_row, l_start in enumerate(prefix)]
+    if numbers:
+        l_numbers = ' ' * len(prefix[0]) + ''.join(
+            str(l_number or '').ljust(len(l_piece[0]))[:len(l_piece[0])]
+            for l_number, l_piece in system)
+        l_lines.insert(0, l_numbers.rstrip())
+    # else: no measure numbers
+
+    return '\n'.join(l_lines)
+# end of function
+
+# End of file
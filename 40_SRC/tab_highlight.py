@@ -0,0 +1,237 @@
+"""
+Tab Highlight Module
+
+USE:
+    This module highlights a tab displayed by a TabView with Tk tags: frets, bars,
+    technique markers, and misaligned columns (a '|' on some strings only).
+    The highlighter listens to the document and to the view, and only records the range of
+    modified or redrawn columns; the tags of this range are recomputed once the Text
+    widget is up to date (e.g. at idle time), with the tokenizer of the tab transforms.
+    A keystroke therefore re-tags a few columns, whatever the size of the tab.
+        configure_tags(l_text_zone)
+        l_highlighter = TabHighlighter(l_view, l_text_zone.after_idle)
+"""
+
+##################
+# IMPORT SECTION
+##################
+# APPLICATION libraries
+from tab_document import BAR, ENCODING, common_prefix_length  # For the tab model
+from tab_tokenizer import tokenize, KIND_FRET, KIND_TECHNIQUE, KIND_BAR  # For the tokens
+from tab_view import PREFIX_COLUMNS                 # For the displayed columns
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+TAG_FRET = 'fret'               # Constant => pylint: disable=C0103
+TAG_BAR = 'bar'                 # Constant => pylint: disable=C0103
+TAG_TECHNIQUE = 'technique'     # Constant => pylint: disable=C0103
+TAG_MISALIGNED = 'misaligned'   # Constant => pylint: disable=C0103
+TAGS = (TAG_FRET, TAG_BAR, TAG_TECHNIQUE, TAG_MISALIGNED)  # Constant => pylint: disable=C0103
+TAG_OF_KIND = {KIND_FRET: TAG_FRET, KIND_TECHNIQUE: TAG_TECHNIQUE, KIND_BAR: TAG_BAR}  # Constant => pylint: disable=C0103
+
+# Tk options of the tags
+TAG_OPTIONS = {TAG_FRET: {'foreground': '#0033cc'},  # Constant => pylint: disable=C0103
+               TAG_BAR: {'foreground': '#808080'},
+               TAG_TECHNIQUE: {'foreground': '#b35900'},
+               TAG_MISALIGNED: {'background': '#ffc0c0'}}
+
+
+##################
+# CLASS DEFINITION
+##################
+class TabHighlighter:
+    """
+    Incremental Tk tags of the cells of a TabView (listener of the document).
+    """
+    def __init__(self, view, schedule=None):
+        """
+        Initialize the highlighter, and highlight the displayed tab.
+
+        :param view: The TabView (or TabLayoutView) displaying the document.
+        :param schedule: Optional function scheduling the refresh (e.g. after_idle of the
+                         Text widget); without it, refresh must be called by the owner.
+        """
+        self.view = view
+        self.document = view.document
+        self.text_zone = view.text_zone
+        self.schedule = schedule
+        self.scheduled = False
+
+        # Range of columns to highlight again: [low, high[ (empty if low >= high)
+        self._low = 0
+        self._high = 0
+        self._bar = self.document.blank_column(BAR)
+        # Columns redrawn by the view while it mirrors a change not received yet (they are
+        # in the new tab, so the recorded range is moved before recording them)
+        self._version = self.document.version
+        self._redrawn = []
+
+        self.document.add_listener(self.on_change)
+        self.view.redraw_command = self.invalidate
+        self.invalidate(0, self.document.width)
+
+        return
+    # end of function
+
+
+    def detach(self):
+        """
+        Stop highlighting (e.g. before replacing the view).
+        """
+        self.document.remove_listener(self.on_change)
+        self.view.redraw_command = None
+
+        return
+    # end of function
+
+
+    def on_change(self, change):
+        """
+        Record the columns modified by a change of the document.
+
+        :param change: The TabChange sent by the document.
+        """
+        l_col = change.col
+        l_old_end = l_col + len(change.old)
+        l_delta = len(change.new) - len(change.old)
+        if self._low < self._high:
+            # Move the recorded range with the columns
+            if self._high >= l_old_end:
+                self._high += l_delta
+            # else: change after the recorded range
+            if self._low >= l_old_end:
+                self._low += l_delta
+            # else: change after the start of the recorded range
+        # else: nothing recorded
+        self._version = self.document.version
+        for l_low, l_high in self._redrawn:
+            self.invalidate(l_low, l_high)
+        # end for
+        self._redrawn = []
+
+        # Columns really modified (e.g. set_lines replaces the whole tab by a similar one)
+        l_prefix = common_prefix_length(change.old, change.new)
+        l_suffix = common_prefix_length(change.old[l_prefix:][::-1], change.new[l_prefix:][::-1])
+        self.invalidate(l_col + l_prefix, l_col + len(change.new) - l_suffix)
+
+        return
+    # end of function
+
+
+    def invalidate(self, low, high):
+        """
+        Record columns to highlight again, and schedule the refresh.
+
+        :param low: The first column.
+        :param high: The column after the last one.
+        """
+        if self._version != self.document.version:
+            # Reported by the view during a change: recorded once the range is moved
+            self._redrawn.append((low, high))
+            return
+        # else: the recorded range matches the tab
+
+        # A change also modifies the tokens of its neighbours (e.g. "1" + "2" => "12")
+        low = max(low - 1, PREFIX_COLUMNS)
+        high = min(high + 1, self.document.width)
+        if self._low < self._high:
+            self._low = min(self._low, low)
+            self._high = max(self._high, high)
+        else:
+            self._low = low
+            self._high = high
+        # endif
+
+        if self.schedule is not None and not self.scheduled and self._low < self._high:
+            self.scheduled = True
+            self.schedule(self.refresh)
+        # else: refresh already scheduled, or called by the owner
+
+        return
+    # end of function
+
+
+    def refresh(self):
+        """
+        Highlight the recorded columns again (once the Text widget displays them).
+        """
+        self.scheduled = False
+        if self.view.batching:
+            # Changes not displayed yet: the view reports them when displayed
+            return
+        # else: the Text widget is up to date
+
+        l_low = max(self._low, PREFIX_COLUMNS)
+        l_high = min(self._high, self.document.width)
+        self._low = self._high = 0
+        for l_start, l_end in self.view.segments(l_low, l_high):
+            self.highlight(l_start, l_end)
+        # end for
+
+        return
+    # end of function
+
+
+    def highlight(self, start, end):
+        """
+        Set the tags of columns displayed on one line per string.
+
+        :param start: The first column.
+        :param end: The column after the last one.
+        """
+        l_nb = self.document.nb_strings
+        l_columns = self.document.columns(start, end)
+        # Bars of the columns that are not bars on every string
+        l_bar_cell = self._bar[:1]
+        l_misaligned = {l_offset for l_offset, l_column in enumerate(l_columns)
+                        if l_bar_cell in l_column and l_column != self._bar}
+        l_cells = b''.join(l_columns)
+
+        for l_row in range(l_nb):
+            l_line = l_cells[l_row::l_nb].decode(ENCODING, errors='replace')
+            l_first = self.view.index(l_row, start)
+            l_ranges = {l_tag: [] for l_tag in TAGS}
+            for l_token in tokenize(l_line):
+                l_tag = TAG_OF_KIND[l_token.kind]
+                if l_tag == TAG_BAR and l_token.column in l_misaligned:
+                    l_tag = TAG_MISALIGNED
+                # else: the tag of the token kind
+                l_ranges[l_tag] += [f"{l_first}+{l_token.column}c",
+                                    f"{l_first}+{l_token.column + l_token.width}c"]
+            # end for
+
+            l_last = f"{l_first}+{end - start}c"
+            for l_tag, l_indexes in l_ranges.items():
+                self.text_zone.tag_remove(l_tag, l_first, l_last)
+                if l_indexes:
+                    self.text_zone.tag_add(l_tag, *l_indexes)
+                # else: no token of this kind
+            # end for
+        # end for
+
+        return
+    # end of function
+
+# end of class
+
+
+##################
+# FUNCTIONS
+##################
+def configure_tags(text_zone):
+    """
+    Configure the Tk tags of the highlighting (the selection stays visible above them).
+
+    :param text_zone: The Text widget.
+    """
+    for l_tag, l_options in TAG_OPTIONS.items():
+        text_zone.tag_configure(l_tag, **l_options)
+    # end for
+    text_zone.tag_raise('sel')
+
+    return
+# end of function
+
+# End of file
@@ -0,0 +1,208 @@
+"""
+Tab History Module
+
+USE:
+    This module provides the undo/redo history of a TabDocument.
+    The history listens to the document and stores each change as the columns it removed
+    and inserted. The columns are immutable `bytes` shared with the document, and the
+    history keeps them packed in parallel arrays (one entry per change, the cells in one
+    bytearray), so an entry costs the size of the edit: a note is a few tens of bytes,
+    whatever the size of the tab.
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+from array import array         # For the compact entries
+
+
+##################
+# CLASS DEFINITION
+##################
+class TabHistory:
+    """
+    Undo/redo history of a TabDocument.
+
+    Entry i replaced old_counts[i] columns by new_counts[i] columns at cols[i]. Its cells
+    are stored at offsets[i] in the data: the old columns, then the new ones. Each edit of
+    the tab (even on several columns, e.g. a pasted block) is one change of the document,
+    so one entry is undone and redone at a time.
+    """
+    __slots__ = ('document', 'cols', 'old_counts', 'new_counts', 'offsets', 'data',
+                 'position', '_applying')
+
+    def __init__(self, document):
+        """
+        Initialize an empty history and register it as a listener of the document.
+
+        :param document: The TabDocument.
+        """
+        self.document = document
+        self.cols = array('i')
+        self.old_counts = array('i')
+        self.new_counts = array('i')
+        self.offsets = array('q')
+        self.data = bytearray()
+        self.position = 0       # Number of entries applied (the next ones can be redone)
+        self._applying = False  # True while undoing or redoing
+        self.document.add_listener(self.on_change)
+
+        return
+    # end of function
+
+
+    def __len__(self):
+        return len(self.cols)
+    # end of function
+
+
+    def on_change(self, change):
+        """
+        Record a change of the document (the changes after the position are dropped).
+
+        :param change: The TabChange sent by the document.
+        """
+        if self._applying:
+            return
+        # else: new edit
+
+        self._truncate(self.position)
+        self.cols.append(change.col)
+        self.old_counts.append(len(change.old))
+        self.new_counts.append(len(change.new))
+        self.offsets.append(len(self.data))
+        self.data += b''.join(change.old)
+        self.data += b''.join(change.new)
+        self.position = len(self.cols)
+
+        return
+    # end of function
+
+
+    def _truncate(self, count):
+        """
+        Drop the entries after the first ones.
+
+        :param count: The number of entries to keep.
+        """
+        if count < len(self.cols):
+            del self.data[self.offsets[count]:]
+            for l_array in (self.cols, self.old_counts, self.new_counts, self.offsets):
+                del l_array[count:]
+            # end for
+        # else: nothing to drop
+
+        return
+    # end of function
+
+
+    def _columns(self, offset, count):
+        """
+        Get columns stored in the data.
+
+        :param offset: Offset of the first column.
+        :param count: Number of columns.
+        :return: List of columns.
+        """
+        l_nb = self.document.nb_strings
+        l_cells = bytes(self.data[offset:offset + count * l_nb])
+
+        return [l_cells[l_pos:l_pos + l_nb] for l_pos in range(0, len(l_cells), l_nb)]
+    # end of function
+
+
+    def can_undo(self):
+        """
+        True if a change can be undone.
+        """
+        return self.position > 0
+    # end of function
+
+
+    def can_redo(self):
+        """
+        True if a change can be redone.
+        """
+        return self.position < len(self.cols)
+    # end of function
+
+
+    def undo(self):
+        """
+        Undo the last change.
+
+        :return: The column of the undone change (None if there is nothing to undo).
+        """
+        if not self.can_undo():
+            return None
+        # else: at least one entry
+
+        l_entry = self.position - 1
+        l_col = self.cols[l_entry]
+        self._applying = True
+        try:
+            self.document.replace_columns(
+                l_col, self._columns(self.offsets[l_entry], self.old_counts[l_entry]),
+                self.new_counts[l_entry])
+            self.position = l_entry
+        finally:
+            self._applying = False
+        # end try
+
+        return l_col
+    # end of function
+
+
+    def redo(self):
+        """
+        Redo the next change.
+
+        :return: The column after the redone change (None if there is nothing to redo).
+        """
+        if not self.can_redo():
+            return None
+        # else: at least one undone entry
+
+        l_entry = self.position
+        l_col = self.cols[l_entry]
+        l_old_count = self.old_counts[l_entry]
+        l_new_count = self.new_counts[l_entry]
+        self._applying = True
+        try:
+            self.document.replace_columns(
+                l_col, self._columns(self.offsets[l_entry] + l_old_count * self.document.nb_strings,
+                                     l_new_count),
+                l_old_count)
+            self.position = l_entry + 1
+        finally:
+            self._applying = False
+        # end try
+
+        return l_col + l_new_count
+    # end of function
+
+
+    def clear(self):
+        """
+        Forget all the changes.
+        """
+        self._truncate(0)
+        self.position = 0
+
+        return
+    # end of function
+
+
+    def memory_size(self):
+        """
+        Number of bytes used by the entries (arrays and cells).
+        """
+        return len(self.data) + sum(l_array.itemsize * len(l_array)
+                                    for l_array in (self.cols, self.old_counts, self.new_counts,
+                                                    self.offsets))
+    # end of function
+
+# end of class
+
+# End of file
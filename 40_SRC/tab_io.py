@@ -0,0 +1,177 @@
+"""
+Tab I/O Module
+
+USE:
+    This module runs the blocking I/O calls of the application on a worker thread, so
+    that the buttons return control to the user immediately: the clipboard copies
+    (pyperclip starts an xclip/xsel process on Linux).
+    The calls are queued in order on a single thread. Their results are reported on the
+    Tk thread (Tk is not thread-safe): the worker only fills a queue, polled with
+    root.after while calls are pending.
+    A copy of the content still being copied is skipped (e.g. the Copy button pressed
+    several times while the clipboard is slow); once done, the same content is copied
+    again, as the clipboard may have been written by another application meanwhile.
+        l_worker = IOWorker(root)
+        l_worker.copy(l_text, on_done=lambda l_result, l_error: ...)
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+import queue                    # For the results
+from concurrent.futures import ThreadPoolExecutor  # For the worker thread
+from pyperclip import copy      # For clipboard copy
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+POLL_MS = 20  # Period of the results polling (only while calls are pending) => pylint: disable=C0103
+THREAD_NAME = 'gtw-io'  # Constant => pylint: disable=C0103
+
+
+##################
+# CLASS DEFINITION
+##################
+class IOWorker:
+    """
+    Worker thread of the clipboard calls, reporting on the Tk thread.
+    """
+    def __init__(self, root, copy_function=copy):
+        """
+        Initialize the worker (the thread is started by the first call).
+
+        :param root: The Tk root window (its after method schedules the reports).
+        :param copy_function: Function copying a text to the clipboard.
+        """
+        self.root = root
+        self.copy_function = copy_function
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=THREAD_NAME)
+        self._results = queue.SimpleQueue()    # (callback, result, error) of the done calls
+        self._pending = 0                       # Calls submitted and not reported yet
+        self._poll_id = None
+        self._copied = None     # Content being copied (None: no copy in flight)
+
+        return
+    # end of function
+
+
+    ##############################
+    # CALLS
+    ##############################
+    def copy(self, text, on_done=None):
+        """
+        Copy a text to the clipboard, unless it is the content being copied.
+
+        :param text: The text.
+        :param on_done: Optional function called on the Tk thread with (result, error).
+        :return: False if the copy has been skipped.
+        """
+        if text == self._copied:
+            return False
+        # else: new content
+
+        self._copied = text
+        self.submit(self._copy, on_done, text)
+
+        return True
+    # end of function
+
+
+    def _copy(self, text):
+        """
+        Copy a text to the clipboard (worker thread).
+
+        :param text: The text.
+        """
+        try:
+            self.copy_function(text)
+        finally:
+            # Copy done: the next copy of this content is a new one
+            if self._copied is text:
+                self._copied = None
+            # else: newer content
+        # end try
+
+        return
+    # end of function
+
+
+    def forget_copy(self):
+        """
+        Forget the content being copied (the clipboard has been written by someone else).
+        """
+        self._copied = None
+
+        return
+    # end of function
+
+
+    def submit(self, function, on_done, *args):
+        """
+        Run a function on the worker thread, and report its result on the Tk thread.
+
+        :param function: The function.
+        :param on_done: Optional function called on the Tk thread with (result, error).
+        :param args: The arguments of the function.
+        """
+        l_future = self._executor.submit(function, *args)
+        l_future.add_done_callback(lambda l_done: self._results.put((on_done, l_done)))
+        self._pending += 1
+        if self._poll_id is None:
+            self._poll_id = self.root.after(POLL_MS, self.poll)
+        # else: already polling
+
+        return
+    # end of function
+
+
+    ##############################
+    # REPORTS (Tk thread)
+    ##############################
+    def poll(self):
+        """
+        Report the done calls, and poll again while calls are pending.
+        """
+        self._poll_id = None
+        while True:
+            try:
+                l_on_done, l_future = self._results.get_nowait()
+            except queue.Empty:
+                break
+            # end try
+            self._pending -= 1
+            if l_future.cancelled():
+                continue
+            # else: call done
+            l_error = l_future.exception()
+            if l_on_done is not None:
+                l_on_done(None if l_error else l_future.result(), l_error)
+            # else: nothing to report
+        # end while
+
+        if self._pending:
+            self._poll_id = self.root.after(POLL_MS, self.poll)
+        # else: idle
+
+        return
+    # end of function
+
+
+    def close(self):
+        """
+        Stop the worker: the queued calls are cancelled, the running one ends alone.
+        """
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = None
+        # else: not polling
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+        return
+    # end of function
+
+# end of class
+
+# End of file
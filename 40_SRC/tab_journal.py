@@ -0,0 +1,312 @@
+"""
+Tab Journal Module
+
+USE:
+    This module autosaves a TabDocument as an append-only journal of its changes.
+    Each change of the document is appended as one record (column, number of removed
+    columns, new columns), and the records are written and fsynced in batches, so the
+    autosave I/O depends on what changed and not on the size of the tab. When the journal
+    grows, it is compacted into a snapshot of the whole tab.
+    After a crash, the last state is rebuilt from the snapshot and the journal. After a
+    clean exit (marker file written by close), the application starts with a new tab.
+    Files of the autosave directory:
+        tab.snapshot    "gtw-snapshot VERSION GENERATION" line, then the tab lines
+        tab.journal     header (magic, version, generation, number of strings), then records
+        tab.clean       empty marker: the last session exited cleanly
+    The journal is only replayed if its generation is the one of the snapshot, so a crash
+    during a compaction never applies a change twice.
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+import os                       # For the files
+import shutil                   # For the file permissions
+import struct                   # For the records
+import tempfile                 # For the atomic snapshots
+import zlib                     # For the record checksums
+# APPLICATION libraries
+from tab_document import ENCODING   # For the tab model
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+AUTOSAVE_ENV = 'GTW_AUTOSAVE_DIR'  # '0' disables the autosave => pylint: disable=C0103
+AUTOSAVE_DIR = os.path.join(os.path.expanduser('~'), '.guitar_tab_writer')  # Constant => pylint: disable=C0103
+AUTOSAVE_MS = 2000  # Period of the journal writes => pylint: disable=C0103
+SNAPSHOT_FILE = 'tab.snapshot'  # Constant => pylint: disable=C0103
+JOURNAL_FILE = 'tab.journal'    # Constant => pylint: disable=C0103
+CLEAN_FILE = 'tab.clean'        # Constant => pylint: disable=C0103
+SNAPSHOT_TAG = 'gtw-snapshot'   # Constant => pylint: disable=C0103
+JOURNAL_VERSION = 1  # Constant => pylint: disable=C0103
+
+# Compaction: when the journal is larger than the snapshot x ratio (and than the minimum)
+COMPACT_MIN_BYTES = 1 << 20  # Constant => pylint: disable=C0103
+COMPACT_RATIO = 2  # Constant => pylint: disable=C0103
+
+# Binary layout
+JOURNAL_HEADER = struct.Struct('<4sHQH')  # Magic, version, generation, strings => pylint: disable=C0103
+JOURNAL_MAGIC = b'GTWJ'  # Constant => pylint: disable=C0103
+RECORD_HEADER = struct.Struct('<IIII')  # Column, removed, inserted, CRC32 => pylint: disable=C0103
+
+
+##################
+# CLASS DEFINITION
+##################
+class TabJournal:
+    """
+    Append-only autosave of a TabDocument.
+    """
+    def __init__(self, directory, document):
+        """
+        Restore the last autosaved state into the document (only if the last session did
+        not exit cleanly), then start journaling its changes.
+
+        :param directory: The autosave directory (created if needed).
+        :param document: The TabDocument.
+        """
+        self.directory = directory
+        self.document = document
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self.journal_path = os.path.join(directory, JOURNAL_FILE)
+        self.clean_path = os.path.join(directory, CLEAN_FILE)
+        self.generation = 0
+        self.snapshot_size = 0
+        self.journal_size = 0
+        self.restored = False    # True if a previous state has been restored
+        self._pending = bytearray()
+        self._file = None
+        os.makedirs(directory, exist_ok=True)
+
+        if os.path.exists(self.clean_path):
+            # Clean exit: the tab of the last session is not restored
+            os.remove(self.clean_path)
+        else:
+            self.restored = self.recover()
+        # endif
+        # Start from a clean snapshot: the journal only holds the changes of this session
+        self.compact()
+        self.document.add_listener(self.on_change)
+
+        return
+    # end of function
+
+
+    def on_change(self, change):
+        """
+        Append a change of the document to the pending records.
+
+        :param change: The TabChange sent by the document.
+        """
+        l_payload = b''.join(change.new)
+        l_fields = (change.col, len(change.old), len(change.new))
+        l_crc = zlib.crc32(struct.pack('<III', *l_fields) + l_payload)
+        self._pending += RECORD_HEADER.pack(*l_fields, l_crc)
+        self._pending += l_payload
+
+        return
+    # end of function
+
+
+    @property
+    def dirty(self):
+        """
+        True if changes have not been written yet.
+        """
+        return bool(self._pending)
+    # end of function
+
+
+    def flush(self):
+        """
+        Write and fsync the pending records (one write per batch), and compact the journal
+        if it became too large.
+        """
+        if not self._pending:
+            return
+        # else: records to write
+
+        self._file.write(self._pending)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.journal_size += len(self._pending)
+        self._pending.clear()
+
+        if self.journal_size > max(COMPACT_MIN_BYTES, self.snapshot_size * COMPACT_RATIO):
+            self.compact()
+        # else: small journal
+
+        return
+    # end of function
+
+
+    def compact(self):
+        """
+        Write a snapshot of the whole tab and start a new (empty) journal.
+        """
+        self._pending.clear()
+        self.generation += 1
+
+        # New snapshot (atomic replace)
+        l_text = f"{SNAPSHOT_TAG} {JOURNAL_VERSION} {self.generation}\n" + self.document.to_text()
+        self.snapshot_size = len(l_text)
+        write_atomic(self.snapshot_path, l_text.encode(ENCODING, errors='replace'))
+
+        # New journal: the old one belongs to the previous generation
+        if self._file is not None:
+            self._file.close()
+        # else: first journal
+        write_atomic(self.journal_path, JOURNAL_HEADER.pack(
+            JOURNAL_MAGIC, JOURNAL_VERSION, self.generation, self.document.nb_strings))
+        self._file = open(self.journal_path, 'ab')  # pylint: disable=consider-using-with
+        self.journal_size = JOURNAL_HEADER.size
+
+        return
+    # end of function
+
+
+    def recover(self):
+        """
+        Rebuild the last autosaved state: the snapshot, then the valid records of the
+        journal of the same generation (a record torn by a crash ends the replay).
+
+        :return: True if a state has been restored.
+        """
+        try:
+            with open(self.snapshot_path, 'rb') as l_file:
+                l_header, _, l_text = l_file.read().decode(ENCODING, errors='replace') \
+                    .partition('\n')
+            # end with
+        except FileNotFoundError:
+            return False
+        # end try
+
+        l_fields = l_header.split()
+        if len(l_fields) != 3 or l_fields[0] != SNAPSHOT_TAG \
+                or l_fields[1] != str(JOURNAL_VERSION):
+            return False
+        # else: valid snapshot
+        self.generation = int(l_fields[2])
+        l_lines = l_text.split('\n')
+        if len(l_lines) != self.document.nb_strings:
+            return False
+        # else: same number of strings
+        self.document.set_lines(l_lines)
+
+        for l_col, l_count, l_columns in self.read_records():
+            self.document.replace_columns(l_col, l_columns, l_count)
+        # end for
+
+        return True
+    # end of function
+
+
+    def read_records(self):
+        """
+        Read the valid records of the journal of the current generation.
+
+        :return: Iterator of (column, number of removed columns, new columns).
+        """
+        try:
+            with open(self.journal_path, 'rb') as l_file:
+                l_data = l_file.read()
+            # end with
+        except FileNotFoundError:
+            return
+        # end try
+
+        l_nb = self.document.nb_strings
+        if len(l_data) < JOURNAL_HEADER.size \
+                or JOURNAL_HEADER.unpack_from(l_data) != (JOURNAL_MAGIC, JOURNAL_VERSION,
+                                                          self.generation, l_nb):
+            # Journal of another generation (crash during a compaction) or corrupted
+            return
+        # else: journal of the snapshot
+
+        l_pos = JOURNAL_HEADER.size
+        while l_pos + RECORD_HEADER.size <= len(l_data):
+            l_col, l_count, l_nb_new, l_crc = RECORD_HEADER.unpack_from(l_data, l_pos)
+            l_start = l_pos + RECORD_HEADER.size
+            l_payload = l_data[l_start:l_start + l_nb_new * l_nb]
+            if len(l_payload) != l_nb_new * l_nb \
+                    or zlib.crc32(struct.pack('<III', l_col, l_count, l_nb_new) + l_payload) != l_crc:
+                # Record torn by a crash
+                return
+            # else: valid record
+            yield (l_col, l_count, [l_payload[l_off:l_off + l_nb]
+                                    for l_off in range(0, len(l_payload), l_nb)])
+            l_pos = l_start + len(l_payload)
+        # end while
+    # end of function
+
+
+    def close(self):
+        """
+        Write the last changes, compact the journal and mark the exit as clean.
+        """
+        if self._file is not None:
+            self.flush()
+            self.compact()
+            self._file.close()
+            self._file = None
+            self.document.remove_listener(self.on_change)
+            write_atomic(self.clean_path, b'')
+        # else: already closed
+
+        return
+    # end of function
+
+# end of class
+
+
+##################
+# FUNCTIONS
+##################
+def write_atomic(path, data):
+    """
+    Write a file atomically: a temporary file is written, fsynced and renamed.
+
+    :param path: The file path.
+    :param data: The bytes to write.
+    """
+    l_fd, l_tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with open(l_fd, 'wb') as l_file:
+            l_file.write(data)
+            l_file.flush()
+            os.fsync(l_file.fileno())
+        # end with
+        if os.path.exists(path):
+            # mkstemp creates the file for the owner only: keep the permissions of the file
+            shutil.copymode(path, l_tmp)
+        # else: new file
+        os.replace(l_tmp, path)
+    except BaseException:
+        if os.path.exists(l_tmp):
+            os.remove(l_tmp)
+        # else: already renamed
+        raise
+    # end try
+
+    return
+# end of function
+
+
+def autosave_directory(environ):
+    """
+    Get the autosave directory requested by the environment.
+
+    :param environ: The environment variables (e.g. os.environ).
+    :return: The directory, or None if the autosave is disabled (GTW_AUTOSAVE_DIR=0).
+    """
+    l_directory = environ.get(AUTOSAVE_ENV, AUTOSAVE_DIR)
+    if not l_directory or l_directory == '0':
+        return None
+    # else: autosave enabled
+
+    return l_directory
+# end of function
+
+# End of file
@@ -0,0 +1,502 @@
+"""
+Tab Layout Module
+
+USE:
+    This module displays a TabDocument as stacked staff systems (auto-layout): the tab is
+    broken at the '|' bars into systems of at most a given number of columns, each one
+    starting with the string names, separated by an empty line.
+    The layout is maintained incrementally: an edit only re-breaks the systems around it,
+    until the breaks meet the previous ones again, and only these systems are patched in
+    the Text widget. The cost of a keystroke is therefore O(system) instead of O(song).
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+from bisect import bisect_left, bisect_right  # For the system search
+# APPLICATION libraries
+from tab_document import STRINGS, BAR               # For the tab model
+from tab_view import TabView, PREFIX_COLUMNS        # For the Text widget view
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+SYSTEM_COLUMNS = 80  # Default width of a system (without the string names) => pylint: disable=C0103
+
+
+##################
+# CLASS DEFINITION
+##################
+class TabLayoutView(TabView):
+    """
+    Text widget view of a TabDocument as stacked staff systems.
+
+    System i holds the columns [starts[i], starts[i + 1]) (starts[0] is the first column
+    after the string names), and is displayed on the Text lines i * (strings + 1) + 1 to
+    i * (strings + 1) + strings.
+    """
+    def __init__(self, text_zone, document, system_columns=SYSTEM_COLUMNS):
+        """
+        Initialize the view and register it as a listener of the document.
+
+        :param text_zone: The Text widget.
+        :param document: The TabDocument to display.
+        :param system_columns: Maximum number of columns of a system (without the names).
+        """
+        super().__init__(text_zone, document)
+        self.system_columns = max(int(system_columns), 1)
+        self.starts = [PREFIX_COLUMNS]
+        self.shown = []             # Lines displayed for each system
+        self._bar = document.blank_column(BAR)
+
+        # Batch mode: range of the modified columns
+        self._dirty_low = 0
+        self._dirty_high = 0
+
+        return
+    # end of function
+
+
+    ##############################
+    # LAYOUT
+    ##############################
+    def next_break(self, start):
+        """
+        Get the end of the system starting at a column: after the last bar that fits in
+        the system width (or at the width, if the measure is longer than a system).
+
+        :param start: The first column of the system.
+        :return: The first column of the next system (the tab width for the last one).
+        """
+        l_width = self.document.width
+        l_limit = start + self.system_columns
+        if l_limit >= l_width:
+            return l_width
+        # else: the system is full
+
+        l_columns = self.document.columns(start, l_limit)
+        for l_offset in range(len(l_columns) - 1, -1, -1):
+            if l_columns[l_offset] == self._bar:
+                return start + l_offset + 1
+            # else: not a bar
+        # end for
+
+        # Measure longer than a system
+        return l_limit
+    # end of function
+
+
+    def system_lines(self, index):
+        """
+        Get the displayed lines of a system.
+
+        :param index: The system index.
+        """
+        l_end = self.starts[index + 1] if index + 1 < len(self.starts) else self.document.width
+
+        return [l_prefix + l_line for l_prefix, l_line in
+                zip(self.document.lines(0, PREFIX_COLUMNS),
+                    self.document.lines(self.starts[index], l_end))]
+    # end of function
+
+
+    def relayout(self, low, high):
+        """
+        Re-break the systems around modified columns, and patch them in the Text widget.
+
+        :param low: First modified column.
+        :param high: Column after the last modified one (in the new tab).
+        """
+        if low < PREFIX_COLUMNS:
+            # String names modified: they are displayed by every system
+            self.render()
+            return
+        # else: columns of the systems
+
+        l_old = self.starts
+        # Restart one system before the modified one: its end may move back
+        l_first = max(bisect_left(l_old, low) - 2, 0)
+        l_new = l_old[:l_first + 1]
+        l_width = self.document.width
+
+        # Greedy breaking until a break meets an old (unmodified) one
+        l_old_pos = l_first + 1
+        l_resync = len(l_old)
+        l_start = l_new[-1]
+        while True:
+            l_next = self.next_break(l_start)
+            if l_next >= l_width:
+                break
+            # else: one more system
+            while l_old_pos < len(l_old) and l_old[l_old_pos] < l_next:
+                l_old_pos += 1
+            # end while
+            if l_old_pos < len(l_old) and l_old[l_old_pos] == l_next and l_next > high:
+                l_resync = l_old_pos
+                break
+            # else: the layout still differs
+            l_new.append(l_next)
+            l_start = l_next
+        # end while
+
+        l_nb_new = len(l_new)
+        self.starts = l_new + l_old[l_resync:]
+        self.replace_systems(l_first, l_resync, [self.system_lines(l_index)
+                                                 for l_index in range(l_first, l_nb_new)])
+        self.redrawn(self.starts[l_first], self.starts[l_nb_new] if l_nb_new < len(self.starts)
+                     else l_width)
+
+        return
+    # end of function
+
+
+    ##############################
+    # TEXT WIDGET
+    ##############################
+    def line_nb(self, system, row=0):
+        """
+        Get the Text line (from 1) of a string of a system.
+
+        :param system: The system index.
+        :param row: The string index.
+        """
+        return system * (self.document.nb_strings + 1) + row + 1
+    # end of function
+
+
+    def replace_systems(self, first, end, systems):
+        """
+        Replace displayed systems by new ones.
+
+        :param first: Index of the first replaced system.
+        :param end: Index after the last replaced system.
+        :param systems: The lines of the new systems.
+        """
+        l_common = min(end - first, len(systems))
+        for l_index in range(l_common):
+            for l_row, l_line in enumerate(systems[l_index]):
+                self.patch_line(self.line_nb(first + l_index, l_row) - 1, 0,
+                                self.shown[first + l_index][l_row], l_line)
+            # end for
+        # end for
+
+        l_pos = first + l_common
+        l_has_next = end < len(self.shown)
+        if end - first > l_common:
+            # Systems removed
+            if l_has_next:
+                self.text_zone.delete(f"{self.line_nb(l_pos)}.0", f"{self.line_nb(end)}.0")
+            else:
+                self.text_zone.delete(f"{self.line_nb(l_pos) - 2}.end", 'end-1c')
+            # endif
+        elif len(systems) > l_common:
+            # Systems added
+            l_text = '\n\n'.join('\n'.join(l_lines) for l_lines in systems[l_common:])
+            if l_has_next:
+                self.text_zone.insert(f"{self.line_nb(l_pos)}.0", l_text + '\n\n')
+            else:
+                self.text_zone.insert('end-1c', '\n\n' + l_text)
+            # endif
+        # else: same number of systems
+        self.shown[first:end] = systems
+        self.text_zone.edit_modified(False)
+
+        return
+    # end of function
+
+
+    def render(self):
+        """
+        Break the whole document into systems and display them (initial display).
+        """
+        self.starts = [PREFIX_COLUMNS]
+        while True:
+            l_next = self.next_break(self.starts[-1])
+            if l_next >= self.document.width:
+                break
+            # else: one more system
+            self.starts.append(l_next)
+        # end while
+        self.shown = [self.system_lines(l_index) for l_index in range(len(self.starts))]
+
+        self.text_zone.delete('1.0', 'end')
+        self.text_zone.insert('1.0', '\n\n'.join('\n'.join(l_lines) for l_lines in self.shown))
+        self.text_zone.edit_modified(False)
+        self.redrawn(0, self.document.width)
+
+        return
+    # end of function
+
+
+    def system_of(self, col):
+        """
+        Get the system displaying a column.
+
+        :param col: The column index.
+        """
+        return max(bisect_right(self.starts, col) - 1, 0)
+    # end of function
+
+
+    def index(self, row, col):
+        """
+        Get the Text widget index of a cell.
+
+        :param row: The string index.
+        :param col: The column index in the document.
+        """
+        if col < PREFIX_COLUMNS:
+            return f"{row + 1}.{col}"
+        # else: column of a system
+        l_system = self.system_of(col)
+
+        return f"{self.line_nb(l_system, row)}.{self.widget_char(l_system, col)}"
+    # end of function
+
+
+    def cell_at(self, index):
+        """
+        Get the cell of the tab displayed at a Text widget index.
+
+        :param index: The "line.char" index.
+        :return: (row, col), or None if the index is not on a string.
+        """
+        l_line, l_char = map(int, index.split('.'))
+        l_system, l_row = divmod(l_line - 1, self.document.nb_strings + 1)
+        if l_row >= self.document.nb_strings or l_system >= len(self.starts):
+            return None
+        # else: on a string
+        if l_system == 0 and l_char < PREFIX_COLUMNS:
+            return (l_row, l_char)
+        # else: column of a system
+
+        return (l_row, self.starts[l_system] + max(l_char - PREFIX_COLUMNS, 0))
+    # end of function
+
+
+    def select_columns(self, start, end, first_row=0, last_row=None):
+        """
+        Select columns of strings (Tk "sel" tag), on each system holding them.
+
+        :param start: First column.
+        :param end: Column after the last one.
+        :param first_row: The first selected string.
+        :param last_row: The last selected string (defaults to the last string).
+        """
+        self.text_zone.tag_remove('sel', '1.0', 'end')
+        for l_system in range(self.system_of(start), self.system_of(max(end - 1, start)) + 1):
+            l_start = self.starts[l_system]
+            l_first = max(start, l_start)
+            l_last = min(end, self.starts[l_system + 1] if l_system + 1 < len(self.starts)
+                         else self.document.width)
+            for l_row in self.rows(first_row, last_row):
+                l_line = self.line_nb(l_system, l_row)
+                self.text_zone.tag_add(
+                    'sel', f"{l_line}.{self.widget_char(l_system, l_first)}",
+                    f"{l_line}.{self.widget_char(l_system, max(l_last, l_first))}")
+            # end for
+        # end for
+
+        return
+    # end of function
+
+
+    def segments(self, low, high):
+        """
+        Split a range of columns into the parts displayed on each system.
+
+        :param low: The first column.
+        :param high: The column after the last one.
+        :return: List of (first column, column after the last one).
+        """
+        l_segments = []
+        for l_system in range(self.system_of(low), self.system_of(max(high - 1, low)) + 1):
+            l_end = self.starts[l_system + 1] if l_system + 1 < len(self.starts) \
+                else self.document.width
+            l_first = max(low, self.starts[l_system] if l_system else 0)
+            if l_first < min(high, l_end):
+                l_segments.append((l_first, min(high, l_end)))
+            # else: empty part
+        # end for
+
+        return l_segments
+    # end of function
+
+
+    def widget_char(self, system, col):
+        """
+        Get the position of a column on the lines of a system.
+
+        :param system: The system index.
+        :param col: The column index in the document.
+        """
+        if col < PREFIX_COLUMNS:
+            return col
+        # else: column after the string names
+
+        return col - self.starts[system] + PREFIX_COLUMNS
+    # end of function
+
+
+    def show(self, col):
+        """
+        Nothing to slide: the Text widget scrolls to the system of the cursor.
+        """
+        return
+    # end of function
+
+
+    ##############################
+    # LISTENER
+    ##############################
+    def on_change(self, change):
+        """
+        Update the layout after a change of the document.
+
+        :param change: The TabChange sent by the document.
+        """
+        if self.muted:
+            return
+        # else: mirror the change
+
+        l_col = change.col
+        l_delta = len(change.new) - len(change.old)
+        l_old_end = l_col + len(change.old)
+        if l_delta:
+            # Move the next systems (the ones inside a deleted range collapse to its start)
+            l_first = bisect_right(self.starts, l_col)
+            self.starts[l_first:] = [l_start + l_delta if l_start >= l_old_end else l_col
+                                     for l_start in self.starts[l_first:]]
+        # else: same columns
+        l_high = l_col + len(change.new)
+
+        if self.batching:
+            if self._dirty_high >= l_old_end:
+                self._dirty_high += l_delta
+            # else: change after the modified range
+            self._dirty_low = min(self._dirty_low, l_col)
+            self._dirty_high = max(self._dirty_high, l_high)
+            return
+        # else: display the change now
+
+        self.relayout(l_col, l_high)
+
+        return
+    # end of function
+
+
+    def begin_batch(self):
+        """
+        Start recording the changes instead of displaying them one by one.
+        """
+        if not self.batching:
+            self.batching = True
+            self._dirty_low = self.document.width
+            self._dirty_high = 0
+        # else: already batching
+
+        return
+    # end of function
+
+
+    def end_batch(self):
+        """
+        Display all the changes recorded since begin_batch.
+        """
+        if not self.batching:
+            return
+        # else: display the recorded changes
+
+        self.batching = False
+        if self._dirty_low <= self._dirty_high:
+            self.relayout(self._dirty_low, self._dirty_high)
+        # else: nothing has been modified
+
+        return
+    # end of function
+
+
+    def resync(self):
+        """
+        Update the document from the Text widget, if the text has been modified outside
+        of the model (e.g. paste, backspace): the modified columns are one change of the
+        document, so only the systems around them are broken and displayed again.
+        """
+        if not self.text_zone.edit_modified():
+            return
+        # else: the Text widget has been modified
+
+        l_nb = self.document.nb_strings
+        l_lines = self.text_zone.get('1.0', 'end-1c').split('\n')
+        l_strings = [[] for _ in range(l_nb)]
+        for l_pos, l_line in enumerate(l_lines):
+            l_system, l_row = divmod(l_pos, l_nb + 1)
+            if l_row < l_nb:
+                # The string names are only kept once
+                l_strings[l_row].append(l_line if l_system == 0 else l_line[PREFIX_COLUMNS:])
+            # else: line between two systems
+        # end for
+        l_tab_lines = [''.join(l_parts) or STRINGS[l_row % len(STRINGS)] + BAR
+                       for l_row, l_parts in enumerate(l_strings)]
+
+        l_systems = [l_lines[l_pos:l_pos + l_nb] for l_pos in range(0, len(l_lines), l_nb + 1)]
+        if len(l_lines) != len(self.shown) * (l_nb + 1) - 1 \
+                or any(l_lines[l_pos] for l_pos in range(l_nb, len(l_lines), l_nb + 1)):
+            # Lines added or removed by Tk: update the model without mirroring, then
+            # display the whole tab again
+            self.muted = True
+            try:
+                self.document.update_lines(l_tab_lines)
+            finally:
+                self.muted = False
+            # end try
+            self.render()
+            return
+        # else: same systems
+
+        # The displayed lines are the reference of the systems patched by on_change (the
+        # cursor stays where Tk put it)
+        l_shown = self.shown
+        self.shown = l_systems
+        l_cursor = self.text_zone.index('insert')
+        if any(l_new[l_row][:PREFIX_COLUMNS] != l_old[l_row][:PREFIX_COLUMNS]
+               for l_old, l_new in zip(l_shown[1:], l_systems[1:]) for l_row in range(l_nb)):
+            # Edit of the string names of a later system (not in the tab): the keystroke is
+            # dropped, as its characters would be shifted into the columns
+            self.restore_systems(l_shown)
+        else:
+            l_version = self.document.version
+            self.document.update_lines(l_tab_lines)
+            if self.document.version == l_version:
+                # Text modified without changing the tab
+                self.restore_systems(l_shown)
+            # else: the modified systems have been displayed again by on_change
+        # endif
+        self.text_zone.mark_set('insert', l_cursor)
+        self.text_zone.edit_modified(False)
+
+        return
+    # end of function
+
+
+    def restore_systems(self, shown):
+        """
+        Display again the systems modified in the Text widget (self.shown holds the
+        modified lines).
+
+        :param shown: The lines of each system before the modification.
+        """
+        for l_index, (l_old, l_new) in enumerate(zip(shown, self.shown)):
+            if l_old != l_new:
+                self.replace_systems(l_index, l_index + 1, [l_old])
+            # else: system not modified
+        # end for
+
+        return
+    # end of function
+
+# end of class
+
+# End of file
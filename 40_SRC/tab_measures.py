@@ -0,0 +1,531 @@
+"""
+Tab Measures Module
+
+USE:
+    This module maintains the index of the measures of a TabDocument: the bar columns
+    ('|' on every string) split the tab into segments, segment 0 holding the string names
+    and the initial bar, and segment i (from 1) holding measure i and its closing bar.
+    The widths of the segments are stored in small blocks, with Fenwick trees of the
+    widths and of the number of segments of the blocks. The measure of a column and the
+    columns of a measure are therefore found in O(log(measures)), and a note, a dash, a
+    bar or a column deletion only updates one block and O(log(measures)) tree nodes.
+        l_measures = MeasureIndex(l_document)
+        l_start, l_end = l_measures.measure_range(l_measures.measure_at(l_col))
+    The bulk operations (duplicate x N, delete, move, swap) rewrite measures as one slice
+    of columns: the document sends one change, displayed at once and undone at once.
+        duplicate_measures(l_measures, 1, 4, 32)
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+from array import array             # For the compact segments
+from itertools import accumulate, chain  # For the measure ranges
+# APPLICATION libraries
+from tab_document import BAR        # For the tab model
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+BLOCK_SIZE = 64  # Segments per block (a block is split beyond twice this size) => pylint: disable=C0103
+
+# Bulk measure operations (see MEASURE_OPERATIONS)
+OP_DUPLICATE = 'duplicate'  # Constant => pylint: disable=C0103
+OP_DELETE = 'delete'        # Constant => pylint: disable=C0103
+OP_MOVE = 'move'            # Constant => pylint: disable=C0103
+OP_SWAP = 'swap'            # Constant => pylint: disable=C0103
+
+
+##################
+# CLASS DEFINITION
+##################
+class FenwickTree:
+    """
+    Fenwick (binary indexed) tree of integers: prefix sums and point updates in O(log n).
+    """
+    __slots__ = ('tree',)
+
+    def __init__(self, values=()):
+        """
+        Build the tree.
+
+        :param values: The initial values.
+        """
+        self.tree = array('q', [0])
+        self.build(values)
+
+        return
+    # end of function
+
+
+    def __len__(self):
+        return len(self.tree) - 1
+    # end of function
+
+
+    def build(self, values):
+        """
+        Replace the values, in O(n).
+
+        :param values: The new values.
+        """
+        self.tree = array('q', [0])
+        self.tree.extend(values)
+        l_nb = len(self.tree) - 1
+        for l_node in range(1, l_nb + 1):
+            l_parent = l_node + (l_node & -l_node)
+            if l_parent <= l_nb:
+                self.tree[l_parent] += self.tree[l_node]
+            # else: root node
+        # end for
+
+        return
+    # end of function
+
+
+    def add(self, index, delta):
+        """
+        Add a number to a value.
+
+        :param index: The value index (from 0).
+        :param delta: The number to add.
+        """
+        l_node = index + 1
+        l_nb = len(self.tree) - 1
+        while l_node <= l_nb:
+            self.tree[l_node] += delta
+            l_node += l_node & -l_node
+        # end while
+
+        return
+    # end of function
+
+
+    def prefix(self, index):
+        """
+        Get the sum of the values before an index.
+
+        :param index: The value index (from 0).
+        """
+        l_sum = 0
+        l_node = index
+        while l_node > 0:
+            l_sum += self.tree[l_node]
+            l_node &= l_node - 1
+        # end while
+
+        return l_sum
+    # end of function
+
+
+    def search(self, total):
+        """
+        Find the value reaching a sum (binary lifting; the values must not be negative).
+
+        :param total: The sum.
+        :return: (index, rest): the largest index such that prefix(index) <= total, and
+                 total - prefix(index).
+        """
+        l_nb = len(self.tree) - 1
+        l_node = 0
+        l_rest = total
+        l_step = 1 << (l_nb.bit_length() - 1) if l_nb else 0
+        while l_step:
+            l_next = l_node + l_step
+            if l_next <= l_nb and self.tree[l_next] <= l_rest:
+                l_node = l_next
+                l_rest -= self.tree[l_next]
+            # else: the sum is reached before the end of this node
+            l_step >>= 1
+        # end while
+
+        return (l_node, l_rest)
+    # end of function
+
+# end of class
+
+
+class MeasureIndex:
+    """
+    Index of the measures of a TabDocument (listener of the document).
+
+    blocks[b] holds the widths of consecutive segments; the Fenwick trees hold the number
+    of columns and the number of segments of each block.
+    """
+    __slots__ = ('document', 'blocks', '_widths', '_counts', '_bar')
+
+    def __init__(self, document):
+        """
+        Index the measures of a document and register as a listener.
+
+        :param document: The TabDocument.
+        """
+        self.document = document
+        self.blocks = []
+        self._widths = FenwickTree()
+        self._counts = FenwickTree()
+        self._bar = document.blank_column(BAR)
+        self.rebuild()
+        self.document.add_listener(self.on_change)
+
+        return
+    # end of function
+
+
+    def __len__(self):
+        """
+        Number of measures (the open measure after the last bar counts if it is not empty).
+        """
+        l_nb = self._counts.prefix(len(self.blocks)) - 1
+        if self.blocks[-1][-1] == 0:
+            l_nb -= 1
+        # else: measure being written
+
+        return max(l_nb, 0)
+    # end of function
+
+
+    ##############################
+    # BLOCKS
+    ##############################
+    def rebuild(self):
+        """
+        Index the whole document (e.g. initial state).
+        """
+        l_widths = array('q')
+        l_run = 0
+        for l_column in self.document.columns():
+            l_run += 1
+            if l_column == self._bar:
+                l_widths.append(l_run)
+                l_run = 0
+            # else: column inside a measure
+        # end for
+        # Open segment after the last bar
+        l_widths.append(l_run)
+        self._set_blocks(0, len(self.blocks), l_widths)
+
+        return
+    # end of function
+
+
+    def _set_blocks(self, first, end, widths):
+        """
+        Replace blocks by new ones holding segment widths, and rebuild the trees.
+
+        :param first: Index of the first replaced block.
+        :param end: Index after the last replaced block.
+        :param widths: The segment widths of the new blocks.
+        """
+        self.blocks[first:end] = [widths[l_pos:l_pos + BLOCK_SIZE]
+                                  for l_pos in range(0, len(widths), BLOCK_SIZE)]
+        self._widths.build(sum(l_block) for l_block in self.blocks)
+        self._counts.build(len(l_block) for l_block in self.blocks)
+
+        return
+    # end of function
+
+
+    def _locate(self, col):
+        """
+        Get the segment holding a column.
+
+        :param col: The column index (the tab width: the last segment).
+        :return: (block index, position in the block, first column of the segment).
+        """
+        l_block, l_rest = self._widths.search(col)
+        if l_block >= len(self.blocks):
+            # End of the tab: open segment
+            l_block = len(self.blocks) - 1
+            l_pos = len(self.blocks[l_block]) - 1
+            return (l_block, l_pos,
+                    self._widths.prefix(len(self.blocks)) - self.blocks[l_block][l_pos])
+        # else: column of the tab
+
+        l_pos = 0
+        for l_pos, l_width in enumerate(self.blocks[l_block]):
+            if l_rest < l_width:
+                break
+            # else: next segment
+            l_rest -= l_width
+        # end for
+
+        return (l_block, l_pos, col - l_rest)
+    # end of function
+
+
+    ##############################
+    # MEASURES
+    ##############################
+    def measure_at(self, col):
+        """
+        Get the measure holding a column.
+
+        :param col: The column index.
+        :return: The measure number (from 1; 0 for the string names and the first bar).
+        """
+        l_block, l_pos, _ = self._locate(col)
+
+        return self._counts.prefix(l_block) + l_pos
+    # end of function
+
+
+    def measure_range(self, measure):
+        """
+        Get the columns of a measure.
+
+        :param measure: The measure number (from 1).
+        :return: (first column, column after its closing bar).
+        :raise IndexError: If the tab has no such measure.
+        """
+        l_block, l_pos = self._counts.search(measure) if measure >= 0 else (len(self.blocks), 0)
+        if l_block >= len(self.blocks):
+            raise IndexError(f"No measure {measure}")
+        # else: existing measure
+        l_segments = self.blocks[l_block]
+        l_start = self._widths.prefix(l_block) + sum(l_segments[:l_pos])
+
+        return (l_start, l_start + l_segments[l_pos])
+    # end of function
+
+
+    def measure_ranges(self):
+        """
+        Get the columns of all the measures, in one pass over the blocks.
+
+        :return: List of (first column, column after its closing bar), for measures 1 to len.
+        """
+        l_ends = list(accumulate(chain.from_iterable(self.blocks)))
+        l_nb = len(self)
+
+        return list(zip(l_ends[:l_nb], l_ends[1:l_nb + 1]))
+    # end of function
+
+
+    def measure_start(self, measure):
+        """
+        Get the first column of a measure.
+
+        :param measure: The measure number (from 1).
+        """
+        return self.measure_range(measure)[0]
+    # end of function
+
+
+    ##############################
+    # LISTENER
+    ##############################
+    def on_change(self, change):
+        """
+        Update the index after a change of the document.
+
+        :param change: The TabChange sent by the document.
+        """
+        l_delta = len(change.new) - len(change.old)
+        if self._bar not in change.old and self._bar not in change.new:
+            # The measures do not change: only the width of the modified one
+            if l_delta:
+                l_block, l_pos, _ = self._locate(change.col)
+                self.blocks[l_block][l_pos] += l_delta
+                self._widths.add(l_block, l_delta)
+            # else: same width
+            return
+        # else: bars added or removed
+
+        # Segments touched by the change (located in the index before the change), and
+        # the next one: it is merged with them if their closing bar is deleted
+        l_first, l_first_pos, l_start = self._locate(change.col)
+        l_last, l_last_pos, l_end = self._locate(change.col + max(len(change.old) - 1, 0))
+        l_end += self.blocks[l_last][l_last_pos]
+        if l_last_pos + 1 < len(self.blocks[l_last]):
+            l_last_pos += 1
+            l_end += self.blocks[l_last][l_last_pos]
+        elif l_last + 1 < len(self.blocks):
+            l_last += 1
+            l_last_pos = 0
+            l_end += self.blocks[l_last][0]
+        # else: last segment of the tab
+        l_open = l_last == len(self.blocks) - 1 and l_last_pos == len(self.blocks[l_last]) - 1
+
+        # Split the columns of these segments at their bars
+        l_widths = array('q')
+        l_run = 0
+        for l_column in self.document.columns(l_start, l_end + l_delta):
+            l_run += 1
+            if l_column == self._bar:
+                l_widths.append(l_run)
+                l_run = 0
+            # else: column inside a measure
+        # end for
+        if l_open:
+            l_widths.append(l_run)
+        # else: the last segment is closed by its (unchanged) bar
+
+        l_segments = self.blocks[l_first]
+        if l_first == l_last and len(l_segments) - (l_last_pos + 1 - l_first_pos) \
+                + len(l_widths) <= 2 * BLOCK_SIZE:
+            # Segments of one block: update its totals
+            l_nb = len(l_segments)
+            l_segments[l_first_pos:l_last_pos + 1] = l_widths
+            self._widths.add(l_first, l_delta)
+            self._counts.add(l_first, len(l_segments) - l_nb)
+            if not l_segments:
+                self._set_blocks(l_first, l_first + 1, array('q'))
+            # else: the block still holds segments
+        else:
+            # Several blocks, or block too large: split them again
+            l_merged = array('q')
+            for l_block in self.blocks[l_first:l_last + 1]:
+                l_merged.extend(l_block)
+            # end for
+            l_merged[l_first_pos:len(l_merged) - len(self.blocks[l_last]) + l_last_pos + 1] = l_widths
+            self._set_blocks(l_first, l_last + 1, l_merged)
+        # endif
+
+        return
+    # end of function
+
+
+    def detach(self):
+        """
+        Stop indexing the document.
+        """
+        self.document.remove_listener(self.on_change)
+
+        return
+    # end of function
+
+# end of class
+
+
+##################
+# FUNCTIONS
+##################
+def measure_columns(measures, first, last):
+    """
+    Get the columns of consecutive measures, closed by a bar.
+
+    :param measures: The MeasureIndex.
+    :param first: The first measure (from 1).
+    :param last: The last measure.
+    :return: (first column, column after the last measure, columns).
+    :raise IndexError: If the measures do not exist.
+    """
+    if not 1 <= first <= last <= len(measures):
+        raise IndexError(f"No measures {first} to {last}")
+    # else: existing measures
+
+    l_start = measures.measure_start(first)
+    l_end = measures.measure_range(last)[1]
+    l_columns = measures.document.columns(l_start, l_end)
+    l_bar = measures.document.blank_column(BAR)
+    if l_columns[-1] != l_bar:
+        # Measure being written: close it
+        l_columns.append(l_bar)
+    # else: closed measure
+
+    return (l_start, l_end, l_columns)
+# end of function
+
+
+def duplicate_measures(measures, first, last, times=1):
+    """
+    Repeat measures after themselves.
+
+    :param measures: The MeasureIndex.
+    :param first: The first measure (from 1).
+    :param last: The last measure.
+    :param times: The number of copies.
+    :return: The column after the last copy.
+    """
+    l_start, l_end, l_columns = measure_columns(measures, first, last)
+    l_new = l_columns * (max(int(times), 0) + 1)
+    measures.document.replace_columns(l_start, l_new, l_end - l_start)
+
+    return l_start + len(l_new)
+# end of function
+
+
+def delete_measures(measures, first, last):
+    """
+    Delete measures.
+
+    :param measures: The MeasureIndex.
+    :param first: The first measure (from 1).
+    :param last: The last measure.
+    :return: The column of the next measure.
+    """
+    l_start, l_end, _ = measure_columns(measures, first, last)
+    measures.document.delete_columns(l_start, l_end - l_start)
+
+    return l_start
+# end of function
+
+
+def move_measures(measures, first, last, dest):
+    """
+    Move measures before another one.
+
+    :param measures: The MeasureIndex.
+    :param first: The first measure (from 1).
+    :param last: The last measure.
+    :param dest: The measure before which they are moved (number of measures + 1: the end).
+    :return: The first column of the moved measures.
+    """
+    l_start, l_end, l_columns = measure_columns(measures, first, last)
+    if dest < 1 or dest > len(measures) + 1:
+        raise IndexError(f"No measure {dest}")
+    # else: existing destination
+    if first <= dest <= last + 1:
+        return l_start
+    # else: the measures move
+
+    if dest < first:
+        l_dest = measures.measure_start(dest)
+        l_new = l_columns + measures.document.columns(l_dest, l_start)
+        measures.document.replace_columns(l_dest, l_new, l_end - l_dest)
+        return l_dest
+    # else: move to the right
+
+    _, _, l_middle = measure_columns(measures, last + 1, dest - 1)
+    l_count = (measures.measure_start(dest) if dest <= len(measures)
+               else measures.document.width) - l_start
+    measures.document.replace_columns(l_start, l_middle + l_columns, l_count)
+
+    return l_start + len(l_middle)
+# end of function
+
+
+def swap_measures(measures, first, second):
+    """
+    Swap two measures.
+
+    :param measures: The MeasureIndex.
+    :param first: A measure (from 1).
+    :param second: Another measure.
+    :return: The first column of the measure moved to the right.
+    """
+    l_first, l_second = sorted((first, second))
+    l_start, l_end, l_left = measure_columns(measures, l_first, l_first)
+    if l_first == l_second:
+        return l_start
+    # else: two measures
+    l_second_start, l_second_end, l_right = measure_columns(measures, l_second, l_second)
+
+    l_middle = measures.document.columns(l_end, l_second_start)
+    measures.document.replace_columns(l_start, l_right + l_middle + l_left,
+                                      l_second_end - l_start)
+
+    return l_start + len(l_right) + len(l_middle)
+# end of function
+
+
+# Bulk operations by name (recorded in the session traces)
+MEASURE_OPERATIONS = {OP_DUPLICATE: duplicate_measures,  # Constant => pylint: disable=C0103
+                      OP_DELETE: delete_measures,
+                      OP_MOVE: move_measures,
+                      OP_SWAP: swap_measures}
+
+# End of file
@@ -0,0 +1,250 @@
+"""
+Tab Notation Module
+
+USE:
+    This module converts a tab into standard notation, as LilyPond source, in-process
+    (no network, no browser). The output holds a staff (treble clef 8va bassa, sounding
+    pitches) and the matching tab staff, and can be engraved into PDF or SVG by LilyPond:
+        lilypond -dbackend=svg song.ly
+    A tab does not write the rhythm: each column holding frets is one eighth note (a chord
+    if several strings are played), and the measures are free (cadenza) and closed by the
+    bars of the tab. The techniques are rendered as: h, p => slur; / and \\ => glissando;
+    b => bend; ~ => vibrato mark; x => dead note.
+    The LilyPond fragment of each measure is cached by its content, so rendering again
+    after an edit only converts the measures that have changed.
+        l_renderer = NotationRenderer(l_measures)
+        l_source = l_renderer.render()
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+import re                       # For the string names
+# APPLICATION libraries
+from tab_document import ENCODING                   # For the tab model
+from tab_tokenizer import tokenize, KIND_FRET, KIND_TECHNIQUE  # For the frets and techniques
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+NOTATION_EXTENSION = '.ly'  # Constant => pylint: disable=C0103
+LILYPOND_VERSION = '2.24.0'  # Constant => pylint: disable=C0103
+DURATION = '8'  # Duration of a column of frets (eighth note) => pylint: disable=C0103
+EMPTY_MEASURE = 'r4'  # Measure without any fret => pylint: disable=C0103
+
+# Pitches (MIDI numbers): the highest string is at most E4, each next string is lower
+HIGHEST_PITCH = 64  # Constant => pylint: disable=C0103
+PITCH_CLASSES = {'c': 0, 'd': 2, 'e': 4, 'f': 5, 'g': 7, 'a': 9, 'b': 11}  # Constant => pylint: disable=C0103
+STRING_NAME_RE = re.compile(r'([A-Ga-g])([#b]?)')  # Constant => pylint: disable=C0103
+NOTE_NAMES = ['c', 'cis', 'd', 'dis', 'e', 'f', 'fis', 'g', 'gis', 'a', 'ais', 'b']  # Constant => pylint: disable=C0103
+MIDDLE_OCTAVE = 4  # Octave of c' (MIDI 48 to 59 have no octave mark) => pylint: disable=C0103
+
+# Techniques: mark written after the note before the technique, and before the next one
+SLUR_TECHNIQUES = 'hp'      # Constant => pylint: disable=C0103
+SLIDE_TECHNIQUES = '/\\'    # Constant => pylint: disable=C0103
+AFTER_MARKS = {'b': '\\bendAfter #+4', '~': '^"~"'}  # Constant => pylint: disable=C0103
+DEAD_NOTE = 'x'  # Constant => pylint: disable=C0103
+
+
+##################
+# CLASS DEFINITION
+##################
+class NotationRenderer:
+    """
+    LilyPond renderer of a TabDocument, with a cache of the fragments of its measures.
+    """
+    def __init__(self, measures):
+        """
+        Initialize the renderer.
+
+        :param measures: The MeasureIndex of the document.
+        """
+        self.measures = measures
+        self.document = measures.document
+        self._strings = None
+        self._pitches = []
+        self._fragments = {}    # Columns of a measure (bytes) => LilyPond fragment
+        self.converted = 0      # Measures converted by the last render (not cached)
+
+        return
+    # end of function
+
+
+    def render(self):
+        """
+        Convert the document into LilyPond source.
+
+        :return: The LilyPond source.
+        """
+        if self.document.strings != self._strings:
+            # New tuning: the cached fragments are wrong
+            self._strings = list(self.document.strings)
+            self._pitches = string_pitches(self._strings)
+            self._fragments = {}
+        # else: same tuning
+
+        l_columns = self.document.columns()
+        l_fragments = {}
+        l_music = []
+        self.converted = 0
+        for l_start, l_end in self.measures.measure_ranges():
+            l_cells = b''.join(l_columns[l_start:l_end])
+            # Measure already met in this render, or not modified since the last one
+            l_fragment = l_fragments.get(l_cells) or self._fragments.get(l_cells)
+            if l_fragment is None:
+                l_fragment = measure_fragment(l_cells, self._pitches)
+                self.converted += 1
+            # else: cached fragment
+            l_fragments[l_cells] = l_fragment
+            l_music.append(l_fragment)
+        # end for
+        # Only the measures of the document are kept
+        self._fragments = l_fragments
+
+        return lilypond_source(l_music, self._pitches)
+    # end of function
+
+# end of class
+
+
+##################
+# FUNCTIONS
+##################
+def string_pitches(strings):
+    """
+    Get the pitches of the open strings from their names (e.g. e b g d a e).
+
+    :param strings: The string names, from the highest to the lowest string.
+    :return: List of MIDI numbers.
+    """
+    l_pitches = []
+    l_above = HIGHEST_PITCH + 1
+    for l_name in strings:
+        l_match = STRING_NAME_RE.match(l_name)
+        if l_match is None:
+            # Unknown name: one fourth below the previous string
+            l_pitch = l_above - 5 if l_pitches else HIGHEST_PITCH
+        else:
+            l_class = PITCH_CLASSES[l_match.group(1).lower()] + (1 if l_match.group(2) == '#' else
+                                                                  -1 if l_match.group(2) else 0)
+            # Highest pitch of this class below the previous string
+            l_pitch = l_above - 1 - (l_above - 1 - l_class) % 12
+        # endif
+        l_pitches.append(l_pitch)
+        l_above = l_pitch
+    # end for
+
+    return l_pitches
+# end of function
+
+
+def pitch_name(pitch):
+    """
+    Get the LilyPond name of a pitch (absolute octave: c' is the middle C).
+
+    :param pitch: The MIDI number.
+    """
+    l_octave = pitch // 12 - MIDDLE_OCTAVE
+
+    return NOTE_NAMES[pitch % 12] + ("'" * l_octave if l_octave > 0 else ',' * -l_octave)
+# end of function
+
+
+def measure_fragment(cells, pitches):
+    """
+    Convert a measure into a LilyPond fragment.
+
+    :param cells: The columns of the measure (bytes of one cell per string, joined).
+    :param pitches: The pitches of the open strings.
+    :return: The fragment (notes or chords of the measure).
+    """
+    l_nb = len(pitches)
+    l_notes = {}    # Column => list of (string, pitch, dead)
+    l_marks = {}    # Column => marks written after the note or chord
+    for l_row, l_pitch in enumerate(pitches):
+        l_line = cells[l_row::l_nb].decode(ENCODING, errors='replace')
+        l_previous = None   # Column of the previous note of the string
+        l_technique = None  # Technique waiting for the next note
+        for l_token in tokenize(l_line):
+            if l_token.kind == KIND_FRET:
+                l_notes.setdefault(l_token.column, []).append((l_row, l_pitch + l_token.fret,
+                                                               l_technique == DEAD_NOTE))
+                if l_previous is not None and l_technique is not None:
+                    if l_technique in SLUR_TECHNIQUES:
+                        l_marks.setdefault(l_previous, []).append('(')
+                        l_marks.setdefault(l_token.column, []).append(')')
+                    elif l_technique in SLIDE_TECHNIQUES:
+                        l_marks.setdefault(l_previous, []).append('\\glissando')
+                    # else: no mark between the notes
+                # else: no technique
+                l_previous = l_token.column
+                l_technique = None
+            elif l_token.kind == KIND_TECHNIQUE:
+                l_char = l_line[l_token.column]
+                if l_char in AFTER_MARKS:
+                    if l_previous is not None:
+                        l_marks.setdefault(l_previous, []).append(AFTER_MARKS[l_char])
+                    # else: no note to mark
+                elif l_char == DEAD_NOTE and not l_line[l_token.column + 1:l_token.column + 2].isdigit():
+                    # Muted string
+                    l_notes.setdefault(l_token.column, []).append((l_row, l_pitch, True))
+                else:
+                    l_technique = l_char
+                # endif
+            # else: bar
+        # end for
+    # end for
+
+    l_events = []
+    for l_col in sorted(l_notes):
+        l_played = l_notes[l_col]
+        l_names = [('\\deadNote ' if l_is_dead else '') + pitch_name(l_pitch)
+                   for _, l_pitch, l_is_dead in l_played]
+        if len(l_played) == 1:
+            # Pitch, duration, then string number
+            l_event = f'{l_names[0]}{DURATION}\\{l_played[0][0] + 1}'
+        else:
+            l_event = '<' + ' '.join(f'{l_name}\\{l_row + 1}' for l_name, (l_row, _, _)
+                                     in zip(l_names, l_played)) + '>' + DURATION
+        # endif
+        # Same mark on several strings of a chord: written once
+        l_events.append(l_event + ''.join(dict.fromkeys(l_marks.get(l_col, []))))
+    # end for
+
+    return ' '.join(l_events) or EMPTY_MEASURE
+# end of function
+
+
+def lilypond_source(fragments, pitches):
+    """
+    Build the LilyPond file of the measures.
+
+    :param fragments: The fragments of the measures.
+    :param pitches: The pitches of the open strings.
+    :return: The LilyPond source.
+    """
+    l_music = ' \\bar "|"\n  '.join(fragments)
+    l_tuning = ' '.join(pitch_name(l_pitch) for l_pitch in reversed(pitches))
+
+    return '\n'.join([
+        f'\\version "{LILYPOND_VERSION}"',
+        '\\header { tagline = ##f }',
+        '',
+        'music = {',
+        '  \\cadenzaOn',
+        f'  {l_music} \\bar "|."' if fragments else '  \\bar "|."',
+        '}',
+        '',
+        '\\score {',
+        '  <<',
+        '    \\new Staff { \\clef "treble_8" \\music }',
+        f'    \\new TabStaff \\with {{ stringTunings = \\stringTuning <{l_tuning}> }} {{ \\music }}',
+        '  >>',
+        '  \\layout { }',
+        '}',
+        ''])
+# end of function
+
+# End of file
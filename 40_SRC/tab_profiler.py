@@ -0,0 +1,300 @@
+"""
+Tab Profiler Module
+
+USE:
+    This module times the handlers of the editor, to find which one makes it sluggish.
+    It is enabled with the GTW_PROFILE environment variable (or the --profile flag of the
+    application), holding a comma-separated list of modes:
+        time        time every handler (p50 / p95 / max), always enabled
+        cprofile    also run the handlers under cProfile
+        tracemalloc also measure the memory allocated by the handlers
+    The statistics are shown in a status bar and written to a file on exit
+    (GTW_PROFILE_FILE, gtw_profile.txt by default).
+        GTW_PROFILE=time,cprofile python guitar_tab_writer.py
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+import cProfile                 # For the function profiles
+import functools                # For the handler wrappers
+import io                       # For the profile report
+import pstats                   # For the profile report
+import time                     # For the measures
+import tracemalloc              # For the memory measures
+from array import array         # For the compact samples
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+PROFILE_ENV = 'GTW_PROFILE'  # Constant => pylint: disable=C0103
+PROFILE_FILE_ENV = 'GTW_PROFILE_FILE'  # Constant => pylint: disable=C0103
+PROFILE_FILE = 'gtw_profile.txt'  # Constant => pylint: disable=C0103
+
+# Modes
+MODE_TIME = 'time'  # Constant => pylint: disable=C0103
+MODE_CPROFILE = 'cprofile'  # Constant => pylint: disable=C0103
+MODE_TRACEMALLOC = 'tracemalloc'  # Constant => pylint: disable=C0103
+MODES = (MODE_TIME, MODE_CPROFILE, MODE_TRACEMALLOC)  # Constant => pylint: disable=C0103
+
+# Report
+NB_PROFILE_LINES = 30  # Functions listed in the cProfile report => pylint: disable=C0103
+NB_MEMORY_LINES = 15   # Allocation sites listed in the tracemalloc report => pylint: disable=C0103
+
+
+##################
+# CLASS DEFINITION
+##################
+class HandlerStats:
+    """
+    Durations of the calls of one handler.
+    """
+    __slots__ = ('name', 'samples', 'peak_memory')
+
+    def __init__(self, name):
+        """
+        Initialize the statistics.
+
+        :param name: The handler name.
+        """
+        self.name = name
+        self.samples = array('d')   # Durations in ms
+        self.peak_memory = 0        # Largest memory peak of a call in bytes (tracemalloc)
+
+        return
+    # end of function
+
+
+    def add(self, duration_ms):
+        """
+        Record the duration of a call.
+
+        :param duration_ms: The duration in ms.
+        """
+        self.samples.append(duration_ms)
+
+        return
+    # end of function
+
+
+    @property
+    def count(self):
+        """
+        Number of calls.
+        """
+        return len(self.samples)
+    # end of function
+
+
+    def percentile(self, percent):
+        """
+        Get a percentile of the durations (nearest rank).
+
+        :param percent: The percentile (0 to 100).
+        :return: The duration in ms (0 without call).
+        """
+        if not self.samples:
+            return 0.0
+        # else: at least one call
+        l_sorted = sorted(self.samples)
+        l_rank = max(int(-(-percent * len(l_sorted) // 100)) - 1, 0)
+
+        return l_sorted[min(l_rank, len(l_sorted) - 1)]
+    # end of function
+
+
+    def summary(self):
+        """
+        Get the statistics line of the handler.
+        """
+        l_line = (f"{self.name:<20} {self.count:>7} {self.percentile(50):>9.3f} "
+                  f"{self.percentile(95):>9.3f} {max(self.samples, default=0.0):>9.3f}")
+        if self.peak_memory:
+            l_line += f" {self.peak_memory / 1024:>10.1f}"
+        # else: memory not measured
+
+        return l_line
+    # end of function
+
+# end of class
+
+
+class Profiler:
+    """
+    Time the handlers of the editor, optionally under cProfile and tracemalloc.
+    """
+    def __init__(self, modes=(MODE_TIME,), output=PROFILE_FILE):
+        """
+        Initialize the profiler.
+
+        :param modes: The enabled modes (MODE_* constants).
+        :param output: The file written by dump().
+        """
+        l_unknown = set(modes) - set(MODES)
+        if l_unknown:
+            raise ValueError(f"unknown profile mode(s): {', '.join(sorted(l_unknown))} "
+                             f"(expected {', '.join(MODES)})")
+        # else: valid modes
+
+        self.modes = frozenset(modes) | {MODE_TIME}
+        self.output = output
+        self.stats = {}
+        self.last = None    # Name and duration of the last call
+        self.depth = 0      # Number of handlers in progress (handlers calling handlers)
+        self.profile = cProfile.Profile() if MODE_CPROFILE in self.modes else None
+        if MODE_TRACEMALLOC in self.modes and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        # else: memory not measured
+
+        return
+    # end of function
+
+
+    def wrap(self, name, handler):
+        """
+        Wrap a handler to time its calls.
+
+        :param name: The name of the handler in the statistics.
+        :param handler: The function to wrap.
+        :return: The wrapper, called with the same arguments.
+        """
+        l_stats = self.stats.setdefault(name, HandlerStats(name))
+        l_memory = MODE_TRACEMALLOC in self.modes
+
+        @functools.wraps(handler)
+        def wrapper(*args, **kwargs):
+            # Only the outermost handler is profiled (cProfile cannot be nested)
+            l_outer = self.depth == 0
+            self.depth += 1
+            if l_outer and l_memory:
+                tracemalloc.reset_peak()
+                l_start_memory = tracemalloc.get_traced_memory()[0]
+            # else: memory not measured
+            if l_outer and self.profile is not None:
+                self.profile.enable()
+            # else: no function profile
+            l_start = time.perf_counter()
+            try:
+                return handler(*args, **kwargs)
+            finally:
+                l_duration_ms = (time.perf_counter() - l_start) * 1000
+                if l_outer and self.profile is not None:
+                    self.profile.disable()
+                # else: no function profile
+                if l_outer and l_memory:
+                    l_peak = tracemalloc.get_traced_memory()[1] - l_start_memory
+                    l_stats.peak_memory = max(l_stats.peak_memory, l_peak)
+                # else: memory not measured
+                self.depth -= 1
+                l_stats.add(l_duration_ms)
+                self.last = (name, l_duration_ms)
+            # end try
+        # end of function
+
+        return wrapper
+    # end of function
+
+
+    def wrap_methods(self, instance, names):
+        """
+        Replace methods of an object by timed wrappers.
+        Must be called before the methods are bound to Tk events or buttons.
+
+        :param instance: The object.
+        :param names: The method names.
+        """
+        for l_name in names:
+            setattr(instance, l_name, self.wrap(l_name, getattr(instance, l_name)))
+        # end for
+
+        return
+    # end of function
+
+
+    def status_text(self):
+        """
+        Get a one-line summary for the status bar.
+        """
+        if self.last is None:
+            return 'profile: no call yet'
+        # else: at least one call
+
+        l_name, l_duration_ms = self.last
+        l_stats = self.stats[l_name]
+
+        return (f"{l_name}: {l_duration_ms:.2f} ms  (p50 {l_stats.percentile(50):.2f}, "
+                f"p95 {l_stats.percentile(95):.2f}, max {max(l_stats.samples):.2f} ms, "
+                f"{l_stats.count} calls)")
+    # end of function
+
+
+    def report(self):
+        """
+        Get the full report: handler statistics, then the cProfile and tracemalloc reports.
+        """
+        l_lines = [f"{'handler':<20} {'calls':>7} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"
+                   + (f" {'peak KiB':>10}" if MODE_TRACEMALLOC in self.modes else '')]
+        for l_stats in sorted(self.stats.values(), key=lambda s: -sum(s.samples)):
+            if l_stats.count:
+                l_lines.append(l_stats.summary())
+            # else: handler never called
+        # end for
+
+        if self.profile is not None:
+            l_stream = io.StringIO()
+            pstats.Stats(self.profile, stream=l_stream).sort_stats('cumulative') \
+                .print_stats(NB_PROFILE_LINES)
+            l_lines += ['', 'cProfile (cumulative time)', l_stream.getvalue()]
+        # else: no function profile
+
+        if MODE_TRACEMALLOC in self.modes and tracemalloc.is_tracing():
+            l_lines += ['', 'tracemalloc (allocated memory by line)']
+            l_top = tracemalloc.take_snapshot().statistics('lineno')[:NB_MEMORY_LINES]
+            l_lines += [str(l_stat) for l_stat in l_top]
+        # else: memory not measured
+
+        return '\n'.join(l_lines)
+    # end of function
+
+
+    def dump(self, path=None):
+        """
+        Write the report to a file.
+
+        :param path: The file path (defaults to the output of the profiler).
+        """
+        with open(path or self.output, 'w', encoding='utf-8') as l_file:
+            l_file.write(self.report() + '\n')
+        # end with
+
+        return
+    # end of function
+
+# end of class
+
+
+##################
+# FUNCTIONS
+##################
+def profiler_from_env(environ, modes=None):
+    """
+    Build the profiler requested by the environment.
+
+    :param environ: The environment variables (e.g. os.environ).
+    :param modes: Comma-separated modes overriding GTW_PROFILE (e.g. from --profile).
+    :return: The Profiler, or None if profiling is disabled.
+    """
+    l_modes = modes if modes is not None else environ.get(PROFILE_ENV, '')
+    if not l_modes or l_modes == '0':
+        return None
+    # else: profiling enabled
+
+    l_modes = [l_mode.strip().lower() for l_mode in l_modes.split(',') if l_mode.strip()]
+    l_modes = [MODE_TIME if l_mode == '1' else l_mode for l_mode in l_modes]
+
+    return Profiler(l_modes, environ.get(PROFILE_FILE_ENV) or PROFILE_FILE)
+# end of function
+
+# End of file
@@ -0,0 +1,436 @@
+"""
+Tab Replay Module
+
+USE:
+    This module records the editing sessions of the application into compact trace files,
+    and replays them without GUI to reproduce slow sessions.
+    The application records a session when the GTW_RECORD environment variable holds the
+    path of the trace file. Each line of the trace is a JSON array:
+        header  {"format": "gtw-trace", "version": 1, "strings": [...], "tab": [...]}
+        key     [ms, "k", keysym, keycode, state, char, row, col]   handled key press
+        action  [ms, "a", name, args...]                             clear, transpose, undo, redo,
+                                                                     measures (bulk operation),
+                                                                     delete_block, paste_block
+        text    [ms, "t", [lines]]                                   text modified by Tk
+        footer  {"final": [...]}                                     tab at the end
+    The replayer feeds the events to the same model, editor and view as the application
+    (on a Text stub), checks that the final tab matches and reports the time of each event.
+    Directories of traces can be replayed as performance regression fixtures.
+        python tab_replay.py TRACE_OR_DIR... [--repeat 5] [--max-p95 MS] [--output r.json]
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+import argparse                 # For the command line arguments
+import json                     # For the trace files
+import os                       # For the file paths
+import sys                      # For the exit code
+import time                     # For the measures
+from typing import NamedTuple   # For the replay results
+# APPLICATION libraries
+from tab_benchmark import TextStub              # For the headless Text widget
+from tab_document import TabDocument, BAR       # For the tab model
+from tab_editor import TabEditor, command_from_key  # For the key presses
+from tab_history import TabHistory              # For the undo/redo
+from tab_measures import MeasureIndex, MEASURE_OPERATIONS  # For the bulk measure operations
+from tab_block import TabBlock, delete_block, paste_block  # For the block selection
+from tab_transpose import transpose_lines, TransposeError  # For the transposition
+from tab_view import TabView                    # For the display of the tab model
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+RECORD_ENV = 'GTW_RECORD'  # Constant => pylint: disable=C0103
+TRACE_FORMAT = 'gtw-trace'  # Constant => pylint: disable=C0103
+TRACE_VERSION = 1  # Constant => pylint: disable=C0103
+TRACE_PATTERN = '.gtwtrace'  # Extension of the traces in a directory => pylint: disable=C0103
+REPEAT = 1  # Constant => pylint: disable=C0103
+
+# Events
+EVENT_KEY = 'k'     # Constant => pylint: disable=C0103
+EVENT_ACTION = 'a'  # Constant => pylint: disable=C0103
+EVENT_TEXT = 't'    # Constant => pylint: disable=C0103
+
+# Actions
+ACTION_CLEAR = 'clear'          # Constant => pylint: disable=C0103
+ACTION_TRANSPOSE = 'transpose'  # Constant => pylint: disable=C0103
+ACTION_UNDO = 'undo'            # Constant => pylint: disable=C0103
+ACTION_REDO = 'redo'            # Constant => pylint: disable=C0103
+ACTION_MEASURES = 'measures'    # Operation, first, last, argument => pylint: disable=C0103
+ACTION_DELETE_BLOCK = 'delete_block'  # First string, last string, start, end => pylint: disable=C0103
+ACTION_PASTE_BLOCK = 'paste_block'    # String, column, block lines => pylint: disable=C0103
+
+
+##################
+# CLASS DEFINITION
+##################
+class TraceRecorder:
+    """
+    Write the handled events of an editing session to a trace file.
+    """
+    def __init__(self, path, document):
+        """
+        Open the trace file and write the initial tab.
+
+        :param path: The trace file path.
+        :param document: The TabDocument being edited.
+        """
+        self.path = path
+        self.document = document
+        self._file = open(path, 'w', encoding='utf-8')  # pylint: disable=consider-using-with
+        self._start = time.perf_counter()
+        self._write({'format': TRACE_FORMAT, 'version': TRACE_VERSION,
+                     'strings': document.strings, 'tab': document.lines()})
+
+        return
+    # end of function
+
+
+    def _write(self, record):
+        """
+        Write one line of the trace.
+
+        :param record: The JSON object or array.
+        """
+        self._file.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+        return
+    # end of function
+
+
+    def _elapsed(self):
+        """
+        Time since the start of the recording, in ms (0.1 ms resolution).
+        """
+        return round((time.perf_counter() - self._start) * 1000, 1)
+    # end of function
+
+
+    def key(self, event, row, col):
+        """
+        Record a key press handled by the editor.
+
+        :param event: The key press event.
+        :param row: The cursor row used by the editor.
+        :param col: The cursor column used by the editor.
+        """
+        self._write([self._elapsed(), EVENT_KEY, event.keysym, event.keycode, event.state,
+                     event.char, row, col])
+
+        return
+    # end of function
+
+
+    def action(self, name, *args):
+        """
+        Record a button action (ACTION_* constants).
+
+        :param name: The action name.
+        :param args: The action arguments (e.g. the number of semitones).
+        """
+        self._write([self._elapsed(), EVENT_ACTION, name, *args])
+
+        return
+    # end of function
+
+
+    def text(self, lines):
+        """
+        Record a modification of the text done by Tk (e.g. backspace, paste).
+
+        :param lines: The new lines of the tab.
+        """
+        self._write([self._elapsed(), EVENT_TEXT, lines])
+
+        return
+    # end of function
+
+
+    def close(self):
+        """
+        Write the final tab and close the trace file.
+        """
+        if not self._file.closed:
+            self._write({'final': self.document.lines()})
+            self._file.close()
+        # else: already closed
+
+        return
+    # end of function
+
+# end of class
+
+
+class ReplayResult(NamedTuple):
+    """
+    Result of the replay of a trace.
+
+    :param path: The trace file path.
+    :param timings: List of (event name, duration in ms) of the events.
+    :param expected: The final tab recorded in the trace (None if the session was not closed).
+    :param actual: The final tab of the replay.
+    """
+    path: str
+    timings: list
+    expected: list
+    actual: list
+
+    @property
+    def matches(self):
+        """
+        True if the replay gives the recorded final tab (or if no final tab was recorded).
+        """
+        return self.expected is None or self.expected == self.actual
+    # end of function
+
+# end of class
+
+
+##################
+# FUNCTIONS
+##################
+def read_trace(path):
+    """
+    Read a trace file.
+
+    :param path: The trace file path.
+    :return: (header, list of events, final tab or None).
+    :raise ValueError: If the file is not a trace.
+    """
+    with open(path, 'r', encoding='utf-8') as l_file:
+        l_records = [json.loads(l_line) for l_line in l_file if l_line.strip()]
+    # end with
+
+    if not l_records or not isinstance(l_records[0], dict) \
+            or l_records[0].get('format') != TRACE_FORMAT:
+        raise ValueError(f"{path}: not a {TRACE_FORMAT} file")
+    # else: valid header
+    if l_records[0].get('version') != TRACE_VERSION:
+        raise ValueError(f"{path}: unsupported trace version {l_records[0].get('version')}")
+    # else: supported version
+
+    l_final = None
+    if len(l_records) > 1 and isinstance(l_records[-1], dict):
+        l_final = l_records.pop()['final']
+    # else: session not closed (e.g. crash)
+
+    return (l_records[0], l_records[1:], l_final)
+# end of function
+
+
+def replay_event(event, editor, history, text_zone, measures=None):
+    """
+    Apply one event of a trace, as the application does.
+
+    :param event: The event (JSON array).
+    :param editor: The TabEditor.
+    :param history: The TabHistory.
+    :param text_zone: The Text stub.
+    :param measures: The MeasureIndex (needed by the bulk measure operations).
+    :return: The event name used in the report.
+    """
+    l_document = editor.document
+    l_kind = event[1]
+    if l_kind == EVENT_KEY:
+        l_keysym, l_keycode, l_state, l_char, l_row, l_col = event[2:8]
+        l_command = command_from_key(l_char, l_keycode, l_state, l_row, l_col, l_keysym)
+        if l_command is None:
+            return 'ignored'
+        # else: edit of the tab
+        l_row, l_col = editor.apply(l_command)
+        text_zone.mark_set('insert', f"{l_row + 1}.{l_col}")
+        return l_command.action
+    # else: not a key
+
+    if l_kind == EVENT_ACTION and event[2] == ACTION_CLEAR:
+        l_document.set_lines([f'{l_string}{BAR}' for l_string in l_document.strings])
+    elif l_kind == EVENT_ACTION and event[2] == ACTION_TRANSPOSE:
+        try:
+            l_document.set_lines(transpose_lines(l_document.lines(), event[3]))
+        except TransposeError:
+            # The tab has diverged from the recorded one: the final check reports it
+            pass
+        # end try
+    elif l_kind == EVENT_ACTION and event[2] == ACTION_UNDO:
+        history.undo()
+    elif l_kind == EVENT_ACTION and event[2] == ACTION_REDO:
+        history.redo()
+    elif l_kind == EVENT_ACTION and event[2] == ACTION_MEASURES:
+        try:
+            MEASURE_OPERATIONS[event[3]](measures, *event[4:])
+        except IndexError:
+            # The tab has diverged from the recorded one: the final check reports it
+            pass
+        # end try
+    elif l_kind == EVENT_ACTION and event[2] == ACTION_DELETE_BLOCK:
+        delete_block(l_document, *event[3:7])
+    elif l_kind == EVENT_ACTION and event[2] == ACTION_PASTE_BLOCK:
+        paste_block(l_document, TabBlock.from_lines(event[3], event[5]), event[3], event[4])
+    elif l_kind == EVENT_TEXT:
+        l_document.set_lines(event[2])
+    else:
+        raise ValueError(f"Unknown trace event: {event!r}")
+    # endif
+
+    return event[2] if l_kind == EVENT_ACTION else 'text'
+# end of function
+
+
+def replay_trace(path):
+    """
+    Replay a trace file without GUI.
+
+    :param path: The trace file path.
+    :return: The ReplayResult.
+    """
+    l_header, l_events, l_final = read_trace(path)
+    l_text_zone = TextStub()
+    l_document = TabDocument.from_lines(l_header['tab'], l_header['strings'])
+    l_view = TabView(l_text_zone, l_document)
+    l_view.render()
+    l_editor = TabEditor(l_document)
+    l_history = TabHistory(l_document)
+    l_measures = MeasureIndex(l_document)
+
+    l_timings = []
+    for l_event in l_events:
+        l_start = time.perf_counter()
+        l_name = replay_event(l_event, l_editor, l_history, l_text_zone, l_measures)
+        l_timings.append((l_name, (time.perf_counter() - l_start) * 1000))
+    # end for
+
+    # The Text stub must show the same tab as the model
+    if l_text_zone.lines != l_document.lines():
+        raise AssertionError(f"{path}: the view differs from the model after the replay")
+    # else: consistent view
+
+    return ReplayResult(path, l_timings, l_final, l_document.lines())
+# end of function
+
+
+def percentile(values, percent):
+    """
+    Get a percentile of values (nearest rank).
+
+    :param values: The values.
+    :param percent: The percentile (0 to 100).
+    """
+    if not values:
+        return 0.0
+    # else: at least one value
+    l_sorted = sorted(values)
+
+    return l_sorted[min(max(-(-percent * len(l_sorted) // 100) - 1, 0), len(l_sorted) - 1)]
+# end of function
+
+
+def summarize(results):
+    """
+    Summarize the timings of the replays, per event name.
+
+    :param results: List of ReplayResult (e.g. the repetitions of a trace).
+    :return: Dictionary {event name: {count, p50_ms, p95_ms, max_ms}} ('all' for all events).
+    """
+    l_durations = {'all': []}
+    for l_result in results:
+        for l_name, l_duration in l_result.timings:
+            l_durations.setdefault(l_name, []).append(l_duration)
+            l_durations['all'].append(l_duration)
+        # end for
+    # end for
+
+    return {l_name: {'count': len(l_values),
+                     'p50_ms': round(percentile(l_values, 50), 4),
+                     'p95_ms': round(percentile(l_values, 95), 4),
+                     'max_ms': round(max(l_values, default=0.0), 4)}
+            for l_name, l_values in l_durations.items()}
+# end of function
+
+
+def iter_traces(paths):
+    """
+    List the trace files.
+
+    :param paths: Trace files or directories of traces (*.gtwtrace, walked recursively).
+    :return: Iterator of trace paths.
+    """
+    for l_path in paths:
+        if os.path.isdir(l_path):
+            for l_dir, l_subdirs, l_files in os.walk(l_path):
+                l_subdirs.sort()
+                for l_name in sorted(l_files):
+                    if l_name.endswith(TRACE_PATTERN):
+                        yield os.path.join(l_dir, l_name)
+                    # else: not a trace
+                # end for
+            # end for
+        else:
+            yield l_path
+        # endif
+    # end for
+# end of function
+
+
+##################
+# MAIN FUNCTION
+##################
+def main(argv=None):
+    """
+    Replay traces and report the time of the events.
+
+    :param argv: The arguments (defaults to sys.argv[1:]).
+    :return: The exit code (0: success, 1: final tab mismatch or p95 above --max-p95).
+    """
+    l_parser = argparse.ArgumentParser(description='Replay Guitar Tab Writer sessions.')
+    l_parser.add_argument('paths', nargs='+',
+                          help=f'trace files or directories of *{TRACE_PATTERN} files')
+    l_parser.add_argument('--repeat', type=int, default=REPEAT,
+                          help='number of replays of each trace')
+    l_parser.add_argument('--max-p95', type=float, default=None,
+                          help='fail if the p95 of the events is above this time (ms)')
+    l_parser.add_argument('--output', help='JSON file of the results')
+    l_args = l_parser.parse_args(argv)
+
+    l_failed = False
+    l_report = {}
+    for l_path in iter_traces(l_args.paths):
+        l_results = [replay_trace(l_path) for _ in range(max(l_args.repeat, 1))]
+        l_summary = summarize(l_results)
+        l_matches = l_results[0].matches
+        l_report[l_path] = {'matches': l_matches, 'events': l_summary}
+
+        l_all = l_summary['all']
+        print(f"{l_path}: {l_all['count'] // len(l_results)} events, "
+              f"p50 {l_all['p50_ms']:.3f} ms, p95 {l_all['p95_ms']:.3f} ms, "
+              f"max {l_all['max_ms']:.3f} ms, final tab {'OK' if l_matches else 'MISMATCH'}")
+        for l_name, l_stats in sorted(l_summary.items()):
+            if l_name != 'all':
+                print(f"    {l_name:<15} {l_stats['count']:>7} {l_stats['p50_ms']:>9.3f} "
+                      f"{l_stats['p95_ms']:>9.3f} {l_stats['max_ms']:>9.3f}")
+            # else: already printed
+        # end for
+
+        if not l_matches:
+            l_failed = True
+        elif l_args.max_p95 is not None and l_all['p95_ms'] > l_args.max_p95:
+            print(f"    p95 above {l_args.max_p95} ms", file=sys.stderr)
+            l_failed = True
+        # else: success
+    # end for
+
+    if l_args.output:
+        with open(l_args.output, 'w', encoding='utf-8') as l_file:
+            json.dump(l_report, l_file, indent=2)
+        # end with
+    # else: no results file
+
+    return 1 if l_failed else 0
+# end function
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# End of file
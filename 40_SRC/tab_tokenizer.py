@@ -0,0 +1,106 @@
+"""
+Tab Tokenizer Module
+
+USE:
+    This module splits a staff line into tokens in a single pass, with one compiled
+    regular expression: frets (0 to 24, one or two digits), technique markers
+    (h, p, /, \\, b, r, ~, x) and bars. All the tab transforms use it.
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+import re                       # For the compiled tokenizer
+from itertools import accumulate    # For the token columns
+from typing import NamedTuple   # For the tokens
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+MAX_FRET = 24  # Constant => pylint: disable=C0103
+TECHNIQUES = 'hpb/\\r~x'  # Constant => pylint: disable=C0103
+
+# Token kinds
+KIND_FRET = 'fret'              # Constant => pylint: disable=C0103
+KIND_TECHNIQUE = 'technique'    # Constant => pylint: disable=C0103
+KIND_BAR = 'bar'                # Constant => pylint: disable=C0103
+
+# Two-digit frets first: "12" is one fret, "25" is "2" then "5"
+TOKEN_RE = re.compile(  # Constant => pylint: disable=C0103
+    r'(?P<fret>2[0-4]|1[0-9]|[0-9])'
+    r'|(?P<technique>[' + re.escape(TECHNIQUES) + r'])'
+    r'|(?P<bar>\|)')
+FRET_SPLIT_RE = re.compile(r'(2[0-4]|1[0-9]|[0-9])')  # Constant => pylint: disable=C0103
+FRET_VALUES = {str(l_fret): l_fret for l_fret in range(MAX_FRET + 1)}  # Constant => pylint: disable=C0103
+
+
+##################
+# CLASS DEFINITION
+##################
+class Token(NamedTuple):
+    """
+    One token of a staff line.
+
+    :param column: Column of the first character.
+    :param fret: The fret number (None for the other kinds).
+    :param width: Number of characters.
+    :param kind: One of the KIND_* constants.
+    """
+    column: int
+    fret: int
+    width: int
+    kind: str = KIND_FRET
+# end of class
+
+
+##################
+# FUNCTIONS
+##################
+def tokenize(line, start=0, end=None):
+    """
+    Split a staff line into tokens (frets, technique markers and bars).
+
+    :param line: The staff line.
+    :param start: First column to tokenize.
+    :param end: Column after the last one (defaults to the end of the line).
+    :return: Iterator of Token.
+    """
+    if end is None:
+        end = len(line)
+    # else: end provided by the caller
+
+    for l_match in TOKEN_RE.finditer(line, start, end):
+        l_kind = l_match.lastgroup
+        l_col = l_match.start()
+        if l_kind == KIND_FRET:
+            yield Token(l_col, int(l_match.group()), l_match.end() - l_col, KIND_FRET)
+        else:
+            yield Token(l_col, None, 1, l_kind)
+        # endif
+    # end for
+# end of function
+
+
+def fret_tokens(line, start=0, end=None):
+    """
+    Get the frets of a staff line, as (column, fret, width) tuples.
+    The line is split once by the compiled expression and the columns are accumulated
+    from the lengths of the pieces, without any per-character Python loop.
+
+    :param line: The staff line.
+    :param start: First column to tokenize.
+    :param end: Column after the last one (defaults to the end of the line).
+    :return: List of (column, fret, width).
+    """
+    l_parts = FRET_SPLIT_RE.split(line[start:end])
+    l_lengths = list(map(len, l_parts))
+    l_columns = list(accumulate(l_lengths, initial=start))
+
+    return list(zip(l_columns[1::2], map(FRET_VALUES.__getitem__, l_parts[1::2]),
+                    l_lengths[1::2]))
+# end of function
+
+
+# End of file
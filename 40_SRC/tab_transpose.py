@@ -0,0 +1,163 @@
+"""
+Tab Transpose Module
+
+USE:
+    This module transposes a tab by any number of semitones.
+    The tab is converted once into NumPy matrices (strings x columns): the characters,
+    the frets (-1 when there is no fret) and the fret widths. The shift, the columns to
+    widen and the new layout are then computed for the whole tab in vectorized passes,
+    and the result is rendered once.
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+from typing import NamedTuple   # For the fret matrix
+# THIRD-PARTY libraries
+import numpy as np              # For the vectorized transpose
+# APPLICATION libraries
+from tab_document import DASH, ENCODING         # For the tab characters
+from tab_tokenizer import fret_tokens, MAX_FRET # For the fret tokens
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+NO_FRET = -1  # Constant => pylint: disable=C0103
+ZERO = ord('0')  # Constant => pylint: disable=C0103
+
+
+##################
+# CLASS DEFINITION
+##################
+class TransposeError(ValueError):
+    """
+    Raised when a transposition would move notes out of the fretboard.
+    """
+# end of class
+
+
+class FretMatrix(NamedTuple):
+    """
+    Matrix representation of a tab.
+
+    :param chars: The characters (uint8, strings x columns, ' ' replaced by '-').
+    :param frets: The fret starting at each cell (int16, NO_FRET if none).
+    :param widths: The number of characters of the fret starting at each cell (0 if none).
+    """
+    chars: np.ndarray
+    frets: np.ndarray
+    widths: np.ndarray
+# end of class
+
+
+##################
+# FUNCTIONS
+##################
+def fret_matrix(lines):
+    """
+    Convert staff lines into a FretMatrix (short lines are padded with '-').
+
+    :param lines: The staff lines (one per string).
+    """
+    l_width = max((len(l_line) for l_line in lines), default=0)
+    l_chars = np.frombuffer(
+        ''.join(l_line.ljust(l_width, DASH) for l_line in lines)
+        .replace(' ', DASH).encode(ENCODING, errors='replace'),
+        dtype=np.uint8).reshape(len(lines), l_width)
+    l_frets = np.full((len(lines), l_width), NO_FRET, dtype=np.int16)
+    l_widths = np.zeros((len(lines), l_width), dtype=np.int8)
+    for l_row, l_line in enumerate(lines):
+        l_tokens = fret_tokens(l_line.replace(' ', DASH))
+        if l_tokens:
+            l_cols, l_values, l_sizes = zip(*l_tokens)
+            l_frets[l_row, list(l_cols)] = l_values
+            l_widths[l_row, list(l_cols)] = l_sizes
+        # else: no fret on this string
+    # end for
+
+    return FretMatrix(l_chars, l_frets, l_widths)
+# end of function
+
+
+def transpose_matrix(matrix, semitones):
+    """
+    Transpose a FretMatrix.
+    A column of notes whose widest fret gains a digit is widened once: '-' columns are
+    inserted on all the strings after the widest fret of the column.
+
+    :param matrix: The FretMatrix.
+    :param semitones: The number of semitones (negative to go down).
+    :return: The new characters (uint8, strings x columns).
+    :raise TransposeError: If a note would go below fret 0 or above the last fret.
+    """
+    l_chars, l_frets, l_widths = matrix
+    l_nb_strings, l_width = l_chars.shape
+    l_is_fret = l_frets != NO_FRET
+    l_new = np.where(l_is_fret, l_frets + semitones, NO_FRET)
+
+    # Check the range: notes are never lost
+    l_out = l_is_fret & ((l_new < 0) | (l_new > MAX_FRET))
+    if l_out.any():
+        raise TransposeError(
+            f"{int(l_out.sum())} note(s) would be out of the fretboard (0-{MAX_FRET}).")
+    # else: all the notes can be transposed
+
+    # Width of each column of notes, before and after
+    l_new_widths = np.where(l_is_fret, 1 + (l_new >= 10), 0)
+    l_old_col_width = l_widths.max(axis=0, initial=0).astype(np.int64)
+    l_grow = np.maximum(l_new_widths.max(axis=0, initial=0) - l_old_col_width, 0)
+
+    # Boundaries inside a 2-digit fret cannot receive new columns
+    l_covered = np.zeros(l_width + 1, dtype=bool)
+    l_covered[1:] = (l_widths == 2).any(axis=0)
+    l_free = np.flatnonzero(~l_covered)
+
+    # Number of '-' columns inserted before each old column (and at the end)
+    l_inserts = np.zeros(l_width + 1, dtype=np.int64)
+    l_grow_cols = np.flatnonzero(l_grow)
+    if l_grow_cols.size:
+        l_boundaries = l_free[np.searchsorted(l_free, l_grow_cols + l_old_col_width[l_grow_cols])]
+        np.maximum.at(l_inserts, l_boundaries, l_grow[l_grow_cols])
+    # else: no column to widen
+    l_shift = np.cumsum(l_inserts)
+
+    # Move the old characters to their new columns
+    l_result = np.full((l_nb_strings, l_width + int(l_inserts.sum())), ord(DASH), dtype=np.uint8)
+    l_positions = np.arange(l_width) + l_shift[:l_width]
+    l_result[:, l_positions] = l_chars
+
+    # Write the new frets, left-aligned in their column
+    l_rows, l_cols = np.nonzero(l_is_fret)
+    l_values = l_new[l_rows, l_cols]
+    l_pos = l_positions[l_cols]
+    l_two = l_values >= 10
+    l_result[l_rows, l_pos] = np.where(l_two, ZERO + l_values // 10, ZERO + l_values)
+    l_result[l_rows[l_two], l_pos[l_two] + 1] = ZERO + l_values[l_two] % 10
+    l_shrunk = ~l_two & (l_widths[l_rows, l_cols] == 2)
+    l_result[l_rows[l_shrunk], l_pos[l_shrunk] + 1] = ord(DASH)
+
+    return l_result
+# end of function
+
+
+def transpose_lines(lines, semitones):
+    """
+    Transpose staff lines by a number of semitones.
+
+    :param lines: The staff lines (one per string).
+    :param semitones: The number of semitones (negative to go down).
+    :return: The new lines.
+    :raise TransposeError: If a note would go below fret 0 or above the last fret.
+    """
+    if not lines:
+        return []
+    # else: at least one string
+
+    l_result = transpose_matrix(fret_matrix(lines), semitones)
+
+    return [l_row.tobytes().decode(ENCODING) for l_row in l_result]
+# end of function
+
+# End of file
@@ -0,0 +1,501 @@
+"""
+Tab View Module
+
+USE:
+    This module mirrors a TabDocument in a Tk Text widget.
+    Each change of the model is converted into the smallest set of per-line delete/insert
+    operations, so the render cost of an edit depends on the size of the edit and not on
+    the size of the tab. The Text widget is only used through `index`, `get`, `insert`,
+    `delete` and `edit_modified`, so any object providing them can be used (e.g. headless).
+    With a window, the Text widget only holds the string names and a window of columns
+    around the cursor (virtualized view): the cost of an edit then depends on the window
+    and not on the length of the tab, and scrolling slides the window.
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+from tab_document import ENCODING, STRINGS, BAR, line_edit  # For the tab model
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+PREFIX_COLUMNS = 2  # String names and first bar, always displayed => pylint: disable=C0103
+SCROLL_UNIT = 8     # Columns scrolled by a scrollbar arrow => pylint: disable=C0103
+
+
+##################
+# CLASS DEFINITION
+##################
+class TabView:
+    """
+    Text widget view of a TabDocument.
+    """
+    def __init__(self, text_zone, document, window=None):
+        """
+        Initialize the view and register it as a listener of the document.
+
+        :param text_zone: The Text widget.
+        :param document: The TabDocument to display.
+        :param window: Number of displayed columns after the string names (None: all).
+        """
+        self.text_zone = text_zone
+        self.document = document
+        self.muted = False
+        self.document.add_listener(self.on_change)
+
+        # Window mode: the Text widget holds the prefix columns, then [start, start + window[
+        self.window = window
+        self.start = PREFIX_COLUMNS
+        self.shown = []             # Lines displayed in the Text widget (window mode)
+        self.xscrollcommand = None  # Function called with the (first, last) scroll fractions
+        self.redraw_command = None  # Function called with the (low, high) columns redrawn
+
+        # Batch mode: changes are only recorded, and mirrored at once by end_batch
+        self.batching = False
+        self._batch_start = 0      # First modified column
+        self._batch_tail = 0       # Number of unmodified columns at the end
+        self._batch_old_width = 0  # Width of the tab displayed in the Text widget
+
+        return
+    # end of function
+
+
+    def render(self):
+        """
+        Display the whole document (or its window) in the Text widget (initial display only).
+        """
+        self.text_zone.delete('1.0', 'end')
+        if self.window is None:
+            self.text_zone.insert('1.0', self.document.to_text())
+        else:
+            self.shown = self.visible_lines()
+            self.text_zone.insert('1.0', '\n'.join(self.shown))
+            self.update_scrollbar()
+        # endif
+        self.text_zone.edit_modified(False)
+        self.redrawn(0, self.document.width)
+
+        return
+    # end of function
+
+
+    def redrawn(self, low, high):
+        """
+        Report columns displayed again in the Text widget (e.g. to the highlighter).
+
+        :param low: The first column.
+        :param high: The column after the last one.
+        """
+        if self.redraw_command is not None:
+            self.redraw_command(low, high)
+        # else: nobody to report to
+
+        return
+    # end of function
+
+
+    def segments(self, low, high):
+        """
+        Split a range of columns into the displayed parts held by one line per string.
+
+        :param low: The first column.
+        :param high: The column after the last one.
+        :return: List of (first column, column after the last one).
+        """
+        if self.window is not None:
+            low = max(low, self.start)
+            high = min(high, self.end)
+        # else: the whole tab is displayed
+
+        return [(low, high)] if low < high else []
+    # end of function
+
+
+    @property
+    def end(self):
+        """
+        Column after the last displayed one.
+        """
+        if self.window is None:
+            return self.document.width
+        # else: window mode
+        return min(self.start + self.window, self.document.width)
+    # end of function
+
+
+    def index(self, row, col):
+        """
+        Get the Text widget index of a cell.
+
+        :param row: The string index.
+        :param col: The column index in the document.
+        """
+        return f"{row + 1}.{self.widget_col(col)}"
+    # end of function
+
+
+    def widget_col(self, col):
+        """
+        Convert a column of the document into a column of the Text widget.
+
+        :param col: The column index in the document.
+        """
+        if self.window is None or col < PREFIX_COLUMNS:
+            return col
+        # else: windowed column
+        return col - self.start + PREFIX_COLUMNS
+    # end of function
+
+
+    def doc_col(self, widget_col):
+        """
+        Convert a column of the Text widget into a column of the document.
+
+        :param widget_col: The column index in the Text widget.
+        """
+        if self.window is None or widget_col < PREFIX_COLUMNS:
+            return widget_col
+        # else: windowed column
+        return widget_col - PREFIX_COLUMNS + self.start
+    # end of function
+
+
+    def cell_at(self, index):
+        """
+        Get the cell of the tab displayed at a Text widget index.
+
+        :param index: The "line.char" index.
+        :return: (row, col), or None if the index is not on a string.
+        """
+        l_line, l_char = map(int, index.split('.'))
+        if l_line > self.document.nb_strings:
+            return None
+        # else: on a string
+
+        return (l_line - 1, self.doc_col(l_char))
+    # end of function
+
+
+    def select_columns(self, start, end, first_row=0, last_row=None):
+        """
+        Select columns of strings (Tk "sel" tag, one range per string), e.g. a measure.
+
+        :param start: First column.
+        :param end: Column after the last one.
+        :param first_row: The first selected string.
+        :param last_row: The last selected string (defaults to the last string).
+        """
+        self.show(start)
+        self.text_zone.tag_remove('sel', '1.0', 'end')
+        l_end = max(min(end, self.end), start)
+        for l_row in self.rows(first_row, last_row):
+            self.text_zone.tag_add('sel', self.index(l_row, start), self.index(l_row, l_end))
+        # end for
+
+        return
+    # end of function
+
+
+    def rows(self, first_row=0, last_row=None):
+        """
+        Get the range of the strings between two strings.
+
+        :param first_row: The first string.
+        :param last_row: The last string (defaults to the last string).
+        """
+        l_last = self.document.nb_strings - 1 if last_row is None else last_row
+
+        return range(max(first_row, 0), min(l_last, self.document.nb_strings - 1) + 1)
+    # end of function
+
+
+    def detach(self):
+        """
+        Stop mirroring the document (e.g. before replacing the view).
+        """
+        self.document.remove_listener(self.on_change)
+
+        return
+    # end of function
+
+
+    def visible_lines(self):
+        """
+        Get the lines to display in window mode: the prefix columns, then the window.
+        """
+        return [l_prefix + l_window for l_prefix, l_window in
+                zip(self.document.lines(0, PREFIX_COLUMNS),
+                    self.document.lines(self.start, self.start + self.window))]
+    # end of function
+
+
+    def refresh_window(self):
+        """
+        Display the current window (window mode), with the minimal per-line edits.
+        """
+        l_width = self.document.width
+        if self.start > PREFIX_COLUMNS and self.start >= l_width:
+            # The tab became shorter than the window start
+            self.start = max(PREFIX_COLUMNS, l_width - self.window // 2)
+            self.redrawn(self.start, self.end)
+        # else: valid window
+
+        l_lines = self.visible_lines()
+        for l_row, l_line in enumerate(l_lines):
+            self.patch_line(l_row, 0, self.shown[l_row], l_line)
+        # end for
+        self.shown = l_lines
+        self.text_zone.edit_modified(False)
+        self.update_scrollbar()
+
+        return
+    # end of function
+
+
+    def show(self, col):
+        """
+        Slide the window (window mode) so that a column is displayed, centered.
+
+        :param col: The column index in the document (e.g. the cursor).
+        """
+        if self.window is None or col < PREFIX_COLUMNS \
+                or self.start <= col <= self.start + self.window:
+            return
+        # else: column out of the window
+
+        self.start = max(PREFIX_COLUMNS, col - self.window // 2)
+        self.refresh_window()
+        self.redrawn(self.start, self.end)
+
+        return
+    # end of function
+
+
+    def scroll(self, *args):
+        """
+        Slide the window: command of a horizontal Scrollbar.
+
+        :param args: ('moveto', fraction) or ('scroll', number, 'units' or 'pages').
+        """
+        if self.window is None:
+            return
+        # else: window mode
+
+        l_range = max(self.document.width - PREFIX_COLUMNS, 1)
+        if args[0] == 'moveto':
+            l_start = PREFIX_COLUMNS + int(float(args[1]) * l_range)
+        else:
+            l_step = SCROLL_UNIT if args[2] == 'units' else self.window * 3 // 4
+            l_start = self.start + int(args[1]) * l_step
+        # endif
+        l_start = max(PREFIX_COLUMNS,
+                      min(l_start, self.document.width - self.window // 2))
+        if l_start != self.start:
+            self.start = l_start
+            self.refresh_window()
+            self.redrawn(self.start, self.end)
+        # else: the window does not move
+
+        return
+    # end of function
+
+
+    def update_scrollbar(self):
+        """
+        Send the displayed fraction of the tab to the scrollbar (window mode).
+        """
+        if self.xscrollcommand is not None:
+            l_range = max(self.document.width - PREFIX_COLUMNS, 1)
+            self.xscrollcommand(min((self.start - PREFIX_COLUMNS) / l_range, 1.0),
+                                min((self.start + self.window - PREFIX_COLUMNS) / l_range, 1.0))
+        # else: no scrollbar
+
+        return
+    # end of function
+
+
+    def on_change(self, change):
+        """
+        Mirror a change of the document in the Text widget.
+
+        :param change: The TabChange sent by the document.
+        """
+        if self.muted:
+            return
+        # else: mirror the change
+
+        if self.window is not None:
+            # Window mode: only a change before the end of the window is visible
+            if self.batching:
+                self._batch_start = min(self._batch_start, change.col)
+            elif change.col <= self.start + self.window:
+                self.refresh_window()
+                l_delta = abs(len(change.new) - len(change.old))
+                if l_delta:
+                    # Columns slid into the end of the window
+                    self.redrawn(self.end - l_delta, self.end)
+                # else: same width
+            else:
+                self.update_scrollbar()
+            # endif
+            return
+        # else: the whole tab is displayed
+
+        if self.batching:
+            # Only extend the modified range: [start, width - tail[
+            self._batch_start = min(self._batch_start, change.col)
+            self._batch_tail = min(self._batch_tail,
+                                   self.document.width - change.col - len(change.new))
+            return
+        # else: mirror the change now
+
+        l_nb = self.document.nb_strings
+        l_old = b''.join(change.old)
+        l_new = b''.join(change.new)
+        for l_row in range(l_nb):
+            self.patch_line(l_row, change.col,
+                            l_old[l_row::l_nb].decode(ENCODING),
+                            l_new[l_row::l_nb].decode(ENCODING))
+        # end for
+
+        # The Text widget content is the model one
+        self.text_zone.edit_modified(False)
+
+        return
+    # end of function
+
+
+    def begin_batch(self):
+        """
+        Start recording the changes instead of mirroring them one by one.
+        """
+        if not self.batching:
+            self.batching = True
+            self._batch_old_width = self.document.width
+            self._batch_start = self._batch_old_width
+            self._batch_tail = self._batch_old_width
+        # else: already batching
+
+        return
+    # end of function
+
+
+    def end_batch(self):
+        """
+        Mirror all the changes recorded since begin_batch, with one patch per string.
+        """
+        if not self.batching:
+            return
+        # else: mirror the recorded changes
+
+        self.batching = False
+        if self.window is not None:
+            if self._batch_start <= self.start + self.window:
+                self.refresh_window()
+                self.redrawn(self._batch_start, self.end)
+            # else: nothing visible has been modified
+            return
+        # else: the whole tab is displayed
+        l_start = self._batch_start
+        l_old_end = self._batch_old_width - self._batch_tail
+        l_new_end = self.document.width - self._batch_tail
+        if l_start < max(l_old_end, l_new_end):
+            for l_row in range(self.document.nb_strings):
+                self.patch_line(l_row, l_start,
+                                self.text_zone.get(self.index(l_row, l_start),
+                                                   self.index(l_row, l_old_end)),
+                                self.document.line(l_row, l_start, l_new_end))
+            # end for
+            self.text_zone.edit_modified(False)
+            self.redrawn(l_start, l_new_end)
+        # else: nothing has been modified
+
+        return
+    # end of function
+
+
+    def patch_line(self, row, col, old, new):
+        """
+        Replace a segment of a line by another one, with at most one delete and one insert.
+
+        :param row: The string index.
+        :param col: Column of the segment in the line of the Text widget.
+        :param old: The current segment.
+        :param new: The new segment.
+        """
+        l_edit = line_edit(old, new)
+        if l_edit is not None:
+            l_start, l_old_end, l_text = l_edit
+            if l_old_end > l_start:
+                self.text_zone.delete(f"{row + 1}.{col + l_start}",
+                                      f"{row + 1}.{col + l_old_end}")
+            # else: nothing to delete
+            if l_text:
+                self.text_zone.insert(f"{row + 1}.{col + l_start}", l_text)
+            # else: nothing to insert
+        # else: the segment does not change
+
+        return
+    # end of function
+
+
+    def resync(self):
+        """
+        Update the document from the Text widget, if the text has been modified outside
+        of the model (e.g. paste, backspace), and align it with the minimal edits.
+        """
+        if not self.text_zone.edit_modified():
+            return
+        # else: the Text widget has been modified
+
+        l_lines = self.text_zone.get('1.0', 'end-1c').split('\n')
+        l_nb = self.document.nb_strings
+        l_tab_lines = l_lines[:l_nb]
+        for l_row in range(len(l_tab_lines), l_nb):
+            # Restore the missing strings
+            l_tab_lines.append(STRINGS[l_row % len(STRINGS)] + BAR)
+        # end for
+        if self.window is not None:
+            # Only the window has been modified: rebuild the whole strings
+            l_end = self.start + self.window
+            l_tab_lines = [l_line[:PREFIX_COLUMNS]
+                           + self.document.line(l_row, PREFIX_COLUMNS, self.start)
+                           + l_line[PREFIX_COLUMNS:] + self.document.line(l_row, l_end)
+                           for l_row, l_line in enumerate(l_tab_lines)]
+        # else: the Text widget holds the whole strings
+
+        # The Text widget is the reference here: update the model without mirroring (one
+        # change of the modified columns, e.g. the cell of a backspace)
+        self.muted = True
+        try:
+            self.document.update_lines(l_tab_lines)
+        finally:
+            self.muted = False
+        # end try
+
+        # Remove the extra lines, then align the strings (the cursor stays where Tk put it)
+        l_cursor = self.text_zone.index('insert')
+        if len(l_lines) > l_nb:
+            self.text_zone.delete(f"{l_nb}.end", 'end-1c')
+        # else: no extra line
+        l_new_lines = self.document.lines() if self.window is None else self.visible_lines()
+        for l_row, l_new_line in enumerate(l_new_lines):
+            if l_row < len(l_lines):
+                self.patch_line(l_row, 0, l_lines[l_row], l_new_line)
+            else:
+                self.text_zone.insert('end-1c', '\n' + l_new_line)
+            # endif
+        # end for
+        self.shown = l_new_lines if self.window is not None else []
+        self.text_zone.mark_set('insert', l_cursor)
+        self.text_zone.edit_modified(False)
+
+        return
+    # end of function
+
+# end of class
+
+# End of file
@@ -0,0 +1,19 @@
+"""
+Test Configuration
+
+USE:
+    The tests import the application modules as the application does (flat modules of
+    40_SRC), and run headless with the TextStub of tab_benchmark instead of Tk:
+        python -m pytest 40_SRC/tests
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+import os                       # For the source directory
+import sys                      # For the module search path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# End of file
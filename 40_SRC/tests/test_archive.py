@@ -0,0 +1,84 @@
+"""
+Archive Tests
+
+USE:
+    The edited staff systems of an opened tab file must be written back in place of the
+    old ones, with the other bytes of the file (text, end of lines) unchanged.
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+import stat                     # For the file permissions
+# APPLICATION libraries
+from tab_archive import TabArchive  # For the large files
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+SONG_TEXT = ('Verse\n'                                  # Constant => pylint: disable=C0103
+             'e|-3-|\nb|-1-|\n'
+             'Chorus\n'
+             'e|-5-|\nb|-7-|\n'
+             'End\n')
+
+
+##################
+# FUNCTIONS
+##################
+def test_save_edits(tmp_path):
+    """
+    Only the edited system is replaced.
+    """
+    l_path = tmp_path / 'song.txt'
+    l_path.write_bytes(SONG_TEXT.encode())
+    l_archive = TabArchive(str(l_path))
+    l_archive.save({1: ['e|-5-8-|', 'b|-7-0-|']})
+
+    assert l_path.read_bytes() == SONG_TEXT.replace('e|-5-|\nb|-7-|',
+                                                    'e|-5-8-|\nb|-7-0-|').encode()
+    # The new file is mapped
+    assert l_archive.system_lines(1) == ['e|-5-8-|', 'b|-7-0-|']
+    l_archive.close()
+
+    return
+# end of function
+
+
+def test_save_keeps_crlf(tmp_path):
+    """
+    The end of lines of the file are kept.
+    """
+    l_path = tmp_path / 'song.txt'
+    l_path.write_bytes(SONG_TEXT.replace('\n', '\r\n').encode())
+    l_archive = TabArchive(str(l_path))
+    l_archive.save({0: ['e|-2-|', 'b|-2-|']})
+    l_archive.close()
+
+    assert l_path.read_bytes() == SONG_TEXT.replace('e|-3-|\nb|-1-|', 'e|-2-|\nb|-2-|') \
+        .replace('\n', '\r\n').encode()
+    assert not [l_name for l_name in tmp_path.iterdir() if l_name.suffix == '.tmp']
+
+    return
+# end of function
+
+
+def test_save_keeps_mode(tmp_path):
+    """
+    The saved file keeps its permissions.
+    """
+    l_path = tmp_path / 'song.txt'
+    l_path.write_bytes(SONG_TEXT.encode())
+    l_path.chmod(0o644)
+    l_archive = TabArchive(str(l_path))
+    l_archive.save({0: ['e|-2-|', 'b|-2-|']})
+    l_archive.close()
+
+    assert stat.S_IMODE(l_path.stat().st_mode) == 0o644
+
+    return
+# end of function
+
+# End of file
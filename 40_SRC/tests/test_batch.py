@@ -0,0 +1,106 @@
+"""
+Batch Tests
+
+USE:
+    The command line processes several files with a process pool: a file that cannot be
+    read must be reported as failed, without stopping the batch.
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+import os                       # For the source directory
+import stat                     # For the file permissions
+import subprocess               # For the application process
+import sys                      # For the Python interpreter
+# APPLICATION libraries
+from tab_batch import run_task, CMD_NORMALIZE, CMD_VALIDATE  # For the tab operations
+from tab_cli import main        # For the command line
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+TAB_TEXT = 'e|-3-|\nb|-1|\ng|---|\nd|---|\na|---|\ne|---|\n'  # Constant => pylint: disable=C0103
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Constant => pylint: disable=C0103
+# Application run with Tk unavailable (as on a machine without Tk)
+NO_TK_SCRIPT = ("import sys; sys.modules['tkinter'] = None; import guitar_tab_writer; "  # Constant => pylint: disable=C0103
+                "sys.argv[1:] = ['validate', sys.argv[1]]; sys.exit(guitar_tab_writer.main())")
+
+
+##################
+# FUNCTIONS
+##################
+def test_run_task_missing_file(tmp_path):
+    """
+    A missing file is a failed task, not an exception.
+    """
+    l_missing = str(tmp_path / 'missing.txt')
+    l_src, l_size, l_errors = run_task((CMD_VALIDATE, l_missing, None, 0))
+
+    assert (l_src, l_size) == (l_missing, 0)
+    assert len(l_errors) == 1
+
+    return
+# end of function
+
+
+def test_batch_with_missing_file(tmp_path, capsys):
+    """
+    A batch of several files (process pool) goes on after a missing file.
+    """
+    l_paths = []
+    for l_name in ('first.txt', 'missing.txt', 'last.txt'):
+        l_path = tmp_path / l_name
+        if l_name != 'missing.txt':
+            l_path.write_text(TAB_TEXT, encoding='utf-8')
+        # else: file not created
+        l_paths.append(str(l_path))
+    # end for
+    l_output = tmp_path / 'output'
+
+    assert main([CMD_NORMALIZE, *l_paths, '--output', str(l_output)]) == 1
+    l_stderr = capsys.readouterr().err
+    assert 'missing.txt' in l_stderr
+    assert '3 file(s)' in l_stderr and '1 with errors' in l_stderr
+    # The other files have been normalized
+    assert (l_output / 'first.txt').read_text(encoding='utf-8').splitlines()[1] == 'b|-1|-'
+    assert (l_output / 'last.txt').exists()
+
+    return
+# end of function
+
+
+def test_in_place_keeps_mode(tmp_path):
+    """
+    A file normalized in place keeps its permissions.
+    """
+    l_path = tmp_path / 'song.txt'
+    l_path.write_text(TAB_TEXT, encoding='utf-8')
+    l_path.chmod(0o644)
+
+    assert main([CMD_NORMALIZE, str(l_path), '--in-place']) == 0
+    assert l_path.read_text(encoding='utf-8').splitlines()[1] == 'b|-1|-'
+    assert stat.S_IMODE(l_path.stat().st_mode) == 0o644
+
+    return
+# end of function
+
+
+def test_cli_without_tk(tmp_path):
+    """
+    The headless command line of the application does not import the GUI (nor Tk).
+    """
+    l_path = tmp_path / 'song.txt'
+    l_path.write_text(TAB_TEXT.replace('b|-1|', 'b|-1-|'), encoding='utf-8')
+    l_result = subprocess.run([sys.executable, '-c', NO_TK_SCRIPT, str(l_path)], cwd=SRC_DIR,
+                              capture_output=True, text=True, check=False)
+
+    assert l_result.returncode == 0, l_result.stderr
+    assert '1 file(s)' in l_result.stderr
+
+    return
+# end of function
+
+# End of file
@@ -0,0 +1,72 @@
+"""
+Binary Tests
+
+USE:
+    A binary tab whose column kinds do not match its stored notes (e.g. a crafted file
+    with a valid checksum) must be rejected, not silently truncated.
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+import zlib                     # For the checksum
+# THIRD-PARTY libraries
+import pytest                   # For the expected errors
+# APPLICATION libraries
+from tab_binary import (from_bytes, text_to_binary, read_header, BinaryFormatError,  # For the binary tabs
+                        BINARY_HEADER, KIND_NOTE, KIND_BLANK)
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+TAB_TEXT = 'e|-3-|\nb|-1-|\ng|---|\nd|---|\na|---|\ne|---|'  # Constant => pylint: disable=C0103
+
+
+##################
+# FUNCTIONS
+##################
+def craft(data, kind_index, kind):
+    """
+    Change the kind of a column, with a valid checksum.
+
+    :param data: The bytes of a binary tab.
+    :param kind_index: The column index.
+    :param kind: The new column kind.
+    :return: The crafted bytes.
+    """
+    l_pos = read_header(data)[3]
+    l_data = bytearray(data)
+    l_data[l_pos + kind_index] = kind
+    l_fields = list(BINARY_HEADER.unpack_from(l_data))
+    l_fields[5] = zlib.crc32(l_data[BINARY_HEADER.size:])
+    BINARY_HEADER.pack_into(l_data, 0, *l_fields)
+
+    return bytes(l_data)
+# end of function
+
+
+def test_round_trip():
+    """
+    A valid binary tab is decoded unchanged.
+    """
+    assert from_bytes(text_to_binary(TAB_TEXT)).to_text() == TAB_TEXT
+
+    return
+# end of function
+
+
+@pytest.mark.parametrize('kind_index, kind', [(2, KIND_NOTE), (3, KIND_BLANK), (2, 7)])
+def test_kinds_not_matching_notes(kind_index, kind):
+    """
+    More or less note kinds than stored notes, or an unknown kind, are format errors.
+    """
+    with pytest.raises(BinaryFormatError):
+        from_bytes(craft(text_to_binary(TAB_TEXT), kind_index, kind))
+    # end with
+
+    return
+# end of function
+
+# End of file
@@ -0,0 +1,129 @@
+"""
+Coalescing Tests
+
+USE:
+    Keystroke coalescing applies the key presses to the model at once, and displays them
+    in one batch: the result must be the one of one display per key press.
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+import random                   # For the random key presses
+# APPLICATION libraries
+from tab_benchmark import HeadlessEditor, WINDOW, KEY_DEL, SHIFT  # For the headless editor
+from tab_editor import command_from_key         # For the key presses
+from tab_layout import SYSTEM_COLUMNS           # For the stacked systems display
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+NB_COLUMNS = 1000  # Constant => pylint: disable=C0103
+NB_EVENTS = 1000   # Constant => pylint: disable=C0103
+KEYS = '0123456789-|'  # Constant => pylint: disable=C0103
+FLUSH_RATE = 0.05  # Probability of a display after a key press => pylint: disable=C0103
+
+
+##################
+# FUNCTIONS
+##################
+def random_events(seed):
+    """
+    Build a random sequence of key presses (notes, dashes, bars and Shift + Del).
+
+    :param seed: The random seed.
+    :return: List of (char, keycode, state, row, col, flush after the key).
+    """
+    l_random = random.Random(seed)
+    l_events = []
+    for _ in range(NB_EVENTS):
+        l_row = l_random.randrange(6)
+        l_col = l_random.randrange(2, NB_COLUMNS // 2)
+        l_flush = l_random.random() < FLUSH_RATE
+        if l_random.random() < 0.1:
+            l_events.append(('', KEY_DEL, SHIFT, l_row, l_col, l_flush))
+        else:
+            l_events.append((l_random.choice(KEYS), 0, 0, l_row, l_col, l_flush))
+        # endif
+    # end for
+
+    return l_events
+# end of function
+
+
+def replay_coalesced(tab, events):
+    """
+    Replay key presses as GuitarTabWriter.queue_command and flush_pending do.
+
+    :param tab: The HeadlessEditor.
+    :param events: The key presses.
+    """
+    for l_char, l_keycode, l_state, l_row, l_col, l_flush in events:
+        tab.view.begin_batch()
+        tab.editor.apply(command_from_key(l_char, l_keycode, l_state, l_row, l_col))
+        if l_flush:
+            tab.view.end_batch()
+            tab.view.show(tab.editor.col)
+        # else: display pending
+    # end for
+    tab.view.end_batch()
+    tab.view.show(tab.editor.col)
+
+    return
+# end of function
+
+
+def check_coalescing(seed, **options):
+    """
+    Compare a coalesced replay with one display per key press.
+
+    :param seed: The random seed.
+    :param options: The options of HeadlessEditor (window, system_columns).
+    """
+    l_events = random_events(seed)
+    l_each = HeadlessEditor(NB_COLUMNS, **options)
+    for l_char, l_keycode, l_state, l_row, l_col, _ in l_events:
+        l_each.key(l_char, l_row, l_col, l_keycode, l_state)
+    # end for
+    l_coalesced = HeadlessEditor(NB_COLUMNS, **options)
+    replay_coalesced(l_coalesced, l_events)
+
+    assert l_coalesced.document.lines() == l_each.document.lines()
+    assert l_coalesced.text_zone.lines == l_each.text_zone.lines
+
+    return
+# end of function
+
+
+def test_coalescing_stress():
+    """
+    1000 random key presses: whole tab displayed.
+    """
+    check_coalescing(1)
+
+    return
+# end of function
+
+
+def test_coalescing_stress_window():
+    """
+    1000 random key presses: virtualized view.
+    """
+    check_coalescing(2, window=WINDOW // 10)
+
+    return
+# end of function
+
+
+def test_coalescing_stress_layout():
+    """
+    1000 random key presses: auto-layout.
+    """
+    check_coalescing(3, system_columns=SYSTEM_COLUMNS)
+
+    return
+# end of function
+
+# End of file
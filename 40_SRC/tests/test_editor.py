@@ -0,0 +1,49 @@
+"""
+Editor Tests
+
+USE:
+    The key presses are converted into edit commands: the "|" typed with AltGr (reported as
+    Control + Alt on Windows) is a bar, not a shortcut.
+"""
+
+##################
+# IMPORT SECTION
+##################
+# APPLICATION libraries
+from tab_editor import (command_from_key, EditCommand, ACTION_BAR, ACTION_NOTE,  # For the key presses
+                        KEYCODE_PIPE, CONTROL_MASK)
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+WINDOWS_ALTGR = 0x2000C  # Control + Alt state of AltGr on Windows => pylint: disable=C0103
+
+
+##################
+# FUNCTIONS
+##################
+def test_altgr_pipe_is_bar():
+    """
+    AltGr + 6 inserts a bar on all the strings.
+    """
+    assert command_from_key('|', KEYCODE_PIPE, WINDOWS_ALTGR, 0, 5, 'bar') == \
+        EditCommand(ACTION_BAR, 0, 5)
+    assert command_from_key('', KEYCODE_PIPE, WINDOWS_ALTGR, 1, 3) == EditCommand(ACTION_BAR, 1, 3)
+
+    return
+# end of function
+
+
+def test_control_is_shortcut():
+    """
+    The other keys pressed with Control are shortcuts, not edits.
+    """
+    assert command_from_key('3', 51, 0, 0, 5) == EditCommand(ACTION_NOTE, 0, 5, '3')
+    assert command_from_key('3', 51, CONTROL_MASK, 0, 5) is None
+    assert command_from_key('.', 60, CONTROL_MASK, 0, 5) is None
+
+    return
+# end of function
+
+# End of file
@@ -0,0 +1,182 @@
+"""
+Highlight Tests
+
+USE:
+    The highlighter only tags the columns modified by each edit again: after any
+    sequence of edits, the tags must be the ones of a full highlighting of the tab.
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+import random                   # For the random edits
+# APPLICATION libraries
+from tab_benchmark import TextStub              # For the Text widget
+from tab_document import TabDocument, STRINGS   # For the tab model
+from tab_history import TabHistory              # For the undo/redo
+from tab_highlight import (TabHighlighter, TAGS, TAG_BAR,  # For the highlighting
+                           TAG_FRET, TAG_MISALIGNED)
+from tab_layout import TabLayoutView            # For the stacked systems display
+from tab_view import TabView                    # For the display of the tab model
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+NB_SEQUENCES = 160  # Sequences of edits per view => pylint: disable=C0103
+CELLS = '--0123|hp/x~b'  # Constant => pylint: disable=C0103
+
+
+##################
+# FUNCTIONS
+##################
+def random_document(generator):
+    """
+    Build a random tab (misaligned bars included).
+
+    :param generator: The random generator.
+    """
+    l_width = generator.randint(5, 80)
+
+    return TabDocument.from_lines([f'{l_string}|' + ''.join(generator.choice(CELLS)
+                                                            for _ in range(l_width))
+                                   for l_string in STRINGS], STRINGS)
+# end of function
+
+
+def random_edit(generator, document, view, history):
+    """
+    Apply a random edit (note, dash, bar, deletion, undo), sometimes in a batch.
+
+    :param generator: The random generator.
+    :param document: The TabDocument.
+    :param view: Its view.
+    :param history: Its TabHistory.
+    """
+    l_batch = generator.random() < 0.3
+    if l_batch:
+        view.begin_batch()
+    # else: edit mirrored at once
+    for _ in range(generator.randint(1, 3) if l_batch else 1):
+        l_col = generator.randint(2, max(document.width - 1, 2))
+        l_kind = generator.random()
+        if l_kind < 0.4:
+            document.write_note(generator.randrange(6), l_col, generator.choice('0123456789hp|-'))
+        elif l_kind < 0.55:
+            document.insert_bar(l_col)
+        elif l_kind < 0.7:
+            document.insert_dash(l_col)
+        elif l_kind < 0.8 and document.width > 3:
+            document.delete_column(l_col)
+        elif l_kind < 0.9:
+            document.set_cell(generator.randrange(6), min(l_col, document.width - 1), '|')
+        elif history.can_undo():
+            history.undo()
+        # else: nothing to undo
+    # end for
+    if l_batch:
+        view.end_batch()
+    # else: no batch
+
+    return
+# end of function
+
+
+def tag_ranges(text_zone):
+    """
+    Get the ranges of the highlighting tags.
+
+    :param text_zone: The TextStub.
+    """
+    return {l_tag: text_zone.tag_ranges(l_tag) for l_tag in TAGS}
+# end of function
+
+
+def check_incremental(seed, build_view):
+    """
+    Compare the incremental tags with a full highlighting after random edits.
+
+    :param seed: The random seed.
+    :param build_view: Function building the view from (text zone, document).
+    """
+    l_random = random.Random(seed)
+    for _ in range(NB_SEQUENCES):
+        l_document = random_document(l_random)
+        l_text = TextStub()
+        l_view = build_view(l_text, l_document)
+        l_view.render()
+        l_history = TabHistory(l_document)
+        l_highlighter = TabHighlighter(l_view)
+        l_highlighter.refresh()
+        for _ in range(l_random.randint(1, 12)):
+            random_edit(l_random, l_document, l_view, l_history)
+            if l_random.random() < 0.6:
+                l_highlighter.refresh()
+            # else: refresh postponed (e.g. several edits in one idle cycle)
+        # end for
+        l_highlighter.refresh()
+        l_incremental = tag_ranges(l_text)
+
+        for l_tag in TAGS:
+            l_text.tag_remove(l_tag, '1.0', 'end')
+        # end for
+        l_highlighter.invalidate(0, l_document.width)
+        l_highlighter.refresh()
+        assert l_incremental == tag_ranges(l_text)
+    # end for
+
+    return
+# end of function
+
+
+def test_tags():
+    """
+    Frets, bars and misaligned bars (a '|' on some strings only).
+    """
+    l_document = TabDocument.from_lines(['e|-3-|', 'b|-|-|'] + [f'{l_string}|---|'
+                                                               for l_string in STRINGS[2:]],
+                                        STRINGS)
+    l_text = TextStub()
+    l_view = TabView(l_text, l_document)
+    l_view.render()
+    TabHighlighter(l_view).refresh()
+
+    assert l_text.tag_ranges(TAG_FRET) == ('1.3', '1.4')
+    assert l_text.tag_ranges(TAG_MISALIGNED) == ('2.3', '2.4')
+    assert '1.5' in l_text.tag_ranges(TAG_BAR)
+
+    return
+# end of function
+
+
+def test_incremental_full_view():
+    """
+    Whole tab displayed.
+    """
+    check_incremental(1, TabView)
+
+    return
+# end of function
+
+
+def test_incremental_window():
+    """
+    Virtualized view (window of columns).
+    """
+    check_incremental(2, lambda l_text, l_document: TabView(l_text, l_document, 30))
+
+    return
+# end of function
+
+
+def test_incremental_layout():
+    """
+    Auto-layout (stacked systems).
+    """
+    check_incremental(3, lambda l_text, l_document: TabLayoutView(l_text, l_document, 25))
+
+    return
+# end of function
+
+# End of file
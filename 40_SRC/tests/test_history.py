@@ -0,0 +1,56 @@
+"""
+History Tests
+
+USE:
+    Each edit of the tab, even on several columns (pasted block, transposition), is one
+    change of the document, undone and redone at once.
+"""
+
+##################
+# IMPORT SECTION
+##################
+# APPLICATION libraries
+from tab_document import TabDocument, STRINGS   # For the tab model
+from tab_history import TabHistory              # For the undo/redo
+from tab_block import copy_block, paste_block   # For the blocks
+from tab_transpose import transpose_lines       # For the transposition
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+TAB_TEXT = '\n'.join(f"{l_name}|-1-2-|" for l_name in STRINGS)  # Constant => pylint: disable=C0103
+
+
+##################
+# FUNCTIONS
+##################
+def test_multi_column_edits():
+    """
+    A note, a pasted block and a transposition are undone and redone one at a time.
+    """
+    l_document = TabDocument.from_text(TAB_TEXT, STRINGS)
+    l_history = TabHistory(l_document)
+    l_texts = [l_document.to_text()]
+    l_document.write_note(0, 3, '5')
+    l_texts.append(l_document.to_text())
+    paste_block(l_document, copy_block(l_document, 0, len(STRINGS) - 1, 2, 6), 0, 6)
+    l_texts.append(l_document.to_text())
+    l_document.set_lines(transpose_lines(l_document.lines(), 2))
+    l_texts.append(l_document.to_text())
+
+    assert len(l_history) == 3
+    for l_text in reversed(l_texts[:-1]):
+        l_history.undo()
+        assert l_document.to_text() == l_text
+    # end for
+    assert not l_history.can_undo()
+    for l_text in l_texts[1:]:
+        l_history.redo()
+        assert l_document.to_text() == l_text
+    # end for
+
+    return
+# end of function
+
+# End of file
@@ -0,0 +1,87 @@
+"""
+I/O Worker Tests
+
+USE:
+    The clipboard copies run on a worker thread: a copy of the content still being
+    copied is skipped, and the same content is copied again once the copy is done.
+"""
+
+##################
+# IMPORT SECTION
+##################
+# STANDARD libraries
+import threading                # For the slow clipboard
+# APPLICATION libraries
+from tab_io import IOWorker     # For the worker thread
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+TIMEOUT = 5  # Seconds => pylint: disable=C0103
+
+
+##################
+# CLASS DEFINITION
+##################
+class RootStub:
+    """
+    Stand-in of the Tk root window: the scheduled calls are only recorded.
+    """
+    def after(self, delay_ms, function): # pylint: disable=unused-argument
+        """
+        Record nothing: the test polls the worker itself.
+        """
+        return 'after#1'
+    # end of function
+
+
+    def after_cancel(self, after_id): # pylint: disable=unused-argument
+        """
+        Nothing to cancel.
+        """
+        return
+    # end of function
+
+# end of class
+
+
+##################
+# FUNCTIONS
+##################
+def test_copy_skipped_only_while_in_flight():
+    """
+    The Copy button pressed twice on an unchanged tab: the second press is skipped while
+    the first copy runs, and copies again once it is done.
+    """
+    l_release = threading.Event()
+    l_copies = []
+
+    def slow_copy(text):
+        l_release.wait(TIMEOUT)
+        l_copies.append(text)
+    # end of function
+
+    l_done = threading.Event()
+    l_worker = IOWorker(RootStub(), copy_function=slow_copy)
+    try:
+        assert l_worker.copy('tab')
+        assert not l_worker.copy('tab')
+        l_release.set()
+        l_worker.submit(l_done.set, None)
+        assert l_done.wait(TIMEOUT)
+
+        # The clipboard may have been written by another application meanwhile
+        assert l_worker.copy('tab')
+        l_done.clear()
+        l_worker.submit(l_done.set, None)
+        assert l_done.wait(TIMEOUT)
+        assert l_copies == ['tab', 'tab']
+    finally:
+        l_worker.close()
+    # end try
+
+    return
+# end of function
+
+# End of file
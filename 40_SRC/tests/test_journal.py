@@ -0,0 +1,77 @@
+"""
+Journal Tests
+
+USE:
+    The autosaved tab must only be restored after a crash: a clean exit starts the next
+    session with a new tab.
+"""
+
+##################
+# IMPORT SECTION
+##################
+# APPLICATION libraries
+from tab_document import TabDocument, STRINGS  # For the tab model
+from tab_journal import TabJournal  # For the autosave
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+INITIAL_TEXT = '\n'.join(f"{l_name}|-----|" for l_name in STRINGS)  # Constant => pylint: disable=C0103
+
+
+##################
+# FUNCTIONS
+##################
+def edit_session(directory):
+    """
+    Edit a new tab with the autosave.
+
+    :param directory: The autosave directory.
+    :return: The TabJournal (the edits are written).
+    """
+    l_document = TabDocument.from_text(INITIAL_TEXT, STRINGS)
+    l_journal = TabJournal(directory, l_document)
+    l_document.set_lines([l_line.replace('-', '3', 1) for l_line in l_document.lines()])
+    l_journal.flush()
+
+    return l_journal
+# end of function
+
+
+def test_restore_after_crash(tmp_path):
+    """
+    Without a clean exit, the next session restores the edits.
+    """
+    edit_session(str(tmp_path))
+    l_document = TabDocument.from_text(INITIAL_TEXT, STRINGS)
+    l_journal = TabJournal(str(tmp_path), l_document)
+
+    assert l_journal.restored
+    assert l_document.to_text() != INITIAL_TEXT
+    l_journal.close()
+
+    return
+# end of function
+
+
+def test_no_restore_after_clean_exit(tmp_path):
+    """
+    After a clean exit, the next session starts with a new tab, and a crash of this
+    session restores its own edits again.
+    """
+    edit_session(str(tmp_path)).close()
+    l_document = TabDocument.from_text(INITIAL_TEXT, STRINGS)
+    l_journal = TabJournal(str(tmp_path), l_document)
+
+    assert not l_journal.restored
+    assert l_document.to_text() == INITIAL_TEXT
+
+    # Crash of the second session
+    l_document = TabDocument.from_text(INITIAL_TEXT, STRINGS)
+    assert TabJournal(str(tmp_path), l_document).restored
+
+    return
+# end of function
+
+# End of file
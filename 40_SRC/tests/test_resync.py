@@ -0,0 +1,134 @@
+"""
+Resync Tests
+
+USE:
+    Keys handled by Tk itself (e.g. backspace) modify the Text widget, then the view
+    updates the document from it: only the modified columns must change.
+"""
+
+##################
+# IMPORT SECTION
+##################
+# APPLICATION libraries
+from tab_benchmark import HeadlessEditor, TextStub, WINDOW  # For the headless editor
+from tab_layout import TabLayoutView, SYSTEM_COLUMNS  # For the stacked systems display
+from tab_history import TabHistory              # For the undo/redo
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+NB_COLUMNS = 10000  # Constant => pylint: disable=C0103
+BACKSPACES = 10     # Constant => pylint: disable=C0103
+MAX_HISTORY = 4096  # Bytes of history of the backspaces => pylint: disable=C0103
+
+
+##################
+# FUNCTIONS
+##################
+def check_backspaces(tab):
+    """
+    Check that backspaces blank cells, with a history of a few bytes per key.
+
+    :param tab: The HeadlessEditor.
+    """
+    l_history = TabHistory(tab.document)
+    l_width = tab.document.width
+    l_cols = [NB_COLUMNS // 2 + 7 * l_key for l_key in range(BACKSPACES)]
+    for l_col in l_cols:
+        tab.backspace(2, l_col)
+    # end for
+
+    assert tab.document.width == l_width
+    assert all(tab.document.cell(2, l_col - 1) == '-' for l_col in l_cols)
+    assert len(set(len(l_line) for l_line in tab.document.lines())) == 1
+    assert l_history.memory_size() < MAX_HISTORY
+    assert not tab.text_zone.modified
+
+    return
+# end of function
+
+
+def test_backspace_history_size():
+    """
+    Backspaces on a large tab keep the history in bytes, not in megabytes.
+    """
+    l_tab = HeadlessEditor(NB_COLUMNS)
+    check_backspaces(l_tab)
+    assert l_tab.text_zone.lines == l_tab.document.lines()
+
+    return
+# end of function
+
+
+def test_backspace_window():
+    """
+    Backspaces in the window of the virtualized view.
+    """
+    l_tab = HeadlessEditor(NB_COLUMNS, window=WINDOW)
+    l_tab.view.show(NB_COLUMNS // 2)
+    check_backspaces(l_tab)
+    assert l_tab.text_zone.lines == l_tab.view.visible_lines()
+
+    return
+# end of function
+
+
+def test_backspace_widget_calls():
+    """
+    The Text widget is aligned with the document by one call per backspace.
+    """
+    l_tab = HeadlessEditor(NB_COLUMNS)
+    l_tab.text_zone.calls = 0
+    l_tab.backspace(0, NB_COLUMNS // 2)
+    # One delete for the key, one insert of the blanked cell
+    assert l_tab.text_zone.calls == 2
+
+    return
+# end of function
+
+
+
+def test_backspace_layout():
+    """
+    Backspaces in the auto-layout only display the systems around the cell again.
+    """
+    l_tab = HeadlessEditor(NB_COLUMNS, system_columns=SYSTEM_COLUMNS)
+    l_tab.text_zone.calls = 0
+    check_backspaces(l_tab)
+    # A few patches per key, not the whole song
+    assert l_tab.text_zone.calls <= 4 * BACKSPACES
+
+    l_text = TextStub()
+    TabLayoutView(l_text, l_tab.document, SYSTEM_COLUMNS).render()
+    assert l_tab.text_zone.lines == l_text.lines
+
+    return
+# end of function
+
+
+def test_key_in_layout_prefix():
+    """
+    A key typed by Tk in the string names of a later system is dropped.
+    """
+    l_tab = HeadlessEditor(NB_COLUMNS, system_columns=SYSTEM_COLUMNS)
+    l_lines = l_tab.document.lines()
+    for l_char in (0, 1):
+        # String 2 of the second system
+        l_index = f"{l_tab.view.line_nb(1, 1)}.{l_char}"
+        l_tab.text_zone.insert(l_index, 'h')
+        l_tab.text_zone.mark_set('insert', f"{l_index}+1c")
+        l_tab.text_zone.modified = True
+        l_tab.view.resync()
+
+        assert l_tab.document.lines() == l_lines
+        l_text = TextStub()
+        TabLayoutView(l_text, l_tab.document, SYSTEM_COLUMNS).render()
+        assert l_tab.text_zone.lines == l_text.lines
+        assert not l_tab.text_zone.modified
+    # end for
+
+    return
+# end of function
+
+# End of file
@@ -0,0 +1,69 @@
+"""
+View Tests
+
+USE:
+    An edit of the tab is mirrored in the Text widget with a few per-line calls, whatever
+    the size of the tab.
+"""
+
+##################
+# IMPORT SECTION
+##################
+# APPLICATION libraries
+from tab_benchmark import HeadlessEditor        # For the headless editor
+
+
+##################
+# GLOBAL CONSTANTS
+##################
+NB_COLUMNS = 10000  # Constant => pylint: disable=C0103
+
+
+##################
+# FUNCTIONS
+##################
+def edit_calls(char, row):
+    """
+    Count the Text widget calls of one key press in the middle of a large tab.
+
+    :param char: The typed character.
+    :param row: The string.
+    :return: (number of calls, the HeadlessEditor).
+    """
+    l_tab = HeadlessEditor(NB_COLUMNS)
+    # A '-' of the middle of the tab: the note overwrites it
+    l_col = l_tab.document.width // 2
+    while l_tab.document.cell(row, l_col) != '-':
+        l_col += 1
+    # end while
+    l_tab.text_zone.calls = 0
+    l_tab.key(char, row, l_col)
+
+    return (l_tab.text_zone.calls, l_tab)
+# end of function
+
+
+def test_note_widget_calls():
+    """
+    A note modifies one string: at most one delete and one insert.
+    """
+    l_calls, l_tab = edit_calls('5', 2)
+    assert l_calls <= 2
+    assert l_tab.text_zone.lines == l_tab.document.lines()
+
+    return
+# end of function
+
+
+def test_bar_widget_calls():
+    """
+    A bar inserts a column: one insert per string.
+    """
+    l_calls, l_tab = edit_calls('|', 0)
+    assert l_calls <= l_tab.document.nb_strings
+    assert l_tab.text_zone.lines == l_tab.document.lines()
+
+    return
+# end of function
+
+# End of file